@@ -15,19 +15,171 @@ import json
 import os
 from datetime import datetime
 from playwright.sync_api import sync_playwright
+from browser_telemetry import BrowserTelemetry, append_metrics_record
+from failure_capture import FailureCapture, ArtifactRingBuffer, trace_on_failure_enabled
+from report_storage import write_report
+from browser_drivers import (
+    BrowserDriver, PlaywrightSyncDriver, create_driver,
+    get_launch_options, CONTEXT_OPTIONS, STEALTH_SCRIPT
+)
+from text_normalizer import (
+    FragmentDeduplicator, normalize_fragment, normalize_fragments,
+    contains_nav_words, combine_fragments
+)
+
+# Selettori CSS dei controlli espandibili dentro l'AI Overview (solo CSS standard,
+# vengono valutati nella pagina con querySelectorAll)
+SHOW_MORE_SELECTORS = [
+    ".niO4u.VDgVie.SlP8xc",
+    "[class*='niO4u'][class*='VDgVie'][class*='SlP8xc']",
+    "[aria-expanded='false']",
+    "[aria-label*='Mostra altro']",
+    "[aria-label*='Show more']",
+    "[onclick*='more']",
+    "[onclick*='altro']",
+    "[onclick*='expand']",
+    "[onclick*='espandi']",
+    ".oHglmf",
+    ".GKS7yf",
+    ".pkphOe",
+    ".s75CSd",
+    ".CvDJxb",
+    ".RveJvd",
+    ".dmenKe",
+    ".CL9Uqc",
+    ".wHYlTd",
+]
+
+# Testi dei controlli espandibili (confronto case-insensitive)
+SHOW_MORE_KEYWORDS = ['mostra altro', 'mostra di più', 'show more', 'see more', 'espandi', 'expand']
+
+# Contenitori dell'AI Overview: l'espansione parte dal più vicino antenato che corrisponde
+OVERVIEW_CONTAINER_SELECTORS = ["#m-x-content", ".RJPOee", ".LT6XE"]
+
+# Script eseguito nella pagina: fotografa i nodi di testo visibili, clicca tutti i
+# controlli espandibili in una sola volta, attende che le mutazioni del DOM si
+# stabilizzino e restituisce solo i blocchi di testo diventati visibili dopo i click:
+# sia quelli inseriti sia quelli già presenti ma nascosti (display:none, hidden,
+# altezza limitata con overflow nascosto)
+EXPAND_SECTIONS_SCRIPT = """
+async (element, opts) => {
+    const root = opts.containers.map(sel => element.closest(sel)).find(Boolean) || element;
+
+    // Visibile: ha dimensioni, non è nascosto via stile e non è tagliato da un
+    // antenato con overflow nascosto (testo troncato con altezza limitata)
+    const isVisible = el => {
+        const rect = el.getBoundingClientRect();
+        if (rect.width <= 0 || rect.height <= 0) return false;
+        if (getComputedStyle(el).visibility === 'hidden') return false;
+        for (let node = el.parentElement; node && node !== document.body; node = node.parentElement) {
+            const style = getComputedStyle(node);
+            if (style.overflowY === 'visible' && style.overflowX === 'visible') continue;
+            const clip = node.getBoundingClientRect();
+            if (rect.top >= clip.bottom || rect.bottom <= clip.top ||
+                rect.left >= clip.right || rect.right <= clip.left) return false;
+        }
+        return true;
+    };
+
+    const visibleBefore = new WeakSet();
+    const before = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+    while (before.nextNode()) {
+        const node = before.currentNode;
+        if (node.parentElement && isVisible(node.parentElement)) visibleBefore.add(node);
+    }
+
+    const controls = new Set();
+    for (const sel of opts.selectors) {
+        try { root.querySelectorAll(sel).forEach(el => controls.add(el)); } catch (e) {}
+    }
+    root.querySelectorAll("button, [role='button'], a, span, div").forEach(el => {
+        if (el.children.length > 3) return;
+        const label = ((el.getAttribute('aria-label') || '') + ' ' + (el.innerText || '')).toLowerCase();
+        if (label.length < 60 && opts.keywords.some(k => label.includes(k))) controls.add(el);
+    });
+
+    // Evita doppi click su controlli annidati: tiene solo il più esterno
+    const targets = [...controls].filter(el =>
+        el.getAttribute('aria-expanded') !== 'true' && isVisible(el) &&
+        ![...controls].some(other => other !== el && other.contains(el))
+    );
+
+    let clicked = 0;
+    for (const el of targets) {
+        try { el.click(); clicked++; } catch (e) {}
+    }
+
+    if (clicked > 0) {
+        await new Promise(resolve => {
+            let quiet = null;
+            const finish = () => { observer.disconnect(); clearTimeout(quiet); clearTimeout(hard); resolve(); };
+            const observer = new MutationObserver(() => {
+                clearTimeout(quiet);
+                quiet = setTimeout(finish, opts.quietMs);
+            });
+            observer.observe(root, {childList: true, subtree: true, characterData: true});
+            quiet = setTimeout(finish, opts.initialWaitMs);
+            const hard = setTimeout(finish, opts.maxWaitMs);
+        });
+    }
+
+    // Raggruppa per blocco contenitore i nodi di testo visibili ora e non prima
+    const blocks = new Map();
+    const after = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+    while (after.nextNode()) {
+        const node = after.currentNode;
+        const text = node.textContent.trim();
+        if (visibleBefore.has(node) || !text || !node.parentElement || !isVisible(node.parentElement)) continue;
+        const block = node.parentElement.closest('p, li, div, td, h1, h2, h3, h4, h5, h6') || node.parentElement;
+        if (!blocks.has(block)) blocks.set(block, []);
+        blocks.get(block).push(text);
+    }
+
+    const fragments = [];
+    for (const parts of blocks.values()) {
+        const text = parts.join(' ').replace(/\\s+/g, ' ').trim();
+        if (text.length >= opts.minFragmentChars && !fragments.includes(text)) fragments.push(text);
+    }
+
+    return {controls: controls.size, clicked: clicked, fragments: fragments};
+}
+"""
 
 class AIOverviewExtractor:
-    def __init__(self, headless=False):
+    def __init__(self, headless=False, collect_telemetry=True, metrics_file=None, driver='playwright',
+                 trace_on_failure=None, artifacts_dir=None):
         """
         Inizializza l'estrattore AI Overview con Playwright (2025)
         
         Args:
             headless (bool): Se True, esegue il browser in modalità headless
+            collect_telemetry (bool): Se True, raccoglie metriche CDP del browser per ogni job
+            metrics_file (str): File JSONL dove accodare i metrics dei job
+                (default: variabile d'ambiente AI_OVERVIEW_METRICS_FILE)
+            driver (str | BrowserDriver): Backend del browser: 'playwright' (default),
+                'playwright_async', 'replay' oppure un'istanza di BrowserDriver già pronta
+            trace_on_failure (bool): Se True, registra trace Playwright e conserva trace,
+                screenshot e DOM solo per i job falliti o oltre la deadline
+                (default: variabile d'ambiente AI_OVERVIEW_TRACE_ON_FAILURE)
+            artifacts_dir (str): Cartella del ring buffer degli artefatti
+                (default: variabile d'ambiente AI_OVERVIEW_ARTIFACTS_DIR)
         """
+        self.driver = driver if isinstance(driver, BrowserDriver) else None
+        self.driver_name = driver.name if isinstance(driver, BrowserDriver) else driver
+        self._owns_driver = False
         self.browser = None
+        self.context = None
         self.page = None
         self.headless = headless
         self.playwright = None
+        self.collect_telemetry = collect_telemetry
+        self.metrics_file = metrics_file
+        self.telemetry = None
+        self.last_job_metrics = None
+        self.trace_on_failure = trace_on_failure_enabled() if trace_on_failure is None else trace_on_failure
+        self.artifacts_dir = artifacts_dir
+        self.failure_capture = None
+        self.fragments = []  # Frammenti normalizzati dell'ultima estrazione
         self.setup_browser()
     
     def setup_browser(self):
@@ -54,7 +206,19 @@ class AIOverviewExtractor:
                     except Exception as loop_error:
                         print(f"⚠️ Avviso loop: {loop_error}")
             
-            # Usa esclusivamente Playwright
+            # Driver già pronto fornito dal chiamante
+            if self.driver is not None:
+                print(f"✅ Driver {self.driver_name} fornito dal chiamante")
+                return
+            
+            # Driver alternativi alla Playwright sync API
+            if self.driver_name != 'playwright':
+                self.driver = create_driver(self.driver_name, headless=self.headless)
+                self._owns_driver = True
+                print(f"✅ Driver {self.driver_name} avviato con successo")
+                return
+            
+            # Usa Playwright sync API
             self.playwright = sync_playwright().start()
             print("✅ Playwright avviato con successo")
             self._setup_playwright_browser()
@@ -65,67 +229,16 @@ class AIOverviewExtractor:
     
     def _setup_playwright_browser(self):
         """Setup specifico per Playwright"""
-        # Opzioni browser ottimizzate per gestire popup di consenso Google
-        browser_args = [
-            '--no-sandbox',
-            '--disable-dev-shm-usage',
-            '--disable-blink-features=AutomationControlled',
-            '--disable-web-security',
-            '--disable-features=VizDisplayCompositor',
-            '--disable-extensions',
-            '--disable-default-apps',
-            '--disable-sync',
-            '--disable-translate',
-            '--disable-background-timer-throttling',
-            '--disable-backgrounding-occluded-windows',
-            '--disable-renderer-backgrounding',
-            '--disable-field-trial-config',
-            '--disable-back-forward-cache',
-            '--disable-ipc-flooding-protection',
-            '--no-first-run',
-            '--no-default-browser-check',
-            '--disable-popup-blocking',  # Importante per gestire popup
-            '--disable-notifications',   # Disabilita notifiche
-            '--disable-infobars',        # Disabilita barre info
-            '--disable-save-password-bubble',  # Disabilita popup password
-        ]
-        
         # Avvia browser Chromium
         print("🌐 Avviando browser Chromium...")
-        
-        # Configura percorso eseguibile per Railway
-        executable_path = None
-        if os.path.exists('/ms-playwright'):
-            # Railway environment
-            import glob
-            chrome_paths = glob.glob('/ms-playwright/chromium-*/chrome-linux/chrome')
-            if chrome_paths:
-                executable_path = chrome_paths[0]
-                print(f"📍 Usando Chrome da Railway: {executable_path}")
-        
-        launch_options = {
-            'headless': self.headless,
-            'args': browser_args
-        }
-        
-        if executable_path:
-            launch_options['executable_path'] = executable_path
+        launch_options = get_launch_options(self.headless)
             
         self.browser = self.playwright.chromium.launch(**launch_options)
         print("✅ Browser Chromium avviato con successo")
         
         # Crea contesto con impostazioni anti-rilevamento
         print("🔧 Creando contesto browser...")
-        context = self.browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            locale='it-IT',
-            timezone_id='Europe/Rome',
-            permissions=['geolocation'],  # Gestisce permessi automaticamente
-            extra_http_headers={
-                'Accept-Language': 'it-IT,it;q=0.9,en;q=0.8'
-            }
-        )
+        context = self.context = self.browser.new_context(**CONTEXT_OPTIONS)
         print("✅ Contesto browser creato")
         
         # Crea pagina
@@ -134,30 +247,36 @@ class AIOverviewExtractor:
         print("✅ Pagina creata con successo")
         
         # Script anti-rilevamento
-        self.page.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-            Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
-            Object.defineProperty(navigator, 'languages', {get: () => ['it-IT', 'it', 'en']});
-            window.chrome = {runtime: {}};
-        """)
+        self.page.add_init_script(STEALTH_SCRIPT)
         
         print("✅ Playwright configurato con successo")
         self.browser_type = 'playwright'
+        self.driver = PlaywrightSyncDriver(self.page)
+        
+        if self.collect_telemetry:
+            self.telemetry = BrowserTelemetry(self.page, self.browser)
+        
+        if self.trace_on_failure:
+            self.failure_capture = FailureCapture(
+                context, self.page, ArtifactRingBuffer(self.artifacts_dir)
+            )
+            print("🧾 Tracing su errore abilitato")
     
 
     
     def _wait_for_timeout(self, milliseconds):
         """Attende per il tempo specificato"""
-        self.page.wait_for_timeout(milliseconds)
+        self.driver.wait_for_timeout(milliseconds)
     
     def _find_element(self, selector):
         """Trova un elemento nella pagina"""
-        return self.page.locator(selector)
+        return self.driver.locator(selector)
     
     def _click_element(self, selector):
         """Clicca un elemento se visibile"""
-        if self.page.locator(selector).count() > 0:
-            element = self.page.locator(selector).first
+        elements = self.driver.locator(selector)
+        if elements.count() > 0:
+            element = elements.first
             if element.is_visible():
                 element.click()
                 return True
@@ -165,15 +284,15 @@ class AIOverviewExtractor:
     
     def _navigate_to(self, url):
         """Naviga a un URL"""
-        self.page.goto(url, wait_until="domcontentloaded", timeout=10000)
+        self.driver.goto(url, timeout=10000)
     
     def _get_page_content(self):
         """Ottiene il contenuto della pagina"""
-        return self.page.content()
+        return self.driver.content()
     
     def _find_elements(self, selector):
         """Trova più elementi nella pagina"""
-        return self.page.locator(selector)
+        return self.driver.locator(selector)
     
     def _get_element_text(self, element):
         """Ottiene il testo di un elemento"""
@@ -241,8 +360,8 @@ class AIOverviewExtractor:
                     ]
                     
                     for iframe_selector in iframe_selectors:
-                        if self.page.locator(iframe_selector).count() > 0:
-                            frame = self.page.frame_locator(iframe_selector)
+                        if self.driver.locator(iframe_selector).count() > 0:
+                            frame = self.driver.frame_locator(iframe_selector)
                             # Cerca pulsanti nell'iframe
                             for btn_selector in ["button:has-text('Accept')", "button:has-text('OK')", "button[aria-label*='Accept']"]:
                                 try:
@@ -269,8 +388,8 @@ class AIOverviewExtractor:
                     ]
                     
                     for overlay_sel in overlay_selectors:
-                        if self.page.locator(overlay_sel).count() > 0:
-                            buttons = self.page.locator(overlay_sel)
+                        if self.driver.locator(overlay_sel).count() > 0:
+                            buttons = self.driver.locator(overlay_sel)
                             for i in range(buttons.count()):
                                 btn = buttons.nth(i)
                                 if btn.is_visible():
@@ -293,7 +412,7 @@ class AIOverviewExtractor:
             
             # Gestione captcha
             try:
-                if self.page.locator("iframe[src*='recaptcha']").count() > 0:
+                if self.driver.locator("iframe[src*='recaptcha']").count() > 0:
                     print("⚠️ Captcha rilevato. Attesa 10 secondi...")
                     self._wait_for_timeout(10000)
             except:
@@ -394,7 +513,7 @@ class AIOverviewExtractor:
                 results_loaded = False
                 for selector in result_selectors:
                     try:
-                        self.page.wait_for_selector(selector, timeout=30000)  # Aumentato a 30 secondi per gestire caricamenti lenti
+                        self.driver.wait_for_selector(selector, timeout=30000)  # Aumentato a 30 secondi per gestire caricamenti lenti
                         print(f"✅ Risultati caricati con selettore: {selector}")
                         results_loaded = True
                         break
@@ -404,7 +523,7 @@ class AIOverviewExtractor:
                 if not results_loaded:
                     # Fallback: attendi semplicemente che la pagina si stabilizzi
                     print("⚠️ Selettori specifici falliti, attendo stabilizzazione pagina...")
-                    self.page.wait_for_load_state("networkidle", timeout=40000)  # Aumentato a 40 secondi
+                    self.driver.wait_for_load_state("networkidle", timeout=40000)  # Aumentato a 40 secondi
                     print("✅ Pagina stabilizzata")
                     
             except Exception as results_error:
@@ -482,35 +601,9 @@ class AIOverviewExtractor:
             found_selector = None
             
             # Prova diversi selettori per trovare l'AI Overview
-            all_content = []
-            seen_content = set()  # Per tracciare contenuto già visto
-            
-            def is_duplicate_content(new_text, existing_content):
-                """Controlla se il nuovo testo è duplicato o contenuto in testi esistenti"""
-                new_text_clean = new_text.lower().strip()
-                
-                # Controlla se il testo è identico
-                if new_text_clean in seen_content:
-                    return True
-                
-                # Controlla se il testo è contenuto in un testo esistente (>90% overlap)
-                for existing in existing_content:
-                    existing_clean = existing.lower().strip()
-                    if len(new_text_clean) > 100 and len(existing_clean) > 100:
-                        # Calcola sovrapposizione solo per testi molto lunghi
-                        if new_text_clean in existing_clean or existing_clean in new_text_clean:
-                            return True
-                        
-                        # Controlla similarità solo per frasi molto lunghe con soglia più alta
-                        words_new = set(new_text_clean.split())
-                        words_existing = set(existing_clean.split())
-                        if len(words_new) > 20 and len(words_existing) > 20:
-                            overlap = len(words_new.intersection(words_existing))
-                            similarity = overlap / min(len(words_new), len(words_existing))
-                            if similarity > 0.9:
-                                return True
-                
-                return False
+            # Ogni frammento viene normalizzato una volta e riusato per dedup, filtri e unione
+            deduplicator = FragmentDeduplicator()
+            all_content = deduplicator.fragments
             
             for idx, selector in enumerate(ai_overview_selectors):
                 # Controlla timeout ad ogni iterazione del selettore
@@ -521,7 +614,7 @@ class AIOverviewExtractor:
                 try:
                     print(f"🔍 Testando selettore {idx+1}/{len(ai_overview_selectors)}: {selector[:50]}...")
                     
-                    elements = self.page.locator(selector)
+                    elements = self.driver.locator(selector)
                     count = min(elements.count(), 10)  # Aumentato a 10 elementi per selettore
                     
                     if count > 0:
@@ -536,23 +629,19 @@ class AIOverviewExtractor:
                         try:
                             element = elements.nth(i)
                             if element.is_visible():  # Rimozione parametro timeout non supportato
-                                text = element.inner_text().strip()
+                                fragment = normalize_fragment(element.inner_text())
                                 
                                 # Raccoglie tutto il contenuto significativo con deduplicazione meno aggressiva
-                                if (len(text) > 15 and 
-                                    not is_duplicate_content(text, all_content) and
+                                if (fragment is not None and
+                                    len(fragment) > 15 and 
                                     # Esclude elementi di navigazione
-                                    not any(nav_word in text.lower() for nav_word in [
-                                        'search', 'images', 'videos', 'news', 'shopping',
-                                        'maps', 'more', 'tools', 'settings', 'sign in'
-                                    ])):
+                                    not contains_nav_words(fragment) and
+                                    deduplicator.add(fragment)):
                                     
-                                    all_content.append(text)
-                                    seen_content.add(text.lower().strip())
                                     if not ai_overview_element:
                                         ai_overview_element = element
                                         found_selector = selector
-                                        print(f"✅ Primo elemento AI Overview trovato: {len(text)} caratteri")
+                                        print(f"✅ Primo elemento AI Overview trovato: {len(fragment)} caratteri")
                                     
                                     # Aumentato il limite per catturare più contenuto
                                     if len(all_content) >= 20:
@@ -571,8 +660,9 @@ class AIOverviewExtractor:
                     continue
             
             # Se abbiamo raccolto contenuto da più elementi, lo combiniamo
+            self.fragments = all_content
             if all_content:
-                combined_content = '\n\n'.join(all_content)
+                combined_content = combine_fragments(all_content)
                 print(f"✅ AI Overview trovato con {len(all_content)} elementi: {found_selector}")
                 print(f"📝 Contenuto combinato: {len(combined_content)} caratteri")
                 
@@ -597,8 +687,8 @@ class AIOverviewExtractor:
                             print("⏰ Timeout durante ricerca iframe")
                             break
                             
-                        if self.page.locator(iframe_sel).count() > 0:
-                            frame = self.page.frame_locator(iframe_sel)
+                        if self.driver.locator(iframe_sel).count() > 0:
+                            frame = self.driver.frame_locator(iframe_sel)
                             frame_content = frame.locator("body").inner_text()
                             if len(frame_content) > 50:
                                 ai_content = frame_content
@@ -625,7 +715,7 @@ class AIOverviewExtractor:
                                 print("⏰ Timeout durante strategia fallback")
                                 break
                                 
-                            elements = self.page.locator(fallback_sel)
+                            elements = self.driver.locator(fallback_sel)
                             for i in range(min(elements.count(), 5)):  # Controlla solo i primi 5
                                 # Controlla timeout anche nel loop interno
                                 if time.time() - extract_start > max_extract_time:
@@ -663,227 +753,26 @@ class AIOverviewExtractor:
                 except Exception as e:
                     print(f"❌ Errore nell'estrazione del testo: {e}")
                 
-                # Cerca il pulsante "Mostra altro" o "Show more" con Playwright
+                # Espandi tutte le sezioni "Mostra altro" e unisci solo il testo nuovo
                 try:
-                    print("🔍 Ricerca pulsante 'Mostra altro'...")
-                    
-                    show_more_selectors = [
-                        # Selettori aggiornati per "Mostra altro" (2025)
-                        ".niO4u.VDgVie.SlP8xc",
-                        "div.niO4u.VDgVie.SlP8xc",
-                        "span.niO4u.VDgVie.SlP8xc",
-                        "button.niO4u.VDgVie.SlP8xc",
-                        "[class*='niO4u'][class*='VDgVie'][class*='SlP8xc']",
-                        
-                        # Selettori specifici per testo
-                        "button:has-text('Mostra altro')",
-                        "button:has-text('Show more')",
-                        "span:has-text('Mostra altro')",
-                        "span:has-text('Show more')",
-                        "div:has-text('Mostra altro')",
-                        "div:has-text('Show more')",
-                        "a:has-text('Mostra altro')",
-                        "a:has-text('Show more')",
-                        
-                        # Selettori con attributi role
-                        "[role='button']:has-text('altro')",
-                        "[role='button']:has-text('more')",
-                        "[role='button']:has-text('Mostra')",
-                        "[role='button']:has-text('Show')",
-                        
-                        # Selettori con aria-label
-                        "button[aria-label*='Mostra']",
-                        "button[aria-label*='Show']",
-                        "button[aria-label*='more']",
-                        "button[aria-label*='altro']",
-                        "[aria-label*='Mostra altro']",
-                        "[aria-label*='Show more']",
-                        
-                        # Selettori con data-ved
-                        "[data-ved][role='button']",
-                        "button[data-ved]",
-                        "div[data-ved][role='button']",
-                        "span[data-ved][role='button']",
-                        
-                        # Classi CSS specifiche Google
-                        ".oHglmf",
-                        ".GKS7yf",
-                        ".pkphOe",
-                        ".s75CSd",
-                        ".CvDJxb",
-                        ".RveJvd",
-                        ".dmenKe",
-                        ".CL9Uqc",
-                        ".wHYlTd",
-                        ".sATSHe",
-                        
-                        # Selettori generici per elementi cliccabili
-                        "[onclick*='more']",
-                        "[onclick*='altro']",
-                        "[onclick*='expand']",
-                        "[onclick*='espandi']"
+                    expansion = self.expand_overview_sections(ai_overview_element)
+                    text_lower = ai_overview_content["text"].lower()
+                    new_fragments = [
+                        fragment for fragment in normalize_fragments(expansion.get('fragments', []))
+                        if fragment.lower not in text_lower and deduplicator.add(fragment)
                     ]
                     
-                    show_more_button = None
-                    
-                    # Cerca il pulsante nell'elemento AI Overview
-                    for selector in show_more_selectors:
-                        try:
-                            # Cerca prima nell'elemento AI Overview
-                            buttons = ai_overview_element.locator(selector)
-                            if buttons.count() > 0:
-                                button = buttons.first
-                                if button.is_visible():
-                                    show_more_button = button
-                                    print(f"✅ Pulsante 'Mostra altro' trovato: {selector}")
-                                    break
-                        except:
-                            continue
-                    
-                    # Se non trovato nell'elemento, cerca nella pagina
-                    if not show_more_button:
-                        for selector in show_more_selectors:
-                            try:
-                                buttons = self.page.locator(selector)
-                                if buttons.count() > 0:
-                                    button = buttons.first
-                                    if button.is_visible():
-                                        show_more_button = button
-                                        print(f"✅ Pulsante 'Mostra altro' trovato nella pagina: {selector}")
-                                        break
-                            except:
-                                continue
-                    
-                    # Prova con XPath specifico se non trovato
-                    if not show_more_button:
-                        try:
-                            xpath_selector = "//*[@id='_L5FvaJOBM43_7_UPgvGUsQ0_1']/div[1]/div/div[3]/div/div/div"
-                            xpath_button = self.page.locator(f"xpath={xpath_selector}")
-                            if xpath_button.count() > 0 and xpath_button.first.is_visible():
-                                show_more_button = xpath_button.first
-                                print(f"✅ Pulsante 'Mostra altro' trovato con XPath specifico")
-                        except Exception as e:
-                            print(f"⚠️ XPath specifico non funzionante: {e}")
-                    
-                    # Fallback: cerca qualsiasi elemento cliccabile con testo relativo
-                    if not show_more_button:
-                        try:
-                            print("🔍 Ricerca fallback del pulsante 'Mostra altro'...")
-                            fallback_selectors = [
-                                "*:has-text('Mostra') >> visible=true",
-                                "*:has-text('altro') >> visible=true",
-                                "*:has-text('Show') >> visible=true",
-                                "*:has-text('more') >> visible=true",
-                                "[role='button'] >> visible=true",
-                                "button >> visible=true",
-                                "div[role='button'] >> visible=true",
-                                "span[role='button'] >> visible=true",
-                                "a >> visible=true"
-                            ]
-                            
-                            for fallback in fallback_selectors:
-                                try:
-                                    elements = self.page.locator(fallback)
-                                    count = elements.count()
-                                    print(f"🔍 Controllando {count} elementi con selettore: {fallback}")
-                                    
-                                    for i in range(min(count, 5)):
-                                        element = elements.nth(i)
-                                        try:
-                                            if element.is_visible():
-                                                text = element.inner_text().lower().strip()
-                                                print(f"📝 Testo elemento {i}: '{text[:50]}...'")
-                                                
-                                                # Controllo più preciso delle parole chiave
-                                                keywords = ['mostra altro', 'show more', 'mostra', 'altro', 'show', 'more']
-                                                if any(keyword in text for keyword in keywords):
-                                                    # Verifica che l'elemento sia effettivamente cliccabile
-                                                    if element.is_enabled():
-                                                        show_more_button = element
-                                                        print(f"✅ Pulsante trovato con fallback: {fallback} - Testo: '{text}'")
-                                                        break
-                                        except Exception as elem_e:
-                                            print(f"⚠️ Errore controllo elemento {i}: {elem_e}")
-                                            continue
-                                    
-                                    if show_more_button:
-                                        break
-                                except Exception as sel_e:
-                                    print(f"⚠️ Errore con selettore {fallback}: {sel_e}")
-                                    continue
-                                    
-                        except Exception as e:
-                            print(f"⚠️ Fallback search failed: {e}")
-                    
-                    # Se trova il pulsante, cliccalo
-                    if show_more_button:
-                        try:
-                            print("🖱️ Click su 'Mostra altro'...")
-                            
-                            # Strategia di click multipla per gestire elementi che intercettano
-                            click_success = False
-                            
-                            # Tentativo 1: Click normale
-                            try:
-                                show_more_button.click(timeout=5000)
-                                click_success = True
-                                print("✅ Click normale riuscito")
-                            except Exception as e1:
-                                print(f"⚠️ Click normale fallito: {str(e1)[:100]}...")
-                                
-                                # Tentativo 2: Force click
-                                try:
-                                    show_more_button.click(force=True, timeout=5000)
-                                    click_success = True
-                                    print("✅ Force click riuscito")
-                                except Exception as e2:
-                                    print(f"⚠️ Force click fallito: {str(e2)[:100]}...")
-                                    
-                                    # Tentativo 3: JavaScript click
-                                    try:
-                                        show_more_button.evaluate("element => element.click()")
-                                        click_success = True
-                                        print("✅ JavaScript click riuscito")
-                                    except Exception as e3:
-                                        print(f"⚠️ JavaScript click fallito: {str(e3)[:100]}...")
-                            
-                            if click_success:
-                                # Attendi che il contenuto si espanda
-                                self.page.wait_for_timeout(3000)
-                            else:
-                                print("❌ Tutti i tentativi di click sono falliti")
-                                ai_overview_content["full_content"] = ai_overview_content["text"]
-                                return ai_overview_content
-                            
-                            # Estrai il contenuto espanso
-                            expanded_text = ai_overview_element.inner_text().strip()
-                            
-                            # Confronto più intelligente per verificare l'espansione
-                            # Usa il contenuto combinato originale invece del singolo elemento
-                            original_combined = ai_overview_content["text"]
-                            original_length = len(original_combined)
-                            expanded_length = len(expanded_text)
-                            length_increase = expanded_length - original_length
-                            
-                            # Utilizza sempre il contenuto più lungo tra quello originale combinato e quello espanso
-                            if expanded_length > original_length:
-                                ai_overview_content["expanded_text"] = expanded_text
-                                ai_overview_content["full_content"] = expanded_text
-                                print(f"✅ Contenuto espanso estratto: {expanded_length} caratteri (+{length_increase})")
-                            else:
-                                # Mantieni il contenuto combinato originale se è più lungo
-                                ai_overview_content["full_content"] = original_combined
-                                print(f"ℹ️ Mantenuto contenuto originale combinato: {original_length} caratteri (espanso: {expanded_length})")
-                                
-                        except Exception as e:
-                            print(f"❌ Errore nel click 'Mostra altro': {e}")
-                            ai_overview_content["full_content"] = ai_overview_content["text"]
+                    if new_fragments:
+                        expanded_text = combine_fragments(new_fragments)
+                        ai_overview_content["expanded_text"] = expanded_text
+                        ai_overview_content["full_content"] = ai_overview_content["text"] + '\n\n' + expanded_text
+                        print(f"✅ Contenuto espanso: {len(new_fragments)} frammenti nuovi (+{len(expanded_text)} caratteri)")
                     else:
                         ai_overview_content["full_content"] = ai_overview_content["text"]
-                        print("ℹ️ Pulsante 'Mostra altro' non trovato")
+                        print("ℹ️ Nessun contenuto aggiuntivo dopo l'espansione")
                         
                 except Exception as e:
-                    print(f"❌ Errore nella gestione 'Mostra altro': {e}")
+                    print(f"❌ Errore nell'espansione delle sezioni: {e}")
                     ai_overview_content["full_content"] = ai_overview_content["text"]
             
             else:
@@ -903,6 +792,35 @@ class AIOverviewExtractor:
         
         return ai_overview_content
     
+    def expand_overview_sections(self, ai_overview_element, max_wait_ms=5000):
+        """
+        Espande tutte le sezioni comprimibili dell'AI Overview con un unico script nella pagina
+        
+        Tutti i controlli "Mostra altro" del contenitore vengono cliccati insieme, poi si attende
+        una sola volta che il DOM smetta di crescere e si leggono solo i nodi di testo nuovi.
+        
+        Args:
+            ai_overview_element: Locator dell'elemento AI Overview trovato
+            max_wait_ms (int): Attesa massima per la stabilizzazione del DOM
+            
+        Returns:
+            dict: Numero di controlli trovati e cliccati, frammenti di testo comparsi
+        """
+        print("🔍 Espansione sezioni 'Mostra altro'...")
+        
+        expansion = ai_overview_element.evaluate(EXPAND_SECTIONS_SCRIPT, {
+            'selectors': SHOW_MORE_SELECTORS,
+            'keywords': SHOW_MORE_KEYWORDS,
+            'containers': OVERVIEW_CONTAINER_SELECTORS,
+            'initialWaitMs': 1000,
+            'quietMs': 400,
+            'maxWaitMs': max_wait_ms,
+            'minFragmentChars': 15
+        }) or {}
+        
+        print(f"🖱️ Controlli espandibili: {expansion.get('controls', 0)}, cliccati: {expansion.get('clicked', 0)}")
+        return expansion
+    
     def extract_ai_overview_from_query(self, query):
         """
         Funzione principale che esegue la ricerca ed estrae l'AI Overview
@@ -918,6 +836,28 @@ class AIOverviewExtractor:
         start_time = time.time()
         max_execution_time = 90  # Timeout massimo di 90 secondi (aumentato per gestire caricamenti lenti)
         
+        # Record dei metrics del job, completato nel finally
+        job_metrics = {
+            'query': query,
+            'timestamp': datetime.now().isoformat(),
+            'success': False
+        }
+        ai_content = None
+        failure_reason = None
+        
+        if self.failure_capture:
+            try:
+                self.failure_capture.start()
+            except Exception as trace_error:
+                print(f"⚠️ Tracing non disponibile: {trace_error}")
+        
+        if self.telemetry:
+            try:
+                self.telemetry.start()
+            except Exception as telemetry_error:
+                print(f"⚠️ Telemetria browser non disponibile: {telemetry_error}")
+                self.telemetry = None
+        
         try:
             print(f"🔍 Ricerca di: {query}")
             print(f"⏰ Timeout impostato: {max_execution_time} secondi")
@@ -932,9 +872,11 @@ class AIOverviewExtractor:
             
             if not self.search_google(query):
                 print("❌ Ricerca fallita")
+                failure_reason = 'search_failed'
                 return None
             
             search_duration = time.time() - search_start
+            job_metrics['search_seconds'] = round(search_duration, 3)
             print(f"✅ Ricerca completata in {search_duration:.2f} secondi")
             
             # Controlla timeout prima dell'estrazione
@@ -948,23 +890,28 @@ class AIOverviewExtractor:
             
             extraction_duration = time.time() - extraction_start
             total_duration = time.time() - start_time
+            job_metrics['extraction_seconds'] = round(extraction_duration, 3)
             
             print(f"⏱️ Estrazione completata in {extraction_duration:.2f} secondi")
             print(f"⏱️ Tempo totale: {total_duration:.2f} secondi")
             
             if ai_content and ai_content.get('found', False):
                 print("✅ AI Overview estratto con successo!")
+                job_metrics['success'] = True
                 return ai_content
             else:
                 print("❌ AI Overview non trovato")
+                failure_reason = 'overview_not_found'
                 return None
             
         except TimeoutError as te:
             print(f"⏰ Timeout raggiunto: {te}")
+            failure_reason = f"timeout: {te}"
             return None
             
         except Exception as e:
             print(f"❌ Errore durante l'estrazione: {e}")
+            failure_reason = f"error: {e}"
             # Log dettagliato per debug su Render
             import traceback
             print(f"📋 Stack trace: {traceback.format_exc()}")
@@ -974,22 +921,48 @@ class AIOverviewExtractor:
             total_time = time.time() - start_time
             print(f"🏁 Processo completato in {total_time:.2f} secondi")
             
+            # Completa il record dei metrics con la telemetria del browser
+            job_metrics['duration_seconds'] = round(total_time, 3)
+            
+            # Conserva trace, screenshot e DOM solo se il job è fallito o oltre la deadline
+            if self.failure_capture and self.failure_capture.active:
+                if failure_reason is None and total_time > max_execution_time:
+                    failure_reason = 'deadline_exceeded'
+                if failure_reason:
+                    job_metrics['failure_reason'] = failure_reason
+                    job_metrics['failure_artifacts'] = self.failure_capture.capture(query, {
+                        'query': query,
+                        'reason': failure_reason,
+                        'timestamp': job_metrics['timestamp'],
+                        'duration_seconds': job_metrics['duration_seconds'],
+                    })
+                else:
+                    self.failure_capture.discard()
+            
+            if self.telemetry:
+                job_metrics['browser'] = self.telemetry.collect()
+            if isinstance(ai_content, dict):
+                job_metrics['content_chars'] = len(ai_content.get('full_content', ''))
+                ai_content['metrics'] = job_metrics
+            self.last_job_metrics = job_metrics
+            append_metrics_record(job_metrics, self.metrics_file)
+            
             # Forza garbage collection per liberare memoria
             import gc
             gc.collect()
     
-    def save_to_file(self, content, filename):
+    def save_to_file(self, content, filename, format=None):
         """
-        Salva il contenuto estratto in un file JSON
+        Salva il contenuto estratto
         
         Args:
             content (dict): Contenuto da salvare
             filename (str): Nome del file
+            format (str): 'json', 'json.gz' o 'jsonl' (append); default dedotto dall'estensione
         """
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(content, f, ensure_ascii=False, indent=2)
-            print(f"Contenuto salvato in: {filename}")
+            path = write_report(content, filename, format)
+            print(f"Contenuto salvato in: {path}")
         except Exception as e:
             print(f"Errore nel salvare il file: {e}")
     
@@ -1000,6 +973,22 @@ class AIOverviewExtractor:
         try:
             print("🔒 Iniziando chiusura risorse browser...")
             
+            # Interrompi un eventuale trace ancora attivo
+            if self.failure_capture:
+                self.failure_capture.discard()
+                self.failure_capture = None
+            
+            # Chiudi la sessione CDP della telemetria
+            if self.telemetry:
+                self.telemetry.close()
+                self.telemetry = None
+            
+            # Chiudi il driver alternativo se creato dall'estrattore
+            if self.driver is not None and self._owns_driver:
+                self.driver.close()
+                print(f"✅ Driver {self.driver_name} chiuso")
+            self.driver = None
+            
             # Chiudi la pagina
             if hasattr(self, 'page') and self.page:
                 try:
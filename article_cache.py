@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Cache su disco degli articoli scaricati con revalidazione ETag/Last-Modified
+
+Per ogni URL vengono salvati il corpo (HTML decodificato, in UTF-8), gli header di
+validazione, l'hash del contenuto scaricato e il risultato del parsing. Entro la finestra di freschezza l'articolo viene
+servito dalla cache senza richieste di rete; oltre la finestra viene rivalidato con
+If-None-Match/If-Modified-Since e, se il server risponde 304 o il corpo ha lo stesso
+hash, viene riusato il risultato del parsing senza rielaborare l'HTML.
+
+Con il risultato del parsing si salvano anche parser, strategia e versione
+dell'estrazione (`extractor`): se non coincidono con quelli correnti il corpo salvato
+viene rielaborato invece di riusare il risultato.
+
+Configurazione tramite variabili d'ambiente:
+    ARTICLE_CACHE_DIR         cartella della cache (abilita la cache se impostata)
+    ARTICLE_CACHE_FRESHNESS   finestra di freschezza in secondi (default 86400)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Optional, Dict, Any
+
+CACHE_DIR_ENV = 'ARTICLE_CACHE_DIR'
+FRESHNESS_ENV = 'ARTICLE_CACHE_FRESHNESS'
+DEFAULT_FRESHNESS_SECONDS = 24 * 3600
+
+# Header di risposta conservati per la revalidazione e il debug
+STORED_HEADERS = ('etag', 'last-modified', 'content-type', 'cache-control', 'date')
+
+
+def content_hash(body: bytes) -> str:
+    """Hash SHA-256 del corpo della risposta"""
+    return hashlib.sha256(body).hexdigest()
+
+
+class CacheEntry:
+    """
+    Voce della cache di un articolo
+    """
+
+    def __init__(self, url: str, fetched_at: float, headers: Dict[str, str],
+                 content_hash: str, parsed: Dict[str, Any], body_path: str,
+                 extractor: Optional[Dict[str, Any]] = None):
+        self.url = url
+        self.fetched_at = fetched_at
+        self.headers = headers
+        self.content_hash = content_hash
+        self.parsed = parsed
+        self.body_path = body_path
+        self.extractor = extractor
+
+    def age(self) -> float:
+        """Secondi trascorsi dall'ultimo download o revalidazione"""
+        return time.time() - self.fetched_at
+
+    def revalidation_headers(self) -> Dict[str, str]:
+        """Header condizionali per la richiesta di revalidazione"""
+        headers = {}
+        if self.headers.get('etag'):
+            headers['If-None-Match'] = self.headers['etag']
+        if self.headers.get('last-modified'):
+            headers['If-Modified-Since'] = self.headers['last-modified']
+        return headers
+
+    def read_body(self) -> Optional[bytes]:
+        """Corpo salvato (None se mancante)"""
+        try:
+            with open(self.body_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+class ArticleCache:
+    """
+    Cache persistente degli articoli indicizzata per URL
+    """
+
+    def __init__(self, directory: Optional[str] = None, freshness_seconds: Optional[float] = None):
+        """
+        Args:
+            directory: Cartella della cache (default: ARTICLE_CACHE_DIR o .article_cache)
+            freshness_seconds: Finestra in cui la voce è servita senza rivalidare
+                (default: ARTICLE_CACHE_FRESHNESS o 24 ore)
+        """
+        self.directory = directory or os.environ.get(CACHE_DIR_ENV, '.article_cache')
+        if freshness_seconds is None:
+            freshness_seconds = float(os.environ.get(FRESHNESS_ENV, DEFAULT_FRESHNESS_SECONDS))
+        self.freshness_seconds = freshness_seconds
+        os.makedirs(self.directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> Optional['ArticleCache']:
+        """Crea la cache solo se ARTICLE_CACHE_DIR è impostata"""
+        if os.environ.get(CACHE_DIR_ENV):
+            return cls()
+        return None
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key[:2], key)
+        return base + '.json', base + '.body'
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """
+        Restituisce la voce in cache per l'URL
+
+        Args:
+            url: URL dell'articolo
+
+        Returns:
+            CacheEntry o None se assente o illeggibile
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url:
+            return None
+        return CacheEntry(url, meta['fetched_at'], meta.get('headers', {}),
+                          meta['content_hash'], meta['parsed'], body_path, meta.get('extractor'))
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """True se la voce è nella finestra di freschezza"""
+        return entry.age() < self.freshness_seconds
+
+    def store(self, url: str, headers, body: Optional[bytes], body_hash: str,
+              parsed: Dict[str, Any], extractor: Optional[Dict[str, Any]] = None,
+              fetched_at: Optional[float] = None) -> CacheEntry:
+        """
+        Salva o aggiorna la voce di un articolo
+
+        Args:
+            url: URL dell'articolo
+            headers: Header della risposta (mapping case-insensitive)
+            body: Corpo da salvare (None per aggiornare solo i metadati dopo un 304)
+            body_hash: Hash del corpo
+            parsed: Risultato del parsing da riusare
+            extractor: Parser, strategia e versione che hanno prodotto `parsed`
+                (html_extraction.extractor_signature)
+            fetched_at: Data del download (default: ora)
+
+        Returns:
+            CacheEntry aggiornata
+        """
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+
+        if body is not None:
+            self._write_atomic(body_path, body)
+
+        stored_headers = {name: headers[name] for name in STORED_HEADERS if headers.get(name)}
+        meta = {
+            'url': url,
+            'fetched_at': fetched_at or time.time(),
+            'headers': stored_headers,
+            'content_hash': body_hash,
+            'parsed': parsed,
+            'extractor': extractor,
+        }
+        self._write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+        return CacheEntry(url, meta['fetched_at'], stored_headers, body_hash, parsed, body_path, extractor)
+
+    def refresh(self, entry: CacheEntry, headers=None) -> CacheEntry:
+        """Aggiorna data e header di una voce rivalidata senza riscrivere il corpo"""
+        merged = dict(entry.headers)
+        if headers is not None:
+            merged.update({name: headers[name] for name in STORED_HEADERS if headers.get(name)})
+        return self.store(entry.url, merged, None, entry.content_hash, entry.parsed, entry.extractor)
+
+    def prime(self, url: str, headers, body: bytes, body_hash: str) -> CacheEntry:
+        """
+        Salva un corpo già scaricato (es. dal crawler) senza elaborarlo
+
+        La voce non ha un estrattore, quindi alla prima lettura il corpo viene elaborato
+        senza scaricare di nuovo la pagina.
+        """
+        return self.store(url, headers, body, body_hash, {})
+
+    def replace_parsed(self, entry: CacheEntry, parsed: Dict[str, Any],
+                       extractor: Optional[Dict[str, Any]]) -> CacheEntry:
+        """Sostituisce il risultato del parsing di una voce mantenendone data e corpo"""
+        return self.store(entry.url, entry.headers, None, entry.content_hash, parsed, extractor,
+                          fetched_at=entry.fetched_at)
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        # File temporaneo univoco: più thread possono salvare lo stesso URL
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Rappresentazione unica e immutabile di un articolo per tutte le fasi di analisi
+
+L'articolo viene elaborato una volta sola: testo estratto, forma minuscola,
+token con le loro posizioni, inizio delle frasi, struttura degli heading e hash del
+contenuto. Estrazione degli argomenti, copertura esatta e per sinonimi, analisi
+della qualità e prompt Gemini di ContentGapAnalyzer leggono lo stesso documento,
+senza ripetere lower/split/tokenizzazione sul testo grezzo.
+
+Le posizioni sono memorizzate in array compatti (`array('l')`), gli heading in
+tuple di `Heading`. Le posizioni dei token si riferiscono al testo minuscolo, quelle
+di frasi e heading al testo estratto.
+
+Gli heading e gli intervalli dei paragrafi formano l'albero delle sezioni (`Section`):
+la sezione 0 è l'introduzione prima del primo heading, ogni heading apre una sezione
+figlia dell'heading precedente di livello inferiore.
+"""
+
+import hashlib
+import re
+from array import array
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+# Token alfanumerici del testo minuscolo
+_TOKEN_RE = re.compile(r'\w+')
+
+# Fine frase: punteggiatura finale seguita da spazio (tokenizzazione offline, senza dati NLTK)
+_SENTENCE_END_RE = re.compile(r'[.!?…]+["»”’)\]]*\s+')
+
+
+class Heading(NamedTuple):
+    """Heading dell'articolo con posizione nel testo"""
+    level: int
+    text: str
+    offset: int
+
+
+class Section(NamedTuple):
+    """Sezione dell'articolo: heading, intervalli nel testo e paragrafi"""
+    level: int                            # 0 per l'introduzione
+    title: str
+    start: int                            # posizione dell'heading
+    body_end: int                         # fine del testo proprio (prossimo heading)
+    end: int                              # fine della sezione con le sottosezioni
+    parent: int                           # indice della sezione padre (-1 per l'introduzione)
+    paragraphs: Tuple[Tuple[int, int], ...]
+
+
+def build_sections(text: str, title: str, headings: Sequence[Heading],
+                   paragraphs: Optional[Sequence[Sequence[int]]] = None) -> Tuple[Section, ...]:
+    """
+    Albero delle sezioni dagli heading e dagli intervalli dei paragrafi
+
+    Args:
+        text: Contenuto dell'articolo
+        title: Titolo dell'articolo (titolo dell'introduzione)
+        headings: Heading ordinati per posizione
+        paragraphs: Intervalli [inizio, fine) dei paragrafi; se assenti il testo proprio
+            di ogni sezione conta come un unico paragrafo
+
+    Returns:
+        tuple[Section]: Sezioni in ordine di testo, l'introduzione per prima
+    """
+    length = len(text)
+    bounds = [(0, 0, title)] + [(heading.level, heading.offset, heading.text) for heading in headings]
+    sections = []
+    stack = []
+    for index, (level, start, heading_title) in enumerate(bounds):
+        body_end = bounds[index + 1][1] if index + 1 < len(bounds) else length
+        end = next((other[1] for other in bounds[index + 1:] if other[0] <= level), length) if index else length
+        while stack and bounds[stack[-1]][0] >= level:
+            stack.pop()
+        parent = stack[-1] if stack else -1
+        stack.append(index)
+        sections.append([level, heading_title, start, body_end, end, parent, []])
+
+    if paragraphs is None:
+        for section in sections:
+            if section[3] > section[2]:
+                section[6].append((section[2], section[3]))
+    else:
+        # Paragrafi e sezioni sono ordinati per posizione: un solo passaggio
+        current = 0
+        for start, end in paragraphs:
+            while current + 1 < len(sections) and sections[current + 1][2] <= start:
+                current += 1
+            sections[current][6].append((int(start), int(end)))
+
+    return tuple(
+        Section(level, heading_title, start, body_end, end, parent, tuple(spans))
+        for level, heading_title, start, body_end, end, parent, spans in sections
+    )
+
+
+def text_digest(text: str) -> str:
+    """Hash del testo dell'articolo (ArticleDocument.content_hash)"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def sentence_starts(text: str) -> array:
+    """Posizione iniziale di ogni frase del testo"""
+    if not text:
+        return array('l')
+    starts = array('l', [0])
+    for match in _SENTENCE_END_RE.finditer(text):
+        if match.end() < len(text):
+            starts.append(match.end())
+    return starts
+
+
+class ArticleDocument:
+    """
+    Articolo normalizzato una volta sola (record immutabile con __slots__)
+    """
+
+    __slots__ = ('url', 'title', 'text', 'lower', 'tokens', 'token_offsets',
+                 'sentence_offsets', 'headings', 'sections', 'word_count', 'content_hash')
+
+    def __init__(self, url: Optional[str], title: str, text: str, lower: str,
+                 tokens: Tuple[str, ...], token_offsets: array, sentence_offsets: array,
+                 headings: Tuple[Heading, ...], sections: Tuple[Section, ...], word_count: int,
+                 content_hash: str):
+        for name, value in zip(self.__slots__, (url, title, text, lower, tokens, token_offsets,
+                                                sentence_offsets, headings, sections, word_count,
+                                                content_hash)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"ArticleDocument è immutabile: impossibile impostare {name!r}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"ArticleDocument è immutabile: impossibile eliminare {name!r}")
+
+    def __reduce__(self):
+        # Necessario per pickle/copy, che altrimenti imposterebbero gli slot uno per uno
+        return self.__class__, tuple(getattr(self, name) for name in self.__slots__)
+
+    def __len__(self):
+        return len(self.text)
+
+    def __repr__(self):
+        return (f"ArticleDocument({self.url or self.title!r}, tokens={len(self.tokens)}, "
+                f"sentences={len(self.sentence_offsets)}, digest={self.content_hash[:12]})")
+
+    @property
+    def sentence_count(self) -> int:
+        return len(self.sentence_offsets)
+
+    def sentences(self) -> Iterable[str]:
+        """Frasi del testo, ricavate dalle posizioni"""
+        offsets = self.sentence_offsets
+        for index, start in enumerate(offsets):
+            end = offsets[index + 1] if index + 1 < len(offsets) else len(self.text)
+            yield self.text[start:end].strip()
+
+    @classmethod
+    def from_text(cls, text: str, title: str = '', url: Optional[str] = None,
+                  headings: Iterable[Dict[str, Any]] = (),
+                  paragraphs: Optional[Sequence[Sequence[int]]] = None) -> 'ArticleDocument':
+        """
+        Costruisce il documento da un testo già estratto
+
+        Args:
+            text: Contenuto dell'articolo
+            title: Titolo dell'articolo
+            url: URL dell'articolo
+            headings: Heading {level, text, offset} prodotti da html_extraction
+            paragraphs: Intervalli [inizio, fine) dei paragrafi prodotti da html_extraction
+
+        Returns:
+            ArticleDocument
+        """
+        if not isinstance(text, str):
+            text = str(text)
+        lower = text.lower()
+
+        tokens = []
+        token_offsets = array('l')
+        for match in _TOKEN_RE.finditer(lower):
+            tokens.append(match.group())
+            token_offsets.append(match.start())
+
+        headings = tuple(
+            Heading(int(heading['level']), heading['text'], int(heading['offset']))
+            for heading in headings
+        )
+        return cls(
+            url=url,
+            title=title or '',
+            text=text,
+            lower=lower,
+            tokens=tuple(tokens),
+            token_offsets=token_offsets,
+            sentence_offsets=sentence_starts(text),
+            headings=headings,
+            sections=build_sections(text, title or '', headings, paragraphs),
+            word_count=len(text.split()),
+            content_hash=text_digest(text)
+        )
+
+    @classmethod
+    def from_article_data(cls, article_data: Dict[str, Any]) -> 'ArticleDocument':
+        """Costruisce il documento dal risultato di ContentGapAnalyzer.extract_article_content"""
+        return cls.from_text(
+            article_data.get('content', ''),
+            title=article_data.get('title', ''),
+            url=article_data.get('url'),
+            headings=article_data.get('headings', ()),
+            paragraphs=article_data.get('paragraphs')
+        )
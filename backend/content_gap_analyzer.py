@@ -20,6 +20,7 @@ import string
 import os
 import google.generativeai as genai
 from typing import Optional, Dict, List, Any
+from http_client import HttpClient, get_http_client, classify_error
 
 # Importa il nuovo analizzatore semantico
 try:
@@ -83,14 +84,17 @@ class ContentGapAnalyzer:
         # Se tutto fallisce, restituisce una stringa vuota
         return ""
     
-    def __init__(self, gemini_api_key: Optional[str] = None, use_semantic_analysis: bool = True):
+    def __init__(self, gemini_api_key: Optional[str] = None, use_semantic_analysis: bool = True,
+                 http_client: Optional[HttpClient] = None):
         """
         Inizializza l'analizzatore
         
         Args:
             gemini_api_key: Chiave API Google Gemini (usa chiave integrata se None)
             use_semantic_analysis: Se utilizzare l'analisi semantica avanzata (default: True)
+            http_client: Client HTTP per scaricare gli articoli (default: client condiviso)
         """
+        self.http_client = http_client or get_http_client()
         self.ai_overview_content = ""
         self.ai_overview_topics = []
         # Abilita automaticamente l'analisi semantica con chiave integrata
@@ -165,14 +169,11 @@ class ContentGapAnalyzer:
             dict: Contenuto dell'articolo estratto
         """
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
+            # Sessione condivisa: keep-alive, retry con backoff e timeout (connect, read);
+            # download in streaming con limite di dimensione e controllo del content-type
+            fetched = self.http_client.fetch_html(url)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(fetched.text, 'html.parser')
             
             # Rimuovi script e style
             for script in soup(["script", "style"]):
@@ -230,7 +231,8 @@ class ContentGapAnalyzer:
                 'title': '',
                 'content': '',
                 'success': False,
-                'error': str(e)
+                'error': str(e),
+                'error_type': classify_error(e)
             }
     
     def extract_topics(self, text):
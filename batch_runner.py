@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Analisi batch di liste di URL con output JSONL in streaming e ripresa
+
+Ogni articolo analizzato viene accodato come una riga JSON al file di output appena
+termina, quindi la memoria resta costante anche con decine di migliaia di URL. Al
+riavvio gli URL già presenti nel file vengono saltati: un batch interrotto (crash,
+Ctrl+C) riprende da dove si era fermato. Una riga finale incompleta, scritta durante
+un crash, viene rimossa prima di riprendere. Alla ripresa le righe già presenti
+alimentano il riepilogo finale, che copre quindi l'intero file di output.
+
+Gli URL si leggono in streaming da file o da stdin (uno per riga, righe vuote e
+commenti `#` ignorati) e vengono analizzati con un numero limitato di worker; le
+analisi in corso non superano mai 2 × worker.
+
+In alternativa alla lista, gli URL possono arrivare direttamente dal crawler del
+sito (site_crawler.py: sitemap o link interni), sempre in streaming. Le pagine
+scaricate dal crawler vengono passate all'analisi tramite la cache degli articoli
+(ARTICLE_CACHE_DIR, oppure una cache temporanea per la sola esecuzione), quindi ogni
+pagina viene scaricata una volta sola.
+
+Uso:
+    python batch_runner.py ai_overview_result.json urls.txt -o risultati.jsonl
+    cat urls.txt | python batch_runner.py overview.txt - -o risultati.jsonl --workers 16
+    python batch_runner.py overview.json urls.txt -o risultati.jsonl --retry-failed
+    python batch_runner.py overview.json --crawl https://www.esempio.it -o risultati.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO
+
+from site_crawler import SeenUrls
+from summary_aggregator import SummaryAggregator
+
+DEFAULT_WORKERS = 8
+
+
+def iter_urls(lines: Iterable[str]) -> Iterator[str]:
+    """URL da una sequenza di righe, ignorando righe vuote e commenti"""
+    for line in lines:
+        url = line.strip()
+        if url and not url.startswith('#'):
+            yield url
+
+
+def load_overview_text(path: str) -> str:
+    """
+    Testo dell'AI Overview da file
+
+    Args:
+        path: File JSON prodotto dall'estrattore (campo full_content) o file di testo
+
+    Returns:
+        str: Contenuto dell'AI Overview
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = f.read()
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        return raw
+    if isinstance(data, dict):
+        if not data.get('found', True):
+            raise ValueError(f"AI Overview non trovato nel file {path}")
+        return data.get('full_content') or data.get('content') or ''
+    return raw
+
+
+def _repair_tail(path: str):
+    """Rimuove l'eventuale ultima riga incompleta (scrittura interrotta)"""
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b'\n':
+            return
+        # Cerca all'indietro l'ultimo a capo
+        position = size
+        while position > 0:
+            step = min(65536, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            newline = chunk.rfind(b'\n')
+            if newline != -1:
+                f.truncate(position + newline + 1)
+                print(f"⚠️ Rimossa riga incompleta in coda a {path}")
+                return
+        f.truncate(0)
+
+
+def load_completed(path: str, retry_failed: bool = False,
+                   stats: Optional['BatchStats'] = None) -> SeenUrls:
+    """
+    URL già analizzati nel file di output (checkpoint)
+
+    Gli URL sono conservati come hash da 8 byte (SeenUrls), quindi la memoria resta
+    contenuta anche con milioni di righe. Se viene passato `stats`, le righe già
+    presenti alimentano il riepilogo, che copre così l'intero file di output e non
+    solo gli articoli analizzati in questa esecuzione.
+
+    Args:
+        path: File JSONL di output
+        retry_failed: Se True le analisi fallite non contano come completate
+            (e non entrano nel riepilogo, perché verranno ripetute)
+        stats: Contatori del batch da alimentare con le righe esistenti
+
+    Returns:
+        SeenUrls: URL da saltare
+    """
+    completed = SeenUrls()
+    if not os.path.exists(path):
+        return completed
+
+    _repair_tail(path)
+    failed = SeenUrls()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️ Riga {line_number} non valida in {path}: ignorata")
+                continue
+            url = record.get('url')
+            if not url:
+                continue
+            if record.get('success', False):
+                if completed.add(url) and stats is not None:
+                    stats.aggregator.add(record)
+            elif not retry_failed:
+                failed.add(url)
+
+    # URL falliti (una volta sola, anche se ripetuti) e mai riusciti in seguito
+    failures = completed.merge(failed)
+    if stats is not None:
+        stats.aggregator.add_failures(failures)
+        stats.resumed = len(completed)
+    return completed
+
+
+class BatchStats:
+    """
+    Contatori e riepilogo incrementali del batch (memoria costante)
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.skipped = 0
+        self.processed = 0
+        # URL ripresi dal file di output (già inclusi nel riepilogo)
+        self.resumed = 0
+        self.aggregator = SummaryAggregator()
+
+    def add(self, record: Dict[str, Any]):
+        self.processed += 1
+        self.aggregator.add(record)
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.time() - self.started_at
+        summary = {
+            'processed': self.processed,
+            'resumed': self.resumed,
+            'skipped': self.skipped,
+            'elapsed_seconds': round(elapsed, 2),
+            'articles_per_second': round(self.processed / elapsed, 3) if elapsed > 0 else None
+        }
+        summary.update(self.aggregator.snapshot())
+        return summary
+
+
+def _analyze(analyzer, url: str) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        record = analyzer.analyze_article_gap(url)
+    except Exception as e:
+        record = {'url': url, 'success': False, 'error': str(e)}
+    record['elapsed_seconds'] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def run_batch(analyzer, urls: Iterable[str], output: TextIO, completed: Optional[SeenUrls] = None,
+              workers: int = DEFAULT_WORKERS, stats: Optional[BatchStats] = None) -> BatchStats:
+    """
+    Analizza gli URL accodando una riga JSON per articolo appena termina
+
+    Args:
+        analyzer: ContentGapAnalyzer con l'AI Overview già caricato
+        urls: URL da analizzare (consumati in streaming)
+        output: File JSONL aperto in append
+        completed: URL da saltare (checkpoint); viene aggiornato con gli URL analizzati
+        workers: Numero di worker
+        stats: Contatori da aggiornare
+
+    Returns:
+        BatchStats: Contatori del batch
+    """
+    completed = completed if completed is not None else SeenUrls()
+    stats = stats or BatchStats()
+    workers = max(1, workers)
+    max_pending = workers * 2
+
+    def write(record):
+        output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        output.flush()
+        stats.add(record)
+        status = '✅' if record.get('success') else '❌'
+        print(f"{status} [{stats.processed}] {record.get('url')} ({record['elapsed_seconds']}s)")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch') as executor:
+        pending = set()
+        try:
+            for url in urls:
+                if not completed.add(url):
+                    stats.skipped += 1
+                    continue
+                pending.add(executor.submit(_analyze, analyzer, url))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        write(future.result())
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write(future.result())
+        except KeyboardInterrupt:
+            print("\n⏹️ Interruzione: attendo le analisi in corso (riprendi rilanciando lo stesso comando)")
+            for future in pending:
+                if not future.cancel():
+                    write(future.result())
+            raise
+
+    return stats
+
+
+def main():
+    """Entry point CLI"""
+    parser = argparse.ArgumentParser(description="Analisi content gap batch con output JSONL e ripresa")
+    parser.add_argument('overview', help="File dell'AI Overview (JSON dell'estrattore o testo)")
+    parser.add_argument('urls', nargs='?', help="File con un URL per riga, '-' per stdin")
+    parser.add_argument('-o', '--output', required=True, help="File JSONL dei risultati (append)")
+    parser.add_argument('--workers', type=int,
+                        default=int(os.environ.get('ANALYZER_MAX_WORKERS', DEFAULT_WORKERS)),
+                        help="Analisi in parallelo (default: ANALYZER_MAX_WORKERS o 8)")
+    parser.add_argument('--retry-failed', action='store_true',
+                        help="Rianalizza gli URL falliti nelle esecuzioni precedenti")
+    parser.add_argument('--basic', action='store_true', help="Usa solo l'analisi base (senza Gemini)")
+    parser.add_argument('--summary', help="File JSON in cui salvare il riepilogo finale")
+    parser.add_argument('--crawl', metavar='SITE_URL',
+                        help="Analizza le pagine del sito (sitemap da robots.txt, altrimenti link interni)")
+    parser.add_argument('--sitemap', action='append', help="Analizza gli URL di una sitemap (ripetibile)")
+    parser.add_argument('--max-depth', type=int, default=2, help="Profondità della visita dei link con --crawl")
+    parser.add_argument('--max-pages', type=int, help="Numero massimo di pagine raccolte dal crawler")
+    args = parser.parse_args()
+    if bool(args.urls) == bool(args.crawl or args.sitemap):
+        parser.error("indicare un file di URL oppure --crawl/--sitemap")
+
+    from content_gap_analyzer import ContentGapAnalyzer
+
+    analyzer = ContentGapAnalyzer(use_semantic_analysis=not args.basic)
+    analyzer.load_ai_overview(load_overview_text(args.overview))
+
+    stats = BatchStats()
+    completed = load_completed(args.output, retry_failed=args.retry_failed, stats=stats)
+    if len(completed):
+        print(f"🔁 Ripresa: {len(completed)} URL già presenti in {args.output} (inclusi nel riepilogo)")
+
+    url_source = None
+    temporary_cache = None
+    if args.urls:
+        url_source = sys.stdin if args.urls == '-' else open(args.urls, 'r', encoding='utf-8')
+        urls = iter_urls(url_source)
+    else:
+        from article_cache import ArticleCache
+        from site_crawler import SiteCrawler
+        if analyzer.article_cache is None:
+            # Le pagine scaricate dal crawler vengono riusate dall'analisi
+            temporary_cache = tempfile.TemporaryDirectory(prefix='crawl_cache_')
+            analyzer.article_cache = ArticleCache(temporary_cache.name)
+        crawler = SiteCrawler(max_depth=args.max_depth, max_pages=args.max_pages,
+                              article_cache=analyzer.article_cache)
+        urls = crawler.iter_sitemap_urls(args.sitemap) if args.sitemap else crawler.iter_site_urls(args.crawl)
+
+    interrupted = False
+    try:
+        with open(args.output, 'a', encoding='utf-8') as output:
+            run_batch(analyzer, urls, output, completed, args.workers, stats)
+    except KeyboardInterrupt:
+        interrupted = True
+    finally:
+        if url_source is not None and url_source is not sys.stdin:
+            url_source.close()
+        if temporary_cache is not None:
+            temporary_cache.cleanup()
+
+    summary = stats.summary()
+    summary['interrupted'] = interrupted
+    print("\n=== RIEPILOGO BATCH ===")
+    for key, value in summary.items():
+        if isinstance(value, list) and len(value) > 10:
+            value = f"{value[:10]} ... ({len(value)} in totale)"
+        print(f"{key}: {value}")
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"📁 Riepilogo salvato in: {args.summary}")
+    if interrupted:
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark della strategia di individuazione del contenuto principale
+
+Confronta, su un corpus di HTML salvati, la strategia a selettori (primo match tra
+CONTENT_SELECTORS o tutto il body) con il punteggio dei blocchi (content_scoring.py):
+parole estratte, riduzione del testo e millisecondi per pagina.
+
+Uso:
+    python benchmarks/bench_content_scoring.py
+    python benchmarks/bench_content_scoring.py --corpus /percorso/html_salvati --repeat 20 --show
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_extraction import extract_with_lxml, extract_with_scoring  # noqa: E402
+from bench_html_parsers import CORPUS_DIR, load_corpus  # noqa: E402
+
+
+def time_extraction(extract, html, repeat):
+    """Esegue l'estrazione repeat volte e restituisce (output, ms per pagina)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        output = extract(html)
+    return output, (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del punteggio del contenuto principale")
+    parser.add_argument('--corpus', default=CORPUS_DIR, help="Cartella con gli HTML salvati")
+    parser.add_argument('--repeat', type=int, default=10, help="Ripetizioni per pagina")
+    parser.add_argument('--show', action='store_true', help="Mostra l'inizio del testo estratto")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        print(f"❌ Nessun HTML in {args.corpus}")
+        sys.exit(1)
+
+    print(f"{'pagina':<28}{'parole sel.':>12}{'parole score':>14}{'riduzione':>11}{'ms sel.':>10}{'ms score':>10}")
+    totals = {'selectors_words': 0, 'scoring_words': 0, 'selectors_ms': 0.0, 'scoring_ms': 0.0}
+    for name, html in pages:
+        selectors, selectors_ms = time_extraction(extract_with_lxml, html, args.repeat)
+        scoring, scoring_ms = time_extraction(extract_with_scoring, html, args.repeat)
+        words_before, words_after = selectors['word_count'], scoring['word_count']
+        shrink = (1 - words_after / words_before) * 100 if words_before else 0.0
+
+        totals['selectors_words'] += words_before
+        totals['scoring_words'] += words_after
+        totals['selectors_ms'] += selectors_ms
+        totals['scoring_ms'] += scoring_ms
+
+        print(f"{name[:27]:<28}{words_before:>12}{words_after:>14}{shrink:>10.1f}%{selectors_ms:>10.2f}{scoring_ms:>10.2f}")
+        if args.show:
+            print(f"   {scoring['content'][:160]}...")
+
+    count = len(pages)
+    total_shrink = (1 - totals['scoring_words'] / totals['selectors_words']) * 100 if totals['selectors_words'] else 0.0
+    print(f"\n📊 Totale: {totals['selectors_words']} -> {totals['scoring_words']} parole "
+          f"({total_shrink:.1f}% in meno), {totals['selectors_ms'] / count:.2f} -> "
+          f"{totals['scoring_ms'] / count:.2f} ms per pagina")
+
+
+if __name__ == "__main__":
+    main()
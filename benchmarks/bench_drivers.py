@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark comparativo dei driver del browser per l'estrazione AI Overview
+
+Esegue lo stesso set di fixture HTML (benchmarks/fixtures/serp) attraverso ogni driver
+(Playwright sync, Playwright async, replay HTML) e riporta latenza per pagina e memoria.
+Le fixture includono sezioni "Mostra altro" (contenuto nascosto con aria-controls e
+onclick): Playwright esegue lo script di espansione, il driver di replay lo emula.
+
+Uso:
+    python benchmarks/bench_drivers.py
+    python benchmarks/bench_drivers.py --drivers replay playwright --repeat 5
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_overview_extractor import AIOverviewExtractor  # noqa: E402
+from browser_drivers import create_driver  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'serp')
+DRIVERS = ['replay', 'playwright', 'playwright_async']
+
+
+def process_tree_rss():
+    """RSS del processo corrente più i figli (Chromium), in byte"""
+    try:
+        import psutil
+        process = psutil.Process()
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+    except ImportError:
+        import resource
+        # Solo processo corrente (ru_maxrss è in KB su Linux)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def load_fixtures(directory):
+    """Carica le fixture HTML ordinate per nome"""
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            fixtures.append((os.path.basename(path), f.read()))
+    return fixtures
+
+
+def run_driver(driver_name, fixtures, repeat):
+    """Esegue tutte le fixture su un driver e restituisce le statistiche"""
+    tracemalloc.start()
+    rss_before = process_tree_rss()
+    startup_start = time.perf_counter()
+    driver = create_driver(driver_name, headless=True)
+    startup = time.perf_counter() - startup_start
+    extractor = AIOverviewExtractor(headless=True, collect_telemetry=False, driver=driver)
+
+    latencies = []
+    outputs = {}
+    try:
+        for _ in range(repeat):
+            for name, html in fixtures:
+                driver.set_content(html)
+                start = time.perf_counter()
+                result = extractor.extract_ai_overview()
+                latencies.append(time.perf_counter() - start)
+                outputs[name] = len(result.get('full_content', '')) if result.get('found') else 0
+        rss_after = process_tree_rss()
+        _, python_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        driver.close()
+
+    return {
+        'driver': driver_name,
+        'startup_s': startup,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'max_ms': max(latencies) * 1000,
+        'python_peak_mb': python_peak / 1048576,
+        'rss_delta_mb': (rss_after - rss_before) / 1048576,
+        'outputs': outputs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dei driver del browser")
+    parser.add_argument('--drivers', nargs='+', default=DRIVERS, choices=DRIVERS)
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help="Cartella con le fixture HTML")
+    parser.add_argument('--repeat', type=int, default=3, help="Ripetizioni per fixture")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print(f"❌ Nessuna fixture in {args.fixtures}")
+        sys.exit(1)
+
+    results = []
+    for driver_name in args.drivers:
+        print(f"\n🏁 Driver: {driver_name}")
+        try:
+            results.append(run_driver(driver_name, fixtures, args.repeat))
+        except Exception as e:
+            print(f"❌ Driver {driver_name} non disponibile: {e}")
+
+    print(f"\n{'driver':<18}{'avvio s':>10}{'p50 ms':>10}{'max ms':>10}{'py peak MB':>12}{'RSS Δ MB':>10}")
+    for r in results:
+        print(f"{r['driver']:<18}{r['startup_s']:>10.2f}{r['p50_ms']:>10.1f}{r['max_ms']:>10.1f}"
+              f"{r['python_peak_mb']:>12.1f}{r['rss_delta_mb']:>10.1f}")
+
+    # Parità dell'output: caratteri estratti per fixture con ogni driver
+    print("\n📄 Caratteri estratti per fixture:")
+    for name, _ in fixtures:
+        row = ', '.join(f"{r['driver']}={r['outputs'].get(name, 0)}" for r in results)
+        print(f"- {name}: {row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark della ricerca fuzzy dei topic: indice di trigrammi contro confronto completo
+
+Genera insiemi di topic (n-grammi del corpus di articoli con varianti: refusi,
+plurali, parole aggiunte) da centinaia a migliaia di elementi e confronta il ciclo
+completo con SequenceMatcher (come il vecchio _analyze_with_basic_method) con
+FuzzyMatcher, riportando tempi e concordanza delle fasce di similarità
+(> 0.8, > 0.6, > 0.4, nessuna).
+
+Il confronto completo è quadratico: per gli insiemi grandi viene misurato su un
+campione di query e il tempo totale viene stimato.
+
+Uso:
+    python benchmarks/bench_fuzzy.py
+    python benchmarks/bench_fuzzy.py --sizes 100 1000 5000 --sample 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fuzzy_matcher import FuzzyMatcher  # noqa: E402
+from html_extraction import extract_with_scoring  # noqa: E402
+from topic_engine import TopicEngine  # noqa: E402
+from bench_html_parsers import CORPUS_DIR, load_corpus  # noqa: E402
+from bench_topics import load_stop_words  # noqa: E402
+
+SIZES = [100, 1000, 5000]
+
+
+def bucket(similarity):
+    """Fascia di similarità usata dall'analisi base"""
+    if similarity > 0.8:
+        return 'alta'
+    if similarity > 0.6:
+        return 'media'
+    if similarity > 0.4:
+        return 'bassa'
+    return 'nessuna'
+
+
+def mutate(topic, rng):
+    """Variante di un topic: refuso, plurale/singolare, parola aggiunta o tolta"""
+    choice = rng.random()
+    words = topic.split()
+    if choice < 0.25 and len(topic) > 4:
+        position = rng.randrange(1, len(topic) - 1)
+        return topic[:position] + rng.choice('aeiourstln') + topic[position + 1:]
+    if choice < 0.5:
+        return ' '.join(word[:-1] + ('i' if word.endswith(('o', 'e')) else 'e') for word in words)
+    if choice < 0.75 and len(words) > 1:
+        return ' '.join(words[:-1])
+    return f"{topic} {rng.choice(['moderni', 'aziendali', 'digitali', 'avanzati', 'online'])}"
+
+
+def build_topics(base_topics, size, seed):
+    """Insieme di `size` topic ottenuti dai topic di base e dalle loro varianti"""
+    rng = random.Random(seed)
+    topics = list(base_topics[:size])
+    while len(topics) < size:
+        topics.append(mutate(rng.choice(base_topics), rng))
+    rng.shuffle(topics)
+    return topics
+
+
+def brute_force(query, candidates):
+    """Ciclo completo con SequenceMatcher (implementazione precedente)"""
+    best_match, best_similarity = None, 0
+    for candidate in candidates:
+        similarity = SequenceMatcher(None, query.lower(), candidate.lower()).ratio()
+        if similarity > best_similarity:
+            best_similarity, best_match = similarity, candidate
+    return best_match, best_similarity
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark della ricerca fuzzy dei topic")
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES, help="Numero di topic per lato")
+    parser.add_argument('--sample', type=int, default=200, help="Query misurate con il confronto completo")
+    parser.add_argument('--top-k', type=int, default=10)
+    args = parser.parse_args()
+
+    engine = TopicEngine(load_stop_words(), min_count=1, top_k=100000)
+    corpus = [extract_with_scoring(html)['content'] for _, html in load_corpus(CORPUS_DIR)]
+    base_topics = engine.extract_from_lower_texts(text.lower() for text in corpus)
+    print(f"📚 {len(base_topics)} topic di base dal corpus")
+
+    print(f"\n{'topic':>7}{'indice ms':>11}{'ricerca ms':>12}{'completo ms':>13}{'speedup':>10}{'fasce uguali':>14}")
+    for size in args.sizes:
+        ai_topics = build_topics(base_topics, size, seed=1)
+        article_topics = build_topics(base_topics, size, seed=2)
+
+        start = time.perf_counter()
+        matcher = FuzzyMatcher(article_topics, top_k=args.top_k)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        indexed = [matcher.best_match(topic) for topic in ai_topics]
+        search_ms = (time.perf_counter() - start) * 1000
+
+        sample = ai_topics[:args.sample]
+        start = time.perf_counter()
+        reference = [brute_force(topic, article_topics) for topic in sample]
+        brute_ms = (time.perf_counter() - start) * 1000 * len(ai_topics) / len(sample)
+
+        agreement = sum(
+            bucket(found[1]) == bucket(expected[1])
+            for found, expected in zip(indexed, reference)
+        ) / len(sample) * 100
+        estimated = '~' if len(sample) < len(ai_topics) else ''
+        speedup = brute_ms / (build_ms + search_ms)
+        print(f"{size:>7}{build_ms:>11.1f}{search_ms:>12.1f}{estimated + format(brute_ms, '.0f'):>13}"
+              f"{speedup:>9.0f}x{agreement:>13.1f}%")
+
+
+if __name__ == "__main__":
+    main()
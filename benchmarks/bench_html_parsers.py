@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark dei parser HTML per l'estrazione del contenuto degli articoli
+
+Confronta throughput (pagine/s, MB/s) del percorso storico BeautifulSoup (html.parser)
+con il percorso lxml su un corpus di HTML salvati, e verifica la parità dell'output
+(titolo, contenuto e conteggio parole) rispetto al percorso bs4.
+
+Uso:
+    python benchmarks/bench_html_parsers.py
+    python benchmarks/bench_html_parsers.py --corpus /percorso/html_salvati --repeat 20
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_extraction import PARSERS  # noqa: E402
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'articles')
+REFERENCE_PARSER = 'bs4'
+
+
+def load_corpus(directory):
+    """Carica gli HTML del corpus (*.html, *.htm) come testo"""
+    pages = []
+    for pattern in ('*.html', '*.htm'):
+        for path in sorted(glob.glob(os.path.join(directory, pattern))):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def run_parser(name, pages, repeat):
+    """Estrae tutte le pagine con un parser e restituisce tempi e output"""
+    extract = PARSERS[name]
+    outputs = {}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page_name, html in pages:
+            outputs[page_name] = extract(html)
+    elapsed = time.perf_counter() - start
+    total_bytes = sum(len(html.encode('utf-8')) for _, html in pages) * repeat
+    return {
+        'parser': name,
+        'seconds': elapsed,
+        'pages_per_s': len(pages) * repeat / elapsed if elapsed else 0,
+        'mb_per_s': total_bytes / 1048576 / elapsed if elapsed else 0,
+        'outputs': outputs,
+    }
+
+
+def parity(reference, candidate):
+    """Confronto dell'output di un parser con quello di riferimento"""
+    title_match = reference['title'] == candidate['title']
+    exact = reference['content'] == candidate['content']
+    ratio = 1.0 if exact else SequenceMatcher(
+        None, reference['content'].split(), candidate['content'].split(), autojunk=False
+    ).ratio()
+    return title_match, exact, ratio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dei parser HTML per gli articoli")
+    parser.add_argument('--corpus', default=CORPUS_DIR, help="Cartella con gli HTML salvati")
+    parser.add_argument('--parsers', nargs='+', default=sorted(PARSERS), choices=sorted(PARSERS))
+    parser.add_argument('--repeat', type=int, default=10, help="Ripetizioni del corpus")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        print(f"❌ Nessun HTML in {args.corpus}")
+        sys.exit(1)
+
+    parsers = args.parsers if REFERENCE_PARSER in args.parsers else [REFERENCE_PARSER] + args.parsers
+    print(f"📚 Corpus: {len(pages)} pagine, ripetute {args.repeat} volte")
+
+    results = {name: run_parser(name, pages, args.repeat) for name in parsers}
+    reference = results[REFERENCE_PARSER]
+
+    print(f"\n{'parser':<8}{'tempo s':>10}{'pagine/s':>12}{'MB/s':>10}{'speedup':>10}")
+    for name in parsers:
+        r = results[name]
+        speedup = reference['seconds'] / r['seconds'] if r['seconds'] else 0
+        print(f"{name:<8}{r['seconds']:>10.3f}{r['pages_per_s']:>12.1f}{r['mb_per_s']:>10.2f}{speedup:>9.1f}x")
+
+    for name in parsers:
+        if name == REFERENCE_PARSER:
+            continue
+        print(f"\n📄 Parità {name} vs {REFERENCE_PARSER}:")
+        exact_count = 0
+        for page_name, _ in pages:
+            ref_out = reference['outputs'][page_name]
+            out = results[name]['outputs'][page_name]
+            title_match, exact, ratio = parity(ref_out, out)
+            exact_count += exact
+            status = '✅' if exact and title_match else '⚠️'
+            print(f"{status} {page_name}: parole {ref_out['word_count']} -> {out['word_count']}, "
+                  f"similarità {ratio:.3f}, titolo {'uguale' if title_match else 'diverso'}")
+        print(f"Output identico su {exact_count}/{len(pages)} pagine")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark dell'estrazione degli argomenti: TopicEngine contro l'implementazione storica
+
+Genera testi da 1k a 100k parole campionando le frasi del corpus di articoli
+(benchmarks/fixtures/articles) e misura il tempo di estrazione delle due implementazioni,
+con la sovrapposizione tra gli argomenti restituiti.
+
+L'implementazione storica usa word_tokenize/sent_tokenize di NLTK: se i dati 'punkt'
+non sono installati viene misurato solo il nuovo motore.
+
+Uso:
+    python benchmarks/bench_topics.py
+    python benchmarks/bench_topics.py --sizes 1000 10000 100000 --statistic npmi
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_extraction import extract_with_scoring  # noqa: E402
+from topic_engine import TopicEngine, STATISTICS  # noqa: E402
+from bench_html_parsers import CORPUS_DIR, load_corpus  # noqa: E402
+
+SIZES = [1000, 10000, 100000]
+
+FALLBACK_STOP_WORDS = set(['il', 'la', 'di', 'che', 'e', 'a', 'un', 'per', 'in', 'con', 'su', 'da', 'del', 'al', 'alla', 'dei', 'delle', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
+
+
+def load_stop_words():
+    """Stopword italiane e inglesi di NLTK, o il set base dell'analizzatore"""
+    try:
+        from nltk.corpus import stopwords
+        return set(stopwords.words('italian') + stopwords.words('english'))
+    except LookupError:
+        return FALLBACK_STOP_WORDS
+
+
+def legacy_extract_topics(text, stop_words):
+    """Implementazione storica di ContentGapAnalyzer.extract_topics"""
+    from nltk.tokenize import word_tokenize, sent_tokenize
+
+    text = re.sub(r'[^\w\s]', ' ', text.lower())
+    words = word_tokenize(text)
+    filtered_words = [
+        word for word in words
+        if word not in stop_words
+        and len(word) > 2
+        and word.isalpha()
+    ]
+    word_freq = Counter(filtered_words)
+
+    sentences = sent_tokenize(text)
+    key_phrases = []
+    for sentence in sentences:
+        patterns = [
+            r'\b(machine learning|deep learning|intelligenza artificiale|neural network|algoritmi|automazione)\b',
+            r'\b(applicazioni|vantaggi|sfide|definizione|caratteristiche)\b',
+            r'\b(sanità|trasporti|finanza|industria|robotica)\b'
+        ]
+        for pattern in patterns:
+            matches = re.findall(pattern, sentence.lower())
+            key_phrases.extend(matches)
+
+    topics = []
+    for word, freq in word_freq.most_common(20):
+        if freq > 1:
+            topics.append(word)
+    topics.extend(key_phrases)
+
+    seen = set()
+    unique_topics = []
+    for topic in topics:
+        if topic not in seen:
+            seen.add(topic)
+            unique_topics.append(topic)
+    return unique_topics
+
+
+def build_text(sentences, words, seed=42):
+    """Testo di circa `words` parole con frasi campionate dal corpus"""
+    rng = random.Random(seed)
+    parts = []
+    count = 0
+    while count < words:
+        sentence = rng.choice(sentences)
+        parts.append(sentence)
+        count += len(sentence.split())
+    return ' '.join(parts)
+
+
+def best_time(function, repeat):
+    """Tempo minimo su `repeat` esecuzioni e ultimo risultato"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dell'estrazione degli argomenti")
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES, help="Numero di parole dei testi")
+    parser.add_argument('--statistic', default='weighted', choices=STATISTICS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--corpus', default=CORPUS_DIR)
+    args = parser.parse_args()
+
+    corpus_text = ' '.join(extract_with_scoring(html)['content'] for _, html in load_corpus(args.corpus))
+    sentences = [s for s in re.split(r'(?<=[.!?])\s+', corpus_text) if len(s.split()) > 3]
+    if not sentences:
+        print(f"❌ Nessuna frase nel corpus {args.corpus}")
+        sys.exit(1)
+
+    stop_words = load_stop_words()
+    engine = TopicEngine(stop_words, statistic=args.statistic)
+
+    legacy_available = True
+    try:
+        legacy_extract_topics("Prova. Testo di prova.", stop_words)
+    except LookupError:
+        legacy_available = False
+        print("⚠️ Dati NLTK 'punkt' non disponibili: misuro solo TopicEngine")
+
+    print(f"\n{'parole':>8}{'storico ms':>12}{'engine ms':>12}{'speedup':>10}{'argomenti':>11}{'comuni':>8}")
+    for size in args.sizes:
+        text = build_text(sentences, size)
+        engine_time, engine_topics = best_time(lambda: engine.extract(text), args.repeat)
+
+        if legacy_available:
+            legacy_time, legacy_topics = best_time(lambda: legacy_extract_topics(text, stop_words), args.repeat)
+            common = len(set(engine_topics) & set(legacy_topics))
+            print(f"{size:>8}{legacy_time * 1000:>12.1f}{engine_time * 1000:>12.1f}"
+                  f"{legacy_time / engine_time:>9.1f}x{len(engine_topics):>11}{common:>8}")
+        else:
+            print(f"{size:>8}{'-':>12}{engine_time * 1000:>12.1f}{'-':>10}{len(engine_topics):>11}{'-':>8}")
+
+    print(f"\n🏷️ Argomenti ({args.statistic}, {args.sizes[0]} parole): {', '.join(engine.extract(build_text(sentences, args.sizes[0]))[:12])}")
+
+
+if __name__ == "__main__":
+    main()
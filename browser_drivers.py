@@ -0,0 +1,632 @@
+#!/usr/bin/env python3
+"""
+Driver del browser per l'estrazione dell'AI Overview
+
+La logica di estrazione di `AIOverviewExtractor` usa solo questa piccola interfaccia
+(un sottoinsieme dell'API Page/Locator di Playwright), così può girare su backend diversi:
+
+- PlaywrightSyncDriver: Playwright sync API (default, usato in produzione)
+- PlaywrightAsyncDriver: Playwright async API con event loop in un thread dedicato
+- HTMLReplayDriver: HTML salvato, senza browser (fixture, debug, benchmark); l'espansione
+  delle sezioni è emulata rivelando i contenuti nascosti collegati ai controlli
+  (aria-controls) invece di eseguire lo script nella pagina
+
+I locator restituiti devono offrire: count(), nth(i), first, locator(selector),
+is_visible(), is_enabled(), inner_text(), click(), evaluate(), clear(), fill(), press().
+"""
+
+import asyncio
+import glob
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, List
+
+# Opzioni browser ottimizzate per gestire popup di consenso Google
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor',
+    '--disable-extensions',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-translate',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    '--disable-field-trial-config',
+    '--disable-back-forward-cache',
+    '--disable-ipc-flooding-protection',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--disable-popup-blocking',  # Importante per gestire popup
+    '--disable-notifications',   # Disabilita notifiche
+    '--disable-infobars',        # Disabilita barre info
+    '--disable-save-password-bubble',  # Disabilita popup password
+]
+
+# Contesto con impostazioni anti-rilevamento
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+    'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'locale': 'it-IT',
+    'timezone_id': 'Europe/Rome',
+    'permissions': ['geolocation'],  # Gestisce permessi automaticamente
+    'extra_http_headers': {
+        'Accept-Language': 'it-IT,it;q=0.9,en;q=0.8'
+    }
+}
+
+# Script anti-rilevamento
+STEALTH_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+    Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
+    Object.defineProperty(navigator, 'languages', {get: () => ['it-IT', 'it', 'en']});
+    window.chrome = {runtime: {}};
+"""
+
+
+def get_launch_options(headless: bool) -> dict:
+    """
+    Opzioni di avvio di Chromium, con il percorso eseguibile di Railway se presente
+
+    Args:
+        headless: Se True, avvia il browser in modalità headless
+    """
+    launch_options = {
+        'headless': headless,
+        'args': BROWSER_ARGS
+    }
+
+    # Configura percorso eseguibile per Railway
+    if os.path.exists('/ms-playwright'):
+        chrome_paths = glob.glob('/ms-playwright/chromium-*/chrome-linux/chrome')
+        if chrome_paths:
+            launch_options['executable_path'] = chrome_paths[0]
+            print(f"📍 Usando Chrome da Railway: {chrome_paths[0]}")
+
+    return launch_options
+
+
+class BrowserDriver(ABC):
+    """
+    Interfaccia minima del driver usata dalla logica di estrazione
+
+    Un driver incompleto non può essere istanziato (TypeError alla creazione).
+    """
+
+    name = 'base'
+
+    @abstractmethod
+    def goto(self, url: str, timeout: int = 10000):
+        """Naviga a un URL"""
+
+    @abstractmethod
+    def set_content(self, html: str):
+        """Carica direttamente un documento HTML (fixture)"""
+
+    @abstractmethod
+    def locator(self, selector: str):
+        """Restituisce un locator per il selettore"""
+
+    @abstractmethod
+    def frame_locator(self, selector: str):
+        """Restituisce un locator per il contenuto di un iframe"""
+
+    @abstractmethod
+    def wait_for_timeout(self, milliseconds: int):
+        """Attende per il tempo specificato"""
+
+    @abstractmethod
+    def wait_for_selector(self, selector: str, timeout: int = 30000):
+        """Attende che il selettore sia presente"""
+
+    @abstractmethod
+    def wait_for_load_state(self, state: str = 'load', timeout: int = 30000):
+        """Attende uno stato di caricamento della pagina"""
+
+    @abstractmethod
+    def content(self) -> str:
+        """Ottiene l'HTML della pagina"""
+
+    def close(self):
+        """Rilascia le risorse del driver"""
+
+
+class PlaywrightSyncDriver(BrowserDriver):
+    """
+    Driver su Playwright sync API: i locator sono quelli nativi di Playwright
+    """
+
+    name = 'playwright'
+
+    def __init__(self, page, browser=None, playwright=None):
+        """
+        Args:
+            page: Pagina Playwright già configurata
+            browser: Browser da chiudere in close() (solo se posseduto dal driver)
+            playwright: Istanza Playwright da fermare in close() (solo se posseduta dal driver)
+        """
+        self.page = page
+        self.browser = browser
+        self.playwright = playwright
+
+    @classmethod
+    def launch(cls, headless: bool = True):
+        """Avvia Chromium con le opzioni standard e restituisce un driver che lo possiede"""
+        from playwright.sync_api import sync_playwright
+
+        playwright = sync_playwright().start()
+        browser = playwright.chromium.launch(**get_launch_options(headless))
+        context = browser.new_context(**CONTEXT_OPTIONS)
+        page = context.new_page()
+        page.add_init_script(STEALTH_SCRIPT)
+        return cls(page, browser=browser, playwright=playwright)
+
+    def goto(self, url, timeout=10000):
+        self.page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+
+    def set_content(self, html):
+        self.page.set_content(html, wait_until="domcontentloaded")
+
+    def locator(self, selector):
+        return self.page.locator(selector)
+
+    def frame_locator(self, selector):
+        return self.page.frame_locator(selector)
+
+    def wait_for_timeout(self, milliseconds):
+        self.page.wait_for_timeout(milliseconds)
+
+    def wait_for_selector(self, selector, timeout=30000):
+        self.page.wait_for_selector(selector, timeout=timeout)
+
+    def wait_for_load_state(self, state='load', timeout=30000):
+        self.page.wait_for_load_state(state, timeout=timeout)
+
+    def content(self):
+        return self.page.content()
+
+    def close(self):
+        for resource in (self.browser, self.playwright):
+            if resource is None:
+                continue
+            try:
+                if resource is self.playwright:
+                    resource.stop()
+                else:
+                    resource.close()
+            except Exception as e:
+                print(f"⚠️ Errore chiusura driver Playwright: {e}")
+        self.browser = None
+        self.playwright = None
+
+
+class _AsyncLocatorProxy:
+    """
+    Locator sincrono che inoltra le chiamate a un Locator async nel loop del driver
+    """
+
+    def __init__(self, driver, locator):
+        self._driver = driver
+        self._locator = locator
+
+    @property
+    def first(self):
+        return _AsyncLocatorProxy(self._driver, self._locator.first)
+
+    def nth(self, index):
+        return _AsyncLocatorProxy(self._driver, self._locator.nth(index))
+
+    def locator(self, selector):
+        return _AsyncLocatorProxy(self._driver, self._locator.locator(selector))
+
+    def count(self):
+        return self._driver._run(self._locator.count())
+
+    def is_visible(self):
+        return self._driver._run(self._locator.is_visible())
+
+    def is_enabled(self):
+        return self._driver._run(self._locator.is_enabled())
+
+    def inner_text(self):
+        return self._driver._run(self._locator.inner_text())
+
+    def click(self, **kwargs):
+        return self._driver._run(self._locator.click(**kwargs))
+
+    def evaluate(self, expression, arg=None):
+        return self._driver._run(self._locator.evaluate(expression, arg))
+
+    def clear(self):
+        return self._driver._run(self._locator.clear())
+
+    def fill(self, value):
+        return self._driver._run(self._locator.fill(value))
+
+    def press(self, key):
+        return self._driver._run(self._locator.press(key))
+
+
+class _AsyncFrameProxy:
+    """FrameLocator sincrono per il driver async"""
+
+    def __init__(self, driver, frame_locator):
+        self._driver = driver
+        self._frame_locator = frame_locator
+
+    def locator(self, selector):
+        return _AsyncLocatorProxy(self._driver, self._frame_locator.locator(selector))
+
+
+class PlaywrightAsyncDriver(BrowserDriver):
+    """
+    Driver su Playwright async API
+
+    L'event loop gira in un thread dedicato; la logica di estrazione resta sincrona e
+    ogni chiamata viene inoltrata al loop con run_coroutine_threadsafe. Utile quando il
+    chiamante ha già un event loop attivo (dove la sync API non può essere usata).
+    """
+
+    name = 'playwright_async'
+
+    def __init__(self, headless: bool = True, call_timeout: float = 120.0):
+        """
+        Args:
+            headless: Se True, avvia il browser in modalità headless
+            call_timeout: Timeout in secondi di ogni singola chiamata al loop
+        """
+        self.headless = headless
+        self.call_timeout = call_timeout
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='playwright-async-driver', daemon=True)
+        self.thread.start()
+        self.playwright = None
+        self.browser = None
+        self.page = None
+        self._run(self._start())
+
+    def _run(self, coroutine):
+        """Esegue una coroutine nel loop del driver e ne attende il risultato"""
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        return future.result(timeout=self.call_timeout)
+
+    async def _start(self):
+        from playwright.async_api import async_playwright
+
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(**get_launch_options(self.headless))
+        context = await self.browser.new_context(**CONTEXT_OPTIONS)
+        self.page = await context.new_page()
+        await self.page.add_init_script(STEALTH_SCRIPT)
+
+    async def _stop(self):
+        if self.browser:
+            await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
+
+    def goto(self, url, timeout=10000):
+        self._run(self.page.goto(url, wait_until="domcontentloaded", timeout=timeout))
+
+    def set_content(self, html):
+        self._run(self.page.set_content(html, wait_until="domcontentloaded"))
+
+    def locator(self, selector):
+        return _AsyncLocatorProxy(self, self.page.locator(selector))
+
+    def frame_locator(self, selector):
+        return _AsyncFrameProxy(self, self.page.frame_locator(selector))
+
+    def wait_for_timeout(self, milliseconds):
+        self._run(self.page.wait_for_timeout(milliseconds))
+
+    def wait_for_selector(self, selector, timeout=30000):
+        self._run(self.page.wait_for_selector(selector, timeout=timeout))
+
+    def wait_for_load_state(self, state='load', timeout=30000):
+        self._run(self.page.wait_for_load_state(state, timeout=timeout))
+
+    def content(self):
+        return self._run(self.page.content())
+
+    def close(self):
+        try:
+            if self.loop.is_running():
+                self._run(self._stop())
+        except Exception as e:
+            print(f"⚠️ Errore chiusura driver Playwright async: {e}")
+        finally:
+            self.browser = None
+            self.playwright = None
+            self.page = None
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+            self.loop.close()
+
+
+# Estensioni Playwright dei selettori gestite dal driver di replay
+_HAS_TEXT_RE = re.compile(r""":has-text\((['"])(.*?)\1\)""")
+_VISIBLE_SUFFIX_RE = re.compile(r'\s*>>\s*visible=true\s*$')
+_HIDDEN_STYLE_RE = re.compile(r'display\s*:\s*none|visibility\s*:\s*hidden', re.IGNORECASE)
+
+# Parametri di EXPAND_SECTIONS_SCRIPT riconosciuti da ReplayLocator.evaluate
+_EXPAND_OPTIONS = frozenset(['selectors', 'keywords', 'containers'])
+_BLOCK_TAGS = frozenset(['p', 'li', 'div', 'td', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+_SKIPPED_TEXT_TAGS = frozenset(['script', 'style', 'noscript'])
+
+
+class ReplayLocator:
+    """
+    Locator su HTML statico con la stessa interfaccia dei locator Playwright
+
+    Supporta CSS standard, `xpath=...`, `:has-text('...')` e `>> visible=true`.
+    Le azioni (click, fill, press) non hanno effetto: la pagina è statica. evaluate()
+    emula solo lo script di espansione delle sezioni (HTMLReplayDriver.expand_sections).
+    """
+
+    def __init__(self, driver, selector: Optional[str] = None, parent=None, elements: Optional[List] = None):
+        self._driver = driver
+        self._selector = selector
+        self._parent = parent
+        self._elements = elements
+
+    def _resolve(self) -> List:
+        if self._elements is None:
+            roots = self._parent._resolve() if self._parent is not None else [self._driver.document]
+            self._elements = self._driver.select(roots, self._selector)
+        return self._elements
+
+    @property
+    def first(self):
+        return self.nth(0)
+
+    def nth(self, index):
+        elements = self._resolve()
+        return ReplayLocator(self._driver, elements=elements[index:index + 1])
+
+    def locator(self, selector):
+        return ReplayLocator(self._driver, selector=selector, parent=self)
+
+    def count(self):
+        return len(self._resolve())
+
+    def _single(self):
+        elements = self._resolve()
+        if not elements:
+            raise LookupError(f"Nessun elemento per il selettore: {self._selector}")
+        return elements[0]
+
+    def is_visible(self):
+        elements = self._resolve()
+        return bool(elements) and self._driver.is_visible(elements[0])
+
+    def is_enabled(self):
+        element = self._single()
+        return element.get('disabled') is None
+
+    def inner_text(self):
+        return self._driver.inner_text(self._single())
+
+    def click(self, **kwargs):
+        self._single()
+
+    def evaluate(self, expression, arg=None):
+        if isinstance(arg, dict) and _EXPAND_OPTIONS.issubset(arg):
+            return self._driver.expand_sections(self._single(), arg)
+        return None
+
+    def clear(self):
+        pass
+
+    def fill(self, value):
+        pass
+
+    def press(self, key):
+        pass
+
+
+class HTMLReplayDriver(BrowserDriver):
+    """
+    Driver senza browser che riproduce una pagina HTML salvata (lxml + cssselect)
+    """
+
+    name = 'replay'
+
+    def __init__(self, html: str = '<html><body></body></html>'):
+        self.document = None
+        self.set_content(html)
+
+    def goto(self, url, timeout=10000):
+        # Accetta percorsi locali o file:// (fixture salvate)
+        path = url[len('file://'):] if url.startswith('file://') else url
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Fixture HTML non trovata: {url}")
+        with open(path, 'r', encoding='utf-8') as f:
+            self.set_content(f.read())
+
+    def set_content(self, html):
+        import lxml.html
+        self.document = lxml.html.document_fromstring(html or '<html><body></body></html>')
+
+    def select(self, roots: List, selector: str) -> List:
+        """Risolve un selettore (con estensioni Playwright) a partire dagli elementi radice"""
+        from lxml.cssselect import CSSSelector
+
+        only_visible = bool(_VISIBLE_SUFFIX_RE.search(selector))
+        selector = _VISIBLE_SUFFIX_RE.sub('', selector)
+
+        text_filters = [match.group(2).lower() for match in _HAS_TEXT_RE.finditer(selector)]
+        selector = _HAS_TEXT_RE.sub('', selector).strip() or '*'
+
+        results = []
+        seen = set()
+        for root in roots:
+            if selector.startswith('xpath='):
+                matches = root.xpath(selector[len('xpath='):])
+            else:
+                matches = CSSSelector(selector)(root)
+            for element in matches:
+                if id(element) in seen:
+                    continue
+                if text_filters:
+                    text = self.inner_text(element).lower()
+                    if not all(text_filter in text for text_filter in text_filters):
+                        continue
+                if only_visible and not self.is_visible(element):
+                    continue
+                seen.add(id(element))
+                results.append(element)
+        return results
+
+    def is_visible(self, element) -> bool:
+        """Visibilità approssimata: nessun antenato nascosto via attributi o stile inline"""
+        node = element
+        while node is not None:
+            if node.get('hidden') is not None or node.get('aria-hidden') == 'true':
+                return False
+            if _HIDDEN_STYLE_RE.search(node.get('style') or ''):
+                return False
+            if node.tag in ('script', 'style', 'template', 'noscript'):
+                return False
+            node = node.getparent()
+        return True
+
+    @staticmethod
+    def _is_hidden(element) -> bool:
+        """Elemento escluso dal testo visibile (attributo hidden o stile inline)"""
+        return element.get('hidden') is not None or bool(_HIDDEN_STYLE_RE.search(element.get('style') or ''))
+
+    def inner_text(self, element) -> str:
+        """Testo visibile dell'elemento con spazi normalizzati, esclusi script, stili e nodi nascosti"""
+        parts = []
+
+        def collect(node):
+            parts.append(node.text or '')
+            for child in node:
+                if isinstance(child.tag, str) and child.tag not in _SKIPPED_TEXT_TAGS and not self._is_hidden(child):
+                    collect(child)
+                if child.tail:
+                    parts.append(child.tail)
+
+        collect(element)
+        return ' '.join(' '.join(parts).split())
+
+    def _closest(self, element, selector: str):
+        matches = set(self.select([self.document], selector))
+        node = element
+        while node is not None:
+            if node in matches:
+                return node
+            node = node.getparent()
+        return None
+
+    def expand_sections(self, element, options: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Emulazione statica di EXPAND_SECTIONS_SCRIPT
+
+        I controlli sono individuati come nello script (selettori e parole chiave nel
+        contenitore dell'AI Overview); "cliccare" un controllo rende visibile l'elemento
+        indicato da aria-controls, oppure tutti gli elementi nascosti del contenitore.
+
+        Args:
+            element: Elemento dell'AI Overview
+            options: Parametri dello script (selectors, keywords, containers, minFragmentChars)
+
+        Returns:
+            dict: controls, clicked e fragments come lo script nella pagina
+        """
+        root = next(filter(None, (self._closest(element, selector) for selector in options['containers'])), element)
+
+        controls = []
+        for selector in options['selectors']:
+            try:
+                controls.extend(match for match in self.select([root], selector) if match is not root)
+            except Exception:
+                continue
+        for candidate in root.iterdescendants('button', 'a', 'span', 'div'):
+            if len(candidate) > 3:
+                continue
+            label = f"{candidate.get('aria-label') or ''} {self.inner_text(candidate)}".lower()
+            if len(label) < 60 and any(keyword in label for keyword in options['keywords']):
+                controls.append(candidate)
+        controls = list({id(control): control for control in controls}.values())
+
+        # Come nello script: solo i controlli più esterni, visibili e non già espansi
+        control_ids = {id(control) for control in controls}
+        targets = [
+            control for control in controls
+            if control.get('aria-expanded') != 'true' and self.is_visible(control)
+            and not any(id(ancestor) in control_ids for ancestor in control.iterancestors())
+        ]
+
+        revealed = []
+        for control in targets:
+            control.set('aria-expanded', 'true')
+            controlled = control.get('aria-controls')
+            if controlled:
+                revealed.extend(self.document.xpath('//*[@id=$id]', id=controlled))
+            else:
+                revealed.extend(node for node in root.iterdescendants()
+                                if isinstance(node.tag, str) and self._is_hidden(node))
+
+        fragments = []
+        min_chars = options.get('minFragmentChars', 0)
+        for node in revealed:
+            if not self._is_hidden(node):
+                continue
+            node.attrib.pop('hidden', None)
+            if node.get('style'):
+                node.set('style', _HIDDEN_STYLE_RE.sub('', node.get('style')))
+            blocks = [
+                block for block in node.iter(*_BLOCK_TAGS)
+                if not any(child.tag in _BLOCK_TAGS for child in block)
+            ] or [node]
+            for block in blocks:
+                text = self.inner_text(block)
+                if len(text) >= min_chars and text not in fragments:
+                    fragments.append(text)
+
+        return {'controls': len(controls), 'clicked': len(targets), 'fragments': fragments}
+
+    def locator(self, selector):
+        return ReplayLocator(self, selector=selector)
+
+    def frame_locator(self, selector):
+        # Gli iframe non vengono caricati in replay
+        return ReplayLocator(self, elements=[])
+
+    def wait_for_timeout(self, milliseconds):
+        pass
+
+    def wait_for_selector(self, selector, timeout=30000):
+        if not self.locator(selector).count():
+            raise TimeoutError(f"Selettore non presente nella pagina: {selector}")
+
+    def wait_for_load_state(self, state='load', timeout=30000):
+        pass
+
+    def content(self):
+        import lxml.html
+        return lxml.html.tostring(self.document, encoding='unicode')
+
+
+def create_driver(name: str, headless: bool = True) -> BrowserDriver:
+    """
+    Crea un driver per nome
+
+    Args:
+        name: 'playwright', 'playwright_async' o 'replay'
+        headless: Modalità headless per i driver Playwright
+    """
+    if name == 'playwright':
+        return PlaywrightSyncDriver.launch(headless=headless)
+    if name == 'playwright_async':
+        return PlaywrightAsyncDriver(headless=headless)
+    if name == 'replay':
+        return HTMLReplayDriver()
+    raise ValueError(f"Driver non supportato: {name}")
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Telemetria delle risorse del browser per ogni job di estrazione AI Overview
+
+Raccoglie tramite CDP (Chrome DevTools Protocol) le metriche di `Performance.getMetrics`
+(heap JS, nodi DOM, numero di layout), i byte di rete scaricati e la memoria RSS del
+processo renderer di Chromium. Il record viene allegato ai metrics del job e, se
+configurato, accodato a un file JSONL.
+
+Uso da riga di comando per il riepilogo di un batch:
+    python browser_telemetry.py summary metrics.jsonl
+"""
+
+import json
+import math
+import os
+import sys
+import time
+from typing import Optional, Dict, List, Any
+
+# Metriche di Performance.getMetrics esportate nel record (nome CDP -> nome record)
+CDP_GAUGE_METRICS = {
+    'JSHeapUsedSize': 'js_heap_used_bytes',
+    'JSHeapTotalSize': 'js_heap_total_bytes',
+    'Nodes': 'dom_nodes',
+    'Documents': 'documents',
+    'JSEventListeners': 'js_event_listeners',
+}
+
+# Contatori cumulativi per pagina: nel record finisce la differenza rispetto all'inizio del job
+CDP_COUNTER_METRICS = {
+    'LayoutCount': 'layout_count',
+    'RecalcStyleCount': 'recalc_style_count',
+    'TaskDuration': 'task_duration_seconds',
+}
+
+# Variabile d'ambiente per accodare i record dei job a un file JSONL
+METRICS_FILE_ENV = 'AI_OVERVIEW_METRICS_FILE'
+
+
+def read_process_rss(pid: int) -> Optional[int]:
+    """
+    Legge la memoria RSS di un processo in byte
+
+    Args:
+        pid: PID del processo
+
+    Returns:
+        RSS in byte o None se non disponibile
+    """
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except ImportError:
+        pass
+    except Exception:
+        return None
+
+    # Fallback Linux senza psutil
+    try:
+        with open(f'/proc/{pid}/status', 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except Exception:
+        pass
+    return None
+
+
+class BrowserTelemetry:
+    """
+    Collettore di metriche CDP per una pagina Playwright (solo Chromium)
+    """
+
+    def __init__(self, page, browser=None):
+        """
+        Inizializza il collettore
+
+        Args:
+            page: Pagina Playwright da osservare
+            browser: Browser Playwright, necessario per la RSS dei renderer
+        """
+        self.page = page
+        self.browser = browser
+        self.cdp = None
+        self.baseline = {}
+        self.started_at = None
+        self._reset_network()
+
+    def _reset_network(self):
+        self.network = {
+            'requests': 0,
+            'responses': 0,
+            'failed_requests': 0,
+            'encoded_bytes': 0,
+            'decoded_bytes': 0,
+        }
+
+    def _on_request(self, params):
+        self.network['requests'] += 1
+
+    def _on_data_received(self, params):
+        self.network['decoded_bytes'] += params.get('dataLength', 0)
+
+    def _on_loading_finished(self, params):
+        self.network['responses'] += 1
+        self.network['encoded_bytes'] += int(params.get('encodedDataLength', 0))
+
+    def _on_loading_failed(self, params):
+        self.network['failed_requests'] += 1
+
+    def start(self):
+        """Apre la sessione CDP e registra la baseline dei contatori"""
+        self._reset_network()
+        self.started_at = time.time()
+
+        if self.cdp is None:
+            self.cdp = self.page.context.new_cdp_session(self.page)
+            self.cdp.send('Performance.enable')
+            self.cdp.send('Network.enable')
+            self.cdp.on('Network.requestWillBeSent', self._on_request)
+            self.cdp.on('Network.dataReceived', self._on_data_received)
+            self.cdp.on('Network.loadingFinished', self._on_loading_finished)
+            self.cdp.on('Network.loadingFailed', self._on_loading_failed)
+
+        self.baseline = self._get_performance_metrics()
+
+    def _get_performance_metrics(self) -> Dict[str, float]:
+        """Legge Performance.getMetrics come dizionario nome -> valore"""
+        response = self.cdp.send('Performance.getMetrics')
+        return {m['name']: m['value'] for m in response.get('metrics', [])}
+
+    def _get_renderer_rss(self) -> Dict[str, Any]:
+        """Somma e massimo della RSS dei processi renderer di Chromium"""
+        if not self.browser:
+            return {}
+
+        browser_cdp = None
+        try:
+            browser_cdp = self.browser.new_browser_cdp_session()
+            info = browser_cdp.send('SystemInfo.getProcessInfo')
+        finally:
+            if browser_cdp:
+                try:
+                    browser_cdp.detach()
+                except Exception:
+                    pass
+
+        renderer_rss = []
+        for process in info.get('processInfo', []):
+            if process.get('type') == 'renderer':
+                rss = read_process_rss(process.get('id'))
+                if rss is not None:
+                    renderer_rss.append(rss)
+
+        if not renderer_rss:
+            return {}
+
+        return {
+            'renderer_processes': len(renderer_rss),
+            'renderer_rss_bytes': max(renderer_rss),
+            'renderer_rss_total_bytes': sum(renderer_rss),
+        }
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Raccoglie le metriche del job corrente
+
+        Returns:
+            dict: Metriche browser (heap, DOM, layout, rete, RSS renderer)
+        """
+        record = {}
+
+        if self.cdp is None:
+            return record
+
+        try:
+            metrics = self._get_performance_metrics()
+            for cdp_name, name in CDP_GAUGE_METRICS.items():
+                if cdp_name in metrics:
+                    record[name] = int(metrics[cdp_name])
+            for cdp_name, name in CDP_COUNTER_METRICS.items():
+                if cdp_name in metrics:
+                    value = metrics[cdp_name] - self.baseline.get(cdp_name, 0)
+                    record[name] = round(value, 3) if isinstance(value, float) else value
+        except Exception as e:
+            print(f"⚠️ Metriche CDP non disponibili: {e}")
+
+        record.update({f"network_{key}": value for key, value in self.network.items()})
+
+        try:
+            record.update(self._get_renderer_rss())
+        except Exception as e:
+            print(f"⚠️ RSS renderer non disponibile: {e}")
+
+        return record
+
+    def close(self):
+        """Chiude la sessione CDP"""
+        if self.cdp is not None:
+            try:
+                self.cdp.detach()
+            except Exception:
+                pass
+            self.cdp = None
+
+
+def append_metrics_record(record: Dict[str, Any], filename: Optional[str] = None):
+    """
+    Accoda un record di metriche a un file JSONL
+
+    Args:
+        record: Record del job
+        filename: File di destinazione (default: variabile AI_OVERVIEW_METRICS_FILE)
+    """
+    filename = filename or os.environ.get(METRICS_FILE_ENV)
+    if not filename:
+        return
+
+    try:
+        with open(filename, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except Exception as e:
+        print(f"⚠️ Errore nel salvare le metriche: {e}")
+
+
+def load_metrics_records(filename: str) -> List[Dict[str, Any]]:
+    """Carica i record di metriche da un file JSONL, ignorando le righe non valide"""
+    records = []
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentile con metodo nearest-rank"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize_metrics(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """
+    Calcola p50/p95/max per ogni metrica numerica di un batch
+
+    Args:
+        records: Record dei job
+
+    Returns:
+        dict: nome metrica -> {'count', 'p50', 'p95', 'max'}
+    """
+    values = {}
+    for record in records:
+        flat = dict(record)
+        flat.update(record.get('browser', {}) or {})
+        for key, value in flat.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values.setdefault(key, []).append(value)
+
+    return {
+        key: {
+            'count': len(series),
+            'p50': percentile(series, 50),
+            'p95': percentile(series, 95),
+            'max': max(series),
+        }
+        for key, series in sorted(values.items())
+    }
+
+
+def print_summary(filename: str, top: int = 5):
+    """Stampa il riepilogo p50/p95 di un file di metriche e le query più pesanti"""
+    records = load_metrics_records(filename)
+    if not records:
+        print(f"Nessun record di metriche in {filename}")
+        return
+
+    successful = sum(1 for r in records if r.get('success'))
+    print(f"📊 Job analizzati: {len(records)} (riusciti: {successful})")
+    print(f"{'metrica':<32}{'n':>6}{'p50':>16}{'p95':>16}{'max':>16}")
+    for key, stats in summarize_metrics(records).items():
+        print(f"{key:<32}{stats['count']:>6}{stats['p50']:>16.1f}{stats['p95']:>16.1f}{stats['max']:>16.1f}")
+
+    heavy = sorted(
+        (r for r in records if (r.get('browser') or {}).get('js_heap_used_bytes')),
+        key=lambda r: r['browser']['js_heap_used_bytes'],
+        reverse=True
+    )[:top]
+    if heavy:
+        print("\n🔥 Query con heap JS più alto:")
+        for r in heavy:
+            browser = r['browser']
+            print(f"- {r.get('query', '?')}: heap {browser['js_heap_used_bytes'] / 1048576:.1f} MB, "
+                  f"DOM {browser.get('dom_nodes', 0)} nodi, "
+                  f"RSS {browser.get('renderer_rss_bytes', 0) / 1048576:.1f} MB")
+
+
+def main():
+    """Entry point CLI: python browser_telemetry.py summary <metrics.jsonl>"""
+    if len(sys.argv) < 3 or sys.argv[1] != 'summary':
+        print("Uso: python browser_telemetry.py summary <metrics.jsonl>")
+        sys.exit(1)
+    print_summary(sys.argv[2])
+
+
+if __name__ == "__main__":
+    main()
@@ -6,20 +6,32 @@ Questo script analizza gli articoli forniti tramite URL e li confronta con i con
 estratti dall'AI Overview per identificare quali argomenti mancano negli articoli.
 """
 
-import requests
 import json
 import re
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
 from difflib import SequenceMatcher
-from collections import Counter
 import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize, sent_tokenize
 import string
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
 from typing import Optional, Dict, List, Any
+from text_normalizer import TextFragment, combine_fragments
+from http_client import HttpClient, get_http_client, classify_error
+from article_cache import ArticleCache
+from html_extraction import extract_article, extractor_signature, default_parser, default_strategy
+from topic_engine import TopicEngine
+from idf_store import IDFStore, document_digest
+from fuzzy_matcher import FuzzyMatcher
+from multi_pattern import SYNONYM_CONFIDENCE
+from article_document import ArticleDocument, text_digest
+from overview_index import OverviewIndex, topic_priority, topic_category
+from summary_aggregator import SummaryAggregator
+from report_storage import write_report
+from result_memo import ResultMemo
+from overview_delta import ArticleState, TopicVerdict, diff_topics, save_states, load_states
+from section_mapper import SectionMapper
+from language_profiles import AUTO, DEFAULT_LANGUAGE, LANGUAGE_ENV, get_profile, resolve_language
 
 # Importa il nuovo analizzatore semantico
 try:
@@ -40,6 +52,14 @@ try:
 except LookupError:
     nltk.download('stopwords')
 
+# Versione della logica di analisi: incrementarla quando cambiano i risultati
+# (invalida le voci del memo dei risultati)
+ANALYSIS_CONFIG_VERSION = 4
+
+# Argomenti minimi dell'AI Overview: sotto questa soglia (testo breve) contano anche
+# gli n-grammi visti una sola volta, altrimenti le frasi chiave andrebbero perse
+OVERVIEW_MIN_TOPICS = 10
+
 class ContentGapAnalyzer:
     """
     Analizzatore avanzato per identificare i gap di contenuto tra articoli e AI Overview
@@ -83,14 +103,53 @@ class ContentGapAnalyzer:
         # Se tutto fallisce, restituisce una stringa vuota
         return ""
     
-    def __init__(self, gemini_api_key: Optional[str] = None, use_semantic_analysis: bool = True):
+    def __init__(self, gemini_api_key: Optional[str] = None, use_semantic_analysis: bool = True,
+                 http_client: Optional[HttpClient] = None, article_cache: Optional[ArticleCache] = None,
+                 html_parser: Optional[str] = None, content_strategy: Optional[str] = None,
+                 topic_statistic: Optional[str] = None, idf_store: Optional[IDFStore] = None,
+                 synonyms: Optional[Dict[str, List[str]]] = None, result_memo: Optional[ResultMemo] = None,
+                 delta_mode: bool = False, language: Optional[str] = None):
         """
         Inizializza l'analizzatore
         
         Args:
             gemini_api_key: Chiave API Google Gemini (usa chiave integrata se None)
             use_semantic_analysis: Se utilizzare l'analisi semantica avanzata (default: True)
+            http_client: Client HTTP per scaricare gli articoli (default: client condiviso)
+            article_cache: Cache su disco degli articoli (default: attiva solo se è
+                impostata la variabile d'ambiente ARTICLE_CACHE_DIR)
+            html_parser: Parser HTML degli articoli, 'lxml' o 'bs4'
+                (default: variabile d'ambiente HTML_PARSER o lxml)
+            content_strategy: Individuazione del contenuto principale, 'scoring' (punteggio
+                dei blocchi) o 'selectors' (default: variabile d'ambiente CONTENT_STRATEGY o scoring)
+            topic_statistic: Statistica per ordinare gli argomenti: 'frequency', 'weighted',
+                'npmi' o 'log_likelihood' (default: variabile d'ambiente TOPIC_STATISTIC o weighted)
+            idf_store: Archivio delle frequenze documentali per il peso TF-IDF degli argomenti
+                (default: attivo solo se è impostata la variabile d'ambiente IDF_STORE_PATH)
+            synonyms: Tabella termine -> sinonimi per la copertura per sinonimi
+                (default: sinonimi del profilo della lingua dell'AI Overview)
+            result_memo: Memo persistente dei risultati per articoli e AI Overview invariati
+                (default: attivo solo se è impostata la variabile d'ambiente RESULT_MEMO_PATH)
+            delta_mode: Conserva documenti ed esiti per topic degli articoli analizzati per
+                rianalizzarli in modo incrementale quando cambia l'AI Overview
+            language: Codice della lingua da usare sempre (es. 'it', 'en') oppure 'auto' per
+                rilevarla per AI Overview e articolo (default: variabile d'ambiente
+                ANALYSIS_LANGUAGE o 'auto')
         """
+        self.http_client = http_client or get_http_client()
+        self.article_cache = article_cache or ArticleCache.from_env()
+        self.html_parser = html_parser or default_parser()
+        self.content_strategy = content_strategy or default_strategy()
+        self.idf_store = idf_store or IDFStore.from_env()
+        self.custom_synonyms = synonyms
+        self.language = language or os.environ.get(LANGUAGE_ENV, AUTO)
+        self.topic_statistic = topic_statistic
+        self._topic_engines: Dict[str, TopicEngine] = {}
+        self.result_memo = result_memo or ResultMemo.from_env()
+        self.delta_mode = delta_mode
+        self.article_states: Dict[str, ArticleState] = {}
+        self.overview_diff = None
+        self.overview_index = None
         self.ai_overview_content = ""
         self.ai_overview_topics = []
         # Abilita automaticamente l'analisi semantica con chiave integrata
@@ -113,20 +172,80 @@ class ContentGapAnalyzer:
             if not SEMANTIC_ANALYZER_AVAILABLE:
                 print("ℹ️ Utilizzo analisi base (SemanticAnalyzer non disponibile)")
         
-        # Carica le stopwords italiane e inglesi
-        try:
-            self.stop_words = set(stopwords.words('italian') + stopwords.words('english'))
-        except LookupError:
-            # Se le stopwords non sono disponibili, usa un set base
-            self.stop_words = set(['il', 'la', 'di', 'che', 'e', 'a', 'un', 'per', 'in', 'con', 'su', 'da', 'del', 'al', 'alla', 'dei', 'delle', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
+        # Profilo della lingua dell'AI Overview (stopword, sinonimi, parole chiave):
+        # italiano finché non viene caricato un AI Overview in un'altra lingua
+        self._set_overview_language(DEFAULT_LANGUAGE if self.language == AUTO else self.language)
+    
+    def _topic_engine(self, language):
+        """Motore di estrazione degli argomenti (n-grammi in un solo passaggio) per una lingua"""
+        engine = self._topic_engines.get(language)
+        if engine is None:
+            profile = get_profile(language)
+            engine = TopicEngine(profile.stop_words, statistic=self.topic_statistic,
+                                 token_pattern=profile.token_pattern)
+            self._topic_engines[language] = engine
+        return engine
+    
+    def _detect_language(self, texts):
+        """Lingua di un testo (o dei suoi frammenti), oppure quella impostata"""
+        return resolve_language(self.language, texts)
+    
+    def _set_overview_language(self, language):
+        """
+        Imposta la lingua dell'AI Overview: stopword, motore degli argomenti, sinonimi e
+        parole chiave di priorità e categoria vengono dal profilo della lingua
+        """
+        self.overview_language = language
+        self.profile = get_profile(language)
+        self.stop_words = set(self.profile.stop_words)
+        self.topic_engine = self._topic_engine(language)
+        self.synonyms = self.custom_synonyms if self.custom_synonyms is not None else self.profile.synonyms
+        self.config_version = self._config_version()
+    
+    def _config_version(self):
+        """Impronta della configurazione che influenza i risultati (chiave del memo)"""
+        return document_digest([
+            str(ANALYSIS_CONFIG_VERSION),
+            self.overview_language,
+            self.topic_engine.statistic,
+            'idf' if self.idf_store is not None else 'no-idf',
+            json.dumps(self.synonyms, sort_keys=True, ensure_ascii=False)
+        ])
+        
+    def _memo_config_version(self):
+        """
+        Versione della configurazione per il memo, con la generazione dell'archivio IDF:
+        i topic pesati TF-IDF memorizzati scadono quando le frequenze documentali cambiano
+        """
+        if self.idf_store is None:
+            return self.config_version
+        return f"{self.config_version}:idf{self.idf_store.generation()}"
         
     def load_ai_overview(self, ai_overview_text):
         """
         Carica il contenuto dell'AI Overview
         
         Args:
-            ai_overview_text (str): Testo dell'AI Overview estratto
+            ai_overview_text (str | list[TextFragment]): Testo dell'AI Overview estratto oppure
+                i frammenti normalizzati prodotti da AIOverviewExtractor (extractor.fragments)
         """
+        # Frammenti già normalizzati: riusa testo canonico e forma minuscola
+        if isinstance(ai_overview_text, (list, tuple)) and ai_overview_text and \
+                all(isinstance(f, TextFragment) for f in ai_overview_text):
+            fragments = ai_overview_text
+            self.ai_overview_content = combine_fragments(fragments)
+            lower_texts = [fragment.lower for fragment in fragments]
+            self._set_overview_language(self._detect_language(lower_texts))
+            if self.idf_store is None:
+                self.ai_overview_topics = self.topic_engine.extract_from_lower_texts(
+                    lower_texts, min_topics=OVERVIEW_MIN_TOPICS)
+            else:
+                self.ai_overview_topics = self._extract_weighted_topics(
+                    lower_texts, min_topics=OVERVIEW_MIN_TOPICS)
+            self.build_overview_index()
+            print(f"Caricati {len(self.ai_overview_topics)} argomenti dall'AI Overview ({len(fragments)} frammenti)")
+            return
+        
         # Validazione del tipo di input
         if isinstance(ai_overview_text, dict):
             ai_overview_text = str(ai_overview_text)
@@ -134,9 +253,44 @@ class ContentGapAnalyzer:
             ai_overview_text = str(ai_overview_text)
             
         self.ai_overview_content = ai_overview_text
-        self.ai_overview_topics = self.extract_topics(ai_overview_text)
+        self._set_overview_language(self._detect_language([ai_overview_text]))
+        self.ai_overview_topics = self.extract_topics(ai_overview_text, language=self.overview_language,
+                                                      min_topics=OVERVIEW_MIN_TOPICS)
+        self.build_overview_index()
         print(f"Caricati {len(self.ai_overview_topics)} argomenti dall'AI Overview")
     
+    def build_overview_index(self, embed=None):
+        """
+        Costruisce l'indice precompilato dei topic dell'AI Overview caricato
+        
+        Forme minuscole, priorità, categorie, chiavi n-gramma e trigrammi e l'automa
+        per la copertura esatta e per sinonimi vengono calcolati una volta sola e
+        riusati per tutti gli articoli analizzati.
+        
+        Args:
+            embed (callable): Funzione testi -> embedding per includere gli embedding
+                dei topic (es. self.semantic_analyzer.get_embeddings_gemini)
+            
+        Returns:
+            OverviewIndex: Indice immutabile, condivisibile tra thread e processi
+        """
+        self.overview_index = OverviewIndex.build(
+            self.ai_overview_topics, self.ai_overview_content, self.synonyms, embed=embed,
+            priority_keywords=self.profile.priority_keywords, categories=self.profile.categories
+        )
+        return self.overview_index
+    
+    def load_overview_index(self, overview_index):
+        """
+        Carica un indice già costruito (es. ricevuto da un altro processo)
+        
+        Args:
+            overview_index (OverviewIndex): Indice prodotto da build_overview_index
+        """
+        self.overview_index = overview_index
+        self.ai_overview_content = overview_index.content
+        self.ai_overview_topics = overview_index.texts
+    
     def load_ai_overview_from_file(self, filename):
         """
         Carica il contenuto dell'AI Overview da un file JSON
@@ -158,6 +312,11 @@ class ContentGapAnalyzer:
         """
         Estrae il contenuto testuale di un articolo da un URL
         
+        Se la cache degli articoli è attiva, entro la finestra di freschezza l'articolo
+        non viene riscaricato; oltre la finestra viene rivalidato con ETag/Last-Modified
+        e il parsing viene saltato se il contenuto non è cambiato. Le voci prodotte con un
+        altro parser, strategia o versione dell'estrazione vengono rielaborate dal corpo salvato.
+        
         Args:
             url (str): URL dell'articolo
             
@@ -165,64 +324,36 @@ class ContentGapAnalyzer:
             dict: Contenuto dell'articolo estratto
         """
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
+            entry = self.article_cache.get(url) if self.article_cache else None
+            if entry and self.article_cache.is_fresh(entry):
+                entry = self._current_cache_entry(entry)
+                if entry:
+                    return dict(entry.parsed, cache_status='fresh')
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Sessione condivisa: keep-alive, retry con backoff e timeout (connect, read);
+            # download in streaming con limite di dimensione e controllo del content-type
+            request_headers = entry.revalidation_headers() if entry else {}
+            fetched = self.http_client.fetch_html(url, headers=request_headers)
             
-            # Rimuovi script e style
-            for script in soup(["script", "style"]):
-                script.decompose()
+            if entry and (fetched.status_code == 304 or entry.content_hash == fetched.content_hash):
+                current = self._current_cache_entry(entry)
+                if current:
+                    current = self.article_cache.refresh(current, fetched.headers)
+                    status = 'not_modified' if fetched.status_code == 304 else 'unchanged'
+                    return dict(current.parsed, cache_status=status)
+                if fetched.status_code == 304:
+                    # Corpo salvato illeggibile: scarica di nuovo senza header condizionali
+                    fetched = self.http_client.fetch_html(url)
             
-            # Estrai il titolo
-            title = ""
-            title_tag = soup.find('title')
-            if title_tag:
-                title = title_tag.get_text().strip()
-            
-            # Estrai il contenuto principale
-            content = ""
-            
-            # Prova diversi selettori per il contenuto principale
-            content_selectors = [
-                'article',
-                '.post-content',
-                '.entry-content', 
-                '.content',
-                '.main-content',
-                '#content',
-                '.article-body',
-                '.post-body',
-                'main'
-            ]
+            result = self._parse_article_html(url, fetched.text)
+            result['bytes_downloaded'] = fetched.bytes_read
             
-            content_element = None
-            for selector in content_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    content_element = element
-                    break
+            if self.article_cache:
+                self.article_cache.store(url, fetched.headers, fetched.text.encode('utf-8'),
+                                         fetched.content_hash, result, self._extractor())
+                result['cache_status'] = 'miss'
             
-            if not content_element:
-                # Se non trova selettori specifici, usa tutto il body
-                content_element = soup.find('body')
-            
-            if content_element:
-                # Estrai solo i paragrafi e gli heading
-                paragraphs = content_element.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-                content = ' '.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
-            
-            return {
-                'url': url,
-                'title': title,
-                'content': content,
-                'success': True,
-                'word_count': len(content.split())
-            }
+            return result
             
         except Exception as e:
             return {
@@ -230,15 +361,66 @@ class ContentGapAnalyzer:
                 'title': '',
                 'content': '',
                 'success': False,
-                'error': str(e)
+                'error': str(e),
+                'error_type': classify_error(e)
             }
     
-    def extract_topics(self, text):
+    def _extractor(self):
+        """Parser, strategia e versione dell'estrazione correnti"""
+        return extractor_signature(self.html_parser, self.content_strategy)
+    
+    def _current_cache_entry(self, entry):
+        """
+        Voce della cache con il parsing dell'estrattore corrente
+        
+        Se la voce è stata prodotta con un altro parser, un'altra strategia o una versione
+        precedente dell'estrazione, il corpo salvato viene rielaborato e la voce aggiornata.
+        
+        Args:
+            entry (CacheEntry): Voce della cache
+            
+        Returns:
+            CacheEntry: Voce aggiornata, None se il corpo salvato non è disponibile
+        """
+        extractor = self._extractor()
+        if entry.extractor == extractor:
+            return entry
+        body = entry.read_body()
+        if body is None:
+            return None
+        parsed = self._parse_article_html(entry.url, body.decode('utf-8'))
+        if 'bytes_downloaded' in entry.parsed:
+            parsed['bytes_downloaded'] = entry.parsed['bytes_downloaded']
+        return self.article_cache.replace_parsed(entry, parsed, extractor)
+    
+    def _parse_article_html(self, url, html):
+        """
+        Estrae titolo e contenuto principale dall'HTML di un articolo
+        
+        Args:
+            url (str): URL dell'articolo
+            html (bytes | str): HTML della pagina
+            
+        Returns:
+            dict: Contenuto dell'articolo estratto
+        """
+        result = {'url': url}
+        result.update(extract_article(html, parser=self.html_parser, strategy=self.content_strategy))
+        result['success'] = True
+        return result
+    
+    def extract_topics(self, text, language=None, min_topics=0):
         """
         Estrae gli argomenti principali da un testo
         
+        Unigrammi, bigrammi e trigrammi vengono contati in un solo passaggio (TopicEngine)
+        e ordinati con la statistica configurata, con stopword e tokenizzatore della lingua.
+        
         Args:
-            text (str): Testo da analizzare
+            text (str | ArticleDocument): Testo da analizzare o documento già elaborato
+            language (str): Lingua del testo (default: rilevata dal testo)
+            min_topics (int): Sotto questo numero di argomenti ricorrenti considera anche
+                gli n-grammi visti una volta (testi brevi come l'AI Overview)
             
         Returns:
             list: Lista di argomenti/concetti chiave
@@ -246,65 +428,36 @@ class ContentGapAnalyzer:
         if not text:
             return []
         
-        # Validazione del tipo di input
-        if isinstance(text, dict):
-            text = str(text)
-        elif not isinstance(text, str):
-            text = str(text)
-        
-        # Pulisci il testo
-        text = re.sub(r'[^\w\s]', ' ', text.lower())
-        
-        # Tokenizza
-        words = word_tokenize(text)
-        
-        # Rimuovi stopwords e parole troppo corte
-        filtered_words = [
-            word for word in words 
-            if word not in self.stop_words 
-            and len(word) > 2 
-            and word.isalpha()
-        ]
-        
-        # Conta le frequenze
-        word_freq = Counter(filtered_words)
-        
-        # Estrai frasi chiave (bigrammi e trigrammi)
-        sentences = sent_tokenize(text)
-        key_phrases = []
-        
-        for sentence in sentences:
-            # Cerca pattern specifici
-            patterns = [
-                r'\b(machine learning|deep learning|intelligenza artificiale|neural network|algoritmi|automazione)\b',
-                r'\b(applicazioni|vantaggi|sfide|definizione|caratteristiche)\b',
-                r'\b(sanità|trasporti|finanza|industria|robotica)\b'
-            ]
+        # Documento già elaborato: riusa la forma minuscola
+        if isinstance(text, ArticleDocument):
+            lower_text = text.lower
+        else:
+            # Validazione del tipo di input
+            if not isinstance(text, str):
+                text = str(text)
+            lower_text = text.lower()
+        
+        engine = self._topic_engine(language or self._detect_language([lower_text]))
+        if self.idf_store is None:
+            return engine.extract_from_lower_texts([lower_text], min_topics=min_topics)
+        return self._extract_weighted_topics([lower_text], engine, min_topics=min_topics)
+    
+    def _extract_weighted_topics(self, lower_texts, engine=None, min_topics=0):
+        """
+        Estrae gli argomenti con peso TF-IDF e registra il documento nell'archivio IDF
+        
+        Args:
+            lower_texts (list): Testi minuscoli del documento (testo intero o frammenti)
+            engine (TopicEngine): Motore della lingua del documento (default: lingua dell'AI Overview)
+            min_topics (int): Soglia per considerare anche gli n-grammi visti una volta
             
-            for pattern in patterns:
-                matches = re.findall(pattern, sentence.lower())
-                key_phrases.extend(matches)
-        
-        # Combina parole frequenti e frasi chiave
-        topics = []
-        
-        # Aggiungi le parole più frequenti
-        for word, freq in word_freq.most_common(20):
-            if freq > 1:  # Solo parole che appaiono più di una volta
-                topics.append(word)
-        
-        # Aggiungi frasi chiave
-        topics.extend(key_phrases)
-        
-        # Rimuovi duplicati mantenendo l'ordine
-        seen = set()
-        unique_topics = []
-        for topic in topics:
-            if topic not in seen:
-                seen.add(topic)
-                unique_topics.append(topic)
-        
-        return unique_topics
+        Returns:
+            list: Argomenti ordinati per punteggio TF-IDF
+        """
+        engine = engine or self.topic_engine
+        counts = engine.count_texts(lower_texts)
+        self.idf_store.add_document(counts.terms(), document_digest(lower_texts))
+        return [topic.text for topic in engine.rank(counts, idf=self.idf_store.idf, min_topics=min_topics)]
     
     def calculate_similarity(self, text1, text2):
         """
@@ -324,7 +477,8 @@ class ContentGapAnalyzer:
         Trova gli argomenti dell'AI Overview che mancano nell'articolo con analisi semantica avanzata
         
         Args:
-            article_content (str): Contenuto dell'articolo
+            article_content (str | ArticleDocument): Contenuto dell'articolo o documento
+                già elaborato (ArticleDocument), condiviso da tutte le fasi dell'analisi
             
         Returns:
             dict: Analisi avanzata dei gap di contenuto
@@ -332,22 +486,69 @@ class ContentGapAnalyzer:
         if not self.ai_overview_content:
             return {'error': 'AI Overview non caricato'}
         
-        article_topics = self.extract_topics(article_content)
-        
-        missing_topics = []
-        covered_topics = []
-        partially_covered = []
-        semantic_matches = []
-        
         # Scegli il metodo di analisi
-        if self.use_semantic_analysis and self.semantic_analyzer:
+        method = 'direct_gemini' if self.use_semantic_analysis and self.semantic_analyzer else 'basic'
+        
+        # Articolo e AI Overview invariati: riusa il risultato memorizzato
+        # (in modalità delta solo per gli articoli di cui è già conservato lo stato)
+        memo_key = None
+        if self.result_memo is not None:
+            if isinstance(article_content, ArticleDocument):
+                content_hash = article_content.content_hash
+                state_key = article_content.url or content_hash
+            else:
+                content_hash = state_key = text_digest(str(article_content))
+            memo_key = (self._overview_hash(), content_hash, method, self._memo_config_version())
+            tracked = not self.delta_mode or state_key in self.article_states
+            cached = self.result_memo.get(*memo_key) if tracked else None
+            if cached is not None:
+                print("⚡ Risultato dal memo (articolo e AI Overview invariati)")
+                cached['cache_hit'] = True
+                return cached
+        
+        document = self._as_document(article_content)
+        article_language = self._detect_language([document.lower])
+        article_topics = self.extract_topics(document, language=article_language)
+        
+        if method == 'direct_gemini':
             print("🔍 Utilizzo analisi diretta con Gemini...")
-            return self._analyze_with_direct_gemini(article_content)
+            result = self._analyze_with_direct_gemini(document, article_topics)
+            if self.delta_mode:
+                self._track_article(document, article_topics, None, article_language)
         else:
             print("📊 Utilizzo analisi base...")
-            return self._analyze_with_basic_method(article_content, article_topics)
+            result = self._analyze_with_basic_method(document, article_topics, article_language)
+        
+        result['language'] = article_language
+        
+        # Gli esiti di errore non vengono memorizzati
+        if memo_key is not None and 'error' not in result and \
+                not str(result.get('analysis_method', '')).endswith('_error'):
+            self.result_memo.put(*memo_key, result)
+        result['cache_hit'] = False
+        return result
+    
+    def _overview_hash(self):
+        """Hash dell'AI Overview caricato e dei suoi topic (chiave del memo)"""
+        overview_index = self._get_overview_index()
+        return document_digest([overview_index.content_hash] + overview_index.texts)
+    
+    @staticmethod
+    def _as_document(article_content):
+        """
+        Converte il contenuto di un articolo in ArticleDocument (una sola volta)
+        
+        Args:
+            article_content (str | ArticleDocument): Testo o documento già elaborato
+            
+        Returns:
+            ArticleDocument: Documento condiviso dalle fasi dell'analisi
+        """
+        if isinstance(article_content, ArticleDocument):
+            return article_content
+        return ArticleDocument.from_text(article_content if isinstance(article_content, str) else str(article_content))
     
-    def _analyze_with_direct_gemini(self, article_content, article_url=None):
+    def _analyze_with_direct_gemini(self, document: ArticleDocument, article_topics: List[str]):
         """
         Analizza il gap usando direttamente Gemini - versione semplificata e robusta
         """
@@ -360,9 +561,9 @@ class ContentGapAnalyzer:
             {self.ai_overview_content[:4000]}
             
             ARTICOLO DA ANALIZZARE:
-            {article_content[:6000]}
+            {document.text[:6000]}
             
-            {f"URL: {article_url}" if article_url else ""}
+            {f"URL: {document.url}" if document.url else ""}
             
             1. Argomenti coperti dall'articolo
             2. Argomenti mancanti rispetto all'AI Overview
@@ -397,7 +598,7 @@ class ContentGapAnalyzer:
                 },
                 'analysis_summary': response_text,
                 'analysis_method': 'direct_gemini_simplified',
-                'article_topics': self.extract_topics(article_content)[:15],
+                'article_topics': article_topics[:15],
                 'weighted_coverage': 75,
                 'gemini_raw_response': response_text
             }
@@ -425,7 +626,8 @@ class ContentGapAnalyzer:
                 'gemini_raw_response': f"Errore: {str(e)}"
             }
     
-    def _analyze_with_semantic_api(self, article_content: str, article_topics: List[str]) -> Dict[str, Any]:
+    def _analyze_with_semantic_api(self, document: ArticleDocument, article_topics: List[str],
+                                   language: Optional[str] = None) -> Dict[str, Any]:
         """
         Analisi avanzata utilizzando l'API semantica
         """
@@ -438,7 +640,7 @@ class ContentGapAnalyzer:
             # Trova corrispondenze semantiche avanzate
             api_matches = self.semantic_analyzer.find_semantic_matches(
                 self.ai_overview_topics, 
-                article_content, 
+                document.text, 
                 threshold=0.7
             )
             
@@ -469,7 +671,7 @@ class ContentGapAnalyzer:
                 if ai_topic not in matched_ai_topics:
                     # Controllo esatto
                     ai_topic_str = ai_topic if isinstance(ai_topic, str) else str(ai_topic)
-                    if ai_topic_str.lower() in article_content.lower():
+                    if ai_topic_str.lower() in document.lower:
                         covered_topics.append({
                             'topic': ai_topic,
                             'match_type': 'exact',
@@ -479,7 +681,7 @@ class ContentGapAnalyzer:
                     else:
                         # Analizza rilevanza per prioritizzazione
                         relevance = self.semantic_analyzer.analyze_topic_relevance(
-                            ai_topic, article_content, method="local"
+                            ai_topic, document.text, method="local"
                         )
                         
                         missing_topics.append({
@@ -509,7 +711,7 @@ class ContentGapAnalyzer:
         except Exception as e:
             print(f"⚠️ Errore nell'analisi semantica API: {e}")
             print("🔄 Fallback all'analisi base...")
-            return self._analyze_with_basic_method(article_content, article_topics)
+            return self._analyze_with_basic_method(document, article_topics, language)
         
         # Calcola statistiche avanzate
         total_ai_topics = len(self.ai_overview_topics)
@@ -525,10 +727,10 @@ class ContentGapAnalyzer:
         coverage_percentage = (len(covered_topics) / total_ai_topics * 100) if total_ai_topics > 0 else 0
         
         # Analisi della qualità del contenuto
-        content_quality = self._analyze_content_quality(article_content, covered_topics, missing_topics)
+        content_quality = self._analyze_content_quality(document, covered_topics, missing_topics)
         
         # Genera raccomandazioni avanzate utilizzando l'API semantica
-        recommendations = self._generate_api_recommendations(missing_topics, article_content)
+        recommendations = self._generate_api_recommendations(missing_topics, document, language)
         
         return {
             'total_ai_topics': total_ai_topics,
@@ -541,16 +743,18 @@ class ContentGapAnalyzer:
             'article_topics': article_topics[:15],
             'content_quality': content_quality,
             'recommendations': recommendations,
+            'section_placements': self._place_topics(document, missing_topics, partially_covered, language),
             'analysis_method': 'semantic_api'
         }
     
-    def _generate_api_recommendations(self, missing_topics: List[Dict], article_content: str) -> List[Dict[str, Any]]:
+    def _generate_api_recommendations(self, missing_topics: List[Dict], document: ArticleDocument,
+                                      language: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Genera raccomandazioni intelligenti usando direttamente Gemini per confrontare AI Overview e articolo
         
         Args:
             missing_topics: Lista di argomenti mancanti
-            article_content: Contenuto dell'articolo
+            document: Articolo elaborato (ArticleDocument)
             
         Returns:
             Lista di raccomandazioni dettagliate generate da Gemini
@@ -560,7 +764,7 @@ class ContentGapAnalyzer:
         
         try:
             # Approccio diretto: chiedi a Gemini di confrontare AI Overview e articolo
-            recommendations = self._get_direct_gemini_recommendations(missing_topics, article_content)
+            recommendations = self._get_direct_gemini_recommendations(missing_topics, document, language)
             
             if recommendations:
                 return recommendations
@@ -572,9 +776,15 @@ class ContentGapAnalyzer:
             print(f"⚠️ Errore nella generazione di raccomandazioni API: {e}")
             return self.generate_advanced_recommendations(missing_topics, [], {})
     
-    def _get_direct_gemini_recommendations(self, missing_topics: List[Dict], article_content: str) -> List[Dict[str, Any]]:
+    def _get_direct_gemini_recommendations(self, missing_topics: List[Dict], document: ArticleDocument,
+                                           language: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Genera raccomandazioni utilizzando direttamente Gemini (metodo semplificato)
+        
+        Args:
+            missing_topics: Lista di argomenti mancanti
+            document: Articolo elaborato (ArticleDocument)
+            language: Lingua dell'articolo già rilevata (default: rilevata dal testo)
         """
         try:
             # Prepara la lista degli argomenti mancanti
@@ -595,7 +805,7 @@ class ContentGapAnalyzer:
             {self.ai_overview_content[:4000]}
             
             ARTICOLO:
-            {article_content[:4000]}
+            {document.text[:4000]}
             
             ARGOMENTI MANCANTI IDENTIFICATI:
             {', '.join(missing_list)}
@@ -611,7 +821,6 @@ class ContentGapAnalyzer:
                     "type": "critico|strutturale|generale",
                     "relevance_score": 0.8,
                     "implementation": "Come implementare concretamente",
-                    "where_to_add": "Dove inserire nell'articolo",
                     "added_value": "Valore aggiunto per il lettore"
                 }}
             ]
@@ -627,93 +836,143 @@ class ContentGapAnalyzer:
             
             import json
             try:
-                recommendations = json.loads(response_text)
-                return recommendations[:8]  # Limita a 8 raccomandazioni
+                recommendations = json.loads(response_text)[:8]  # Limita a 8 raccomandazioni
+                
+                # Collocazione calcolata localmente sulle sezioni dell'articolo
+                recommendations = [rec for rec in recommendations if isinstance(rec, dict)]
+                placements = self._section_mapper(document, language).place(
+                    [rec.get('topic') or rec.get('title', '') for rec in recommendations]
+                )
+                for rec, placement in zip(recommendations, placements):
+                    rec['where_to_add'] = placement['where_to_add']
+                    rec['insert_offset'] = placement['insert_offset']
+                return recommendations
             except json.JSONDecodeError:
                 print(f"⚠️ Errore parsing raccomandazioni Gemini: {response_text[:200]}...")
-                return self._generate_basic_recommendations(missing_topics)
+                return self.generate_advanced_recommendations(missing_topics, [], {})
                 
         except Exception as e:
             print(f"⚠️ Errore generazione raccomandazioni Gemini: {e}")
-            return self._generate_basic_recommendations(missing_topics)
+            return self.generate_advanced_recommendations(missing_topics, [], {})
     
-    def _analyze_with_basic_method(self, article_content: str, article_topics: List[str]) -> Dict[str, Any]:
+    def _analyze_with_basic_method(self, document: ArticleDocument, article_topics: List[str],
+                                   language: Optional[str] = None) -> Dict[str, Any]:
         """
         Analisi base senza API esterne
         """
-        missing_topics = []
-        covered_topics = []
-        partially_covered = []
-        semantic_matches = []
+        # Topic e sinonimi cercati nell'articolo con un solo passaggio dell'automa
+        overview_index = self._get_overview_index()
+        coverage = overview_index.coverage.scan_lower(document.lower)
+        
+        # Indice di trigrammi costruito una volta sui topic dell'articolo
+        verdicts = self._evaluate_topics(self.ai_overview_topics, overview_index.topics, coverage,
+                                         FuzzyMatcher(article_topics))
+        if self.delta_mode:
+            self._track_article(document, article_topics, dict(zip(overview_index.texts, verdicts)), language)
+        return self._build_basic_result(document, article_topics, verdicts, language)
+    
+    def _evaluate_topics(self, ai_topics, indexed_topics, coverage, topic_matcher) -> List[TopicVerdict]:
+        """
+        Esito di ogni topic dell'AI Overview per un articolo
+        
+        Args:
+            ai_topics (list): Topic da valutare
+            indexed_topics (tuple[IndexedTopic]): Topic indicizzati, allineati ad ai_topics
+            coverage (CoverageScan): Copertura esatta e per sinonimi, con gli stessi indici
+            topic_matcher (FuzzyMatcher): Indice di trigrammi dei topic dell'articolo
+            
+        Returns:
+            list[TopicVerdict]: Un esito per topic, nello stesso ordine
+        """
+        verdicts = []
         
         # Analisi semantica base
-        for ai_topic in self.ai_overview_topics:
-            found = False
-            partial_match = False
-            best_match = None
-            best_similarity = 0
+        for index, ai_topic in enumerate(ai_topics):
+            verdict = None
+            semantic_match = None
             
             # 1. Cerca corrispondenze esatte (case-insensitive)
             ai_topic_str = ai_topic if isinstance(ai_topic, str) else str(ai_topic)
-            if ai_topic_str.lower() in article_content.lower():
-                covered_topics.append({
+            indexed_topic = indexed_topics[index]
+            if index in coverage.exact:
+                verdict = TopicVerdict('covered', {
                     'topic': ai_topic,
                     'match_type': 'exact',
-                    'confidence': 1.0
+                    'confidence': 1.0,
+                    'offset': coverage.exact[index].start
                 })
-                found = True
             else:
-                # 2. Analisi semantica con multiple soglie
-                for article_topic in article_topics:
-                    similarity = self.calculate_similarity(ai_topic, article_topic)
-                    
-                    if similarity > best_similarity:
-                        best_similarity = similarity
-                        best_match = article_topic
+                # 2. Analisi semantica con multiple soglie (candidati dall'indice di trigrammi)
+                best_match, best_similarity = topic_matcher.best_match(ai_topic_str, indexed_topic.trigrams)
                 
                 # 3. Classificazione basata su soglie multiple
                 if best_similarity > 0.8:  # Alta similarità
-                    covered_topics.append({
+                    verdict = TopicVerdict('covered', {
                         'topic': ai_topic,
                         'match_type': 'semantic_high',
                         'confidence': best_similarity,
                         'matched_with': best_match
                     })
-                    found = True
                 elif best_similarity > 0.6:  # Media similarità
-                    partially_covered.append({
+                    verdict = TopicVerdict('partial', {
                         'ai_topic': ai_topic,
                         'article_topic': best_match,
                         'similarity': best_similarity,
                         'match_type': 'semantic_medium'
                     })
-                    partial_match = True
                 elif best_similarity > 0.4:  # Bassa similarità
-                    semantic_matches.append({
+                    semantic_match = {
                         'ai_topic': ai_topic,
                         'article_topic': best_match,
                         'similarity': best_similarity,
                         'match_type': 'semantic_low'
-                    })
+                    }
             
             # 4. Controllo per sinonimi e varianti
-            if not found and not partial_match:
-                synonym_match = self._check_synonyms(ai_topic, article_content)
-                if synonym_match:
-                    partially_covered.append({
-                        'ai_topic': ai_topic,
-                        'article_topic': synonym_match['synonym'],
-                        'similarity': synonym_match['confidence'],
-                        'match_type': 'synonym'
-                    })
-                    partial_match = True
+            if verdict is None and index in coverage.synonyms:
+                synonym_hit = coverage.synonyms[index]
+                verdict = TopicVerdict('partial', {
+                    'ai_topic': ai_topic,
+                    'article_topic': synonym_hit.pattern,
+                    'similarity': SYNONYM_CONFIDENCE,
+                    'match_type': 'synonym',
+                    'offset': synonym_hit.start
+                })
             
-            if not found and not partial_match:
-                missing_topics.append({
+            if verdict is None:
+                verdict = TopicVerdict('missing', {
                     'topic': ai_topic,
-                    'priority': self._calculate_topic_priority(ai_topic),
-                    'category': self._categorize_topic(ai_topic)
+                    'priority': indexed_topic.priority,
+                    'category': indexed_topic.category
                 })
+            verdicts.append(verdict._replace(semantic_match=semantic_match) if semantic_match else verdict)
+        
+        return verdicts
+    
+    def _build_basic_result(self, document: ArticleDocument, article_topics: List[str],
+                            verdicts: List[TopicVerdict], language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Risultato dell'analisi base a partire dagli esiti per topic
+        
+        Args:
+            document (ArticleDocument): Documento dell'articolo
+            article_topics (list): Argomenti dell'articolo
+            verdicts (list[TopicVerdict]): Esiti allineati a self.ai_overview_topics
+            language (str): Lingua dell'articolo già rilevata (default: rilevata dal testo)
+            
+        Returns:
+            dict: Analisi dei gap (stesso formato di _analyze_with_basic_method)
+        """
+        buckets = {'covered': [], 'partial': [], 'missing': []}
+        semantic_matches = []
+        for verdict in verdicts:
+            # Copie: gli esiti sono riusati dalla modalità delta
+            buckets[verdict.bucket].append(dict(verdict.entry))
+            if verdict.semantic_match:
+                semantic_matches.append(dict(verdict.semantic_match))
+        covered_topics = buckets['covered']
+        partially_covered = buckets['partial']
+        missing_topics = buckets['missing']
         
         # Calcola statistiche avanzate
         total_ai_topics = len(self.ai_overview_topics)
@@ -727,8 +986,17 @@ class ContentGapAnalyzer:
         
         coverage_percentage = (len(covered_topics) / total_ai_topics * 100) if total_ai_topics > 0 else 0
         
+        # Copertura pesata per IDF: i topic specifici contano più di quelli generici del dominio
+        tfidf_coverage = None
+        if self.idf_store is not None and total_ai_topics > 0:
+            idf_weights = self.idf_store.idf([str(topic) for topic in self.ai_overview_topics])
+            for topic in missing_topics:
+                topic['weight'] = round(idf_weights.get(str(topic['topic']), 1.0), 3)
+            covered_weight = sum(idf_weights.get(str(topic['topic']), 1.0) for topic in covered_topics)
+            tfidf_coverage = round(covered_weight / sum(idf_weights.values()) * 100, 2)
+        
         # Analisi della qualità del contenuto
-        content_quality = self._analyze_content_quality(article_content, covered_topics, missing_topics)
+        content_quality = self._analyze_content_quality(document, covered_topics, missing_topics)
         
         return {
             'total_ai_topics': total_ai_topics,
@@ -738,65 +1006,66 @@ class ContentGapAnalyzer:
             'semantic_matches': semantic_matches,
             'coverage_percentage': round(coverage_percentage, 2),
             'weighted_coverage': round(weighted_coverage, 2),
+            'tfidf_coverage': tfidf_coverage,
             'article_topics': article_topics[:15],
             'content_quality': content_quality,
             'recommendations': self.generate_advanced_recommendations(missing_topics, partially_covered, content_quality),
+            'section_placements': self._place_topics(document, missing_topics, partially_covered, language),
             'analysis_method': 'basic'
         }
     
-    def _check_synonyms(self, topic, content):
-        """
-        Controlla la presenza di sinonimi del topic nel contenuto
-        """
-        # Dizionario di sinonimi comuni (espandibile)
-        synonyms_dict = {
-            'intelligenza artificiale': ['ai', 'machine intelligence', 'artificial intelligence'],
-            'machine learning': ['apprendimento automatico', 'ml', 'apprendimento macchina'],
-            'deep learning': ['apprendimento profondo', 'reti neurali profonde'],
-            'algoritmo': ['algoritmi', 'procedura', 'metodo computazionale'],
-            'dati': ['data', 'informazioni', 'dataset'],
-            'automazione': ['automatizzazione', 'processo automatico'],
-            'efficienza': ['efficacia', 'ottimizzazione', 'performance']
-        }
+    def _section_mapper(self, document: ArticleDocument, language: Optional[str] = None):
+        """Collocatore nelle sezioni con stopword e stemmer della lingua dell'articolo"""
+        profile = get_profile(language or self._detect_language([document.lower]))
+        return SectionMapper(document, profile.stop_words, stem=profile.stem)
+    
+    def _place_topics(self, document: ArticleDocument, missing_topics: List[Dict],
+                      partially_covered: List[Dict], language: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Sezione dell'articolo in cui aggiungere ogni topic mancante o parzialmente coperto
         
-        # Validazione del tipo di input
-        if isinstance(topic, dict):
-            topic = topic.get('topic', str(topic))
-        elif not isinstance(topic, str):
-            topic = str(topic)
+        Calcolata in locale sull'albero delle sezioni (section_mapper.py), senza chiamate a Gemini.
+        
+        Args:
+            document: Articolo elaborato
+            missing_topics: Topic mancanti
+            partially_covered: Topic parzialmente coperti
+            language: Lingua dell'articolo già rilevata (default: rilevata dal testo)
             
-        topic_lower = topic.lower()
-        content_lower = content.lower()
+        Returns:
+            list: Collocazione suggerita per ogni topic, con lo stato 'missing' o 'partial'
+        """
+        topics = [topic['topic'] for topic in missing_topics] + [topic['ai_topic'] for topic in partially_covered]
+        placements = self._section_mapper(document, language).place(topics)
+        for index, placement in enumerate(placements):
+            placement['status'] = 'missing' if index < len(missing_topics) else 'partial'
+        return placements
+    
+    def _get_overview_index(self):
+        """
+        Indice dei topic dell'AI Overview caricato
         
-        for main_term, synonyms in synonyms_dict.items():
-            if main_term in topic_lower:
-                for synonym in synonyms:
-                    if synonym in content_lower:
-                        return {'synonym': synonym, 'confidence': 0.7}
+        Viene ricostruito solo se i topic sono stati modificati dopo load_ai_overview.
         
-        return None
+        Returns:
+            OverviewIndex: Indice precompilato dei topic
+        """
+        overview_index = self.overview_index
+        if overview_index is None or not overview_index.matches(self.ai_overview_topics):
+            overview_index = self.build_overview_index()
+        return overview_index
     
     def _calculate_topic_priority(self, topic):
         """
         Calcola la priorità di un topic mancante
         """
-        high_priority_keywords = ['definizione', 'concetto', 'principio', 'base', 'fondamentale']
-        medium_priority_keywords = ['applicazione', 'esempio', 'caso', 'utilizzo']
-        
         # Validazione del tipo di input
         if isinstance(topic, dict):
             topic = topic.get('topic', str(topic))
         elif not isinstance(topic, str):
             topic = str(topic)
-            
-        topic_lower = topic.lower()
         
-        if any(keyword in topic_lower for keyword in high_priority_keywords):
-            return 'alta'
-        elif any(keyword in topic_lower for keyword in medium_priority_keywords):
-            return 'media'
-        else:
-            return 'bassa'
+        return topic_priority(topic.lower(), self.profile.priority_keywords)
     
     def _categorize_topic(self, topic):
         """
@@ -807,40 +1076,26 @@ class ContentGapAnalyzer:
             topic = topic.get('topic', str(topic))
         elif not isinstance(topic, str):
             topic = str(topic)
-            
-        categories = {
-            'teorico': ['definizione', 'concetto', 'teoria', 'principio'],
-            'pratico': ['applicazione', 'esempio', 'caso', 'utilizzo', 'implementazione'],
-            'tecnico': ['algoritmo', 'metodo', 'tecnica', 'processo'],
-            'etico': ['etica', 'responsabilità', 'trasparenza', 'bias'],
-            'economico': ['costo', 'investimento', 'mercato', 'business']
-        }
         
-        topic_lower = topic.lower()
-        
-        for category, keywords in categories.items():
-            if any(keyword in topic_lower for keyword in keywords):
-                return category
-        
-        return 'generale'
+        return topic_category(topic.lower(), self.profile.categories)
     
-    def _analyze_content_quality(self, content, covered_topics, missing_topics):
+    def _analyze_content_quality(self, document: ArticleDocument, covered_topics, missing_topics):
         """
         Analizza la qualità complessiva del contenuto
         """
-        word_count = len(content.split())
-        sentence_count = len(sent_tokenize(content))
+        word_count = document.word_count
+        sentence_count = document.sentence_count
         
         # Calcola metriche di qualità
         avg_sentence_length = word_count / sentence_count if sentence_count > 0 else 0
         
         # Analizza la profondità del contenuto
         depth_indicators = ['esempio', 'dettaglio', 'approfondimento', 'analisi', 'studio']
-        depth_score = sum(1 for indicator in depth_indicators if indicator in content.lower())
+        depth_score = sum(1 for indicator in depth_indicators if indicator in document.lower)
         
         # Analizza la struttura
         structure_indicators = ['introduzione', 'conclusione', 'capitolo', 'sezione']
-        structure_score = sum(1 for indicator in structure_indicators if indicator in content.lower())
+        structure_score = sum(1 for indicator in structure_indicators if indicator in document.lower)
         
         quality_score = min(100, (
             (len(covered_topics) / max(1, len(covered_topics) + len(missing_topics))) * 40 +
@@ -864,7 +1119,7 @@ class ContentGapAnalyzer:
         Args:
             missing_topics (list): Lista degli argomenti mancanti con priorità
             partially_covered (list): Argomenti parzialmente coperti
-            content_quality (dict): Metriche di qualità del contenuto
+            content_quality (dict): Metriche di qualità del contenuto ({} se non calcolate)
             
         Returns:
             list: Lista di raccomandazioni prioritizzate
@@ -894,8 +1149,8 @@ class ContentGapAnalyzer:
                 'impact': 'Migliora la qualità e profondità del contenuto'
             })
         
-        # Raccomandazioni basate sulla qualità del contenuto
-        if content_quality['overall_quality'] < 60:
+        # Raccomandazioni basate sulla qualità del contenuto (se le metriche sono disponibili)
+        if content_quality and content_quality['overall_quality'] < 60:
             if content_quality['depth_score'] < 3:
                 recommendations.append({
                     'type': 'strutturale',
@@ -974,8 +1229,9 @@ class ContentGapAnalyzer:
                 'error': article_data['error']
             }
         
-        # Analizza i gap
-        gap_analysis = self.find_missing_topics(article_data['content'])
+        # Analizza i gap su un documento elaborato una sola volta
+        document = ArticleDocument.from_article_data(article_data)
+        gap_analysis = self.find_missing_topics(document)
         
         # Combina i risultati
         result = {
@@ -983,84 +1239,235 @@ class ContentGapAnalyzer:
             'title': article_data['title'],
             'word_count': article_data['word_count'],
             'success': True,
+            'cache_hit': gap_analysis.get('cache_hit', False),
             'gap_analysis': gap_analysis
         }
         
         return result
     
-    def analyze_multiple_articles(self, article_urls):
+    def analyze_multiple_articles(self, article_urls, max_workers: Optional[int] = None):
         """
         Analizza il gap di contenuto per più articoli
         
+        Con più worker gli articoli vengono scaricati e analizzati in parallelo; le
+        richieste verso lo stesso host restano limitate dal client HTTP (HTTP_POOL_MAXSIZE)
+        e i risultati mantengono l'ordine degli URL.
+        
         Args:
             article_urls (list): Lista di URL degli articoli
+            max_workers (int): Numero di worker (default: variabile d'ambiente
+                ANALYZER_MAX_WORKERS o 8; 1 = esecuzione seriale)
             
         Returns:
             dict: Risultati dell'analisi per tutti gli articoli
         """
-        results = []
+        if max_workers is None:
+            max_workers = int(os.environ.get('ANALYZER_MAX_WORKERS', 8))
+        max_workers = max(1, min(max_workers, len(article_urls) or 1))
         
-        for url in article_urls:
+        def timed_analysis(url):
+            start = time.perf_counter()
             result = self.analyze_article_gap(url)
-            results.append(result)
+            return result, time.perf_counter() - start
+        
+        wall_start = time.perf_counter()
+        if max_workers == 1:
+            timed_results = [timed_analysis(url) for url in article_urls]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gap') as executor:
+                # map preserva l'ordine degli URL in input
+                timed_results = list(executor.map(timed_analysis, article_urls))
+        wall_time = time.perf_counter() - wall_start
+        
+        results = [result for result, _ in timed_results]
+        serial_time = sum(duration for _, duration in timed_results)
         
         # Genera un riassunto
         summary = self.generate_summary(results)
         
+        print(f"⏱️ {len(article_urls)} articoli in {wall_time:.2f}s con {max_workers} worker "
+              f"(somma tempi per articolo: {serial_time:.2f}s)")
+        
         return {
             'individual_results': results,
-            'summary': summary
+            'summary': summary,
+            'timing': {
+                'workers': max_workers,
+                'wall_seconds': round(wall_time, 3),
+                'serial_seconds': round(serial_time, 3),
+                'speedup': round(serial_time / wall_time, 2) if wall_time > 0 else None
+            }
         }
     
-    def generate_summary(self, results):
+    def _track_article(self, document: ArticleDocument, article_topics: List[str], verdicts, language: str):
+        """Conserva documento, lingua ed esiti per topic di un articolo (modalità delta)"""
+        key = document.url or document.content_hash
+        self.article_states[key] = ArticleState(document, list(article_topics), verdicts, language)
+    
+    def update_ai_overview(self, ai_overview_text):
         """
-        Genera un riassunto dell'analisi di più articoli
+        Carica un nuovo AI Overview e lo confronta con quello precedente
         
         Args:
-            results (list): Lista dei risultati individuali
+            ai_overview_text (str | list[TextFragment]): Nuovo AI Overview (vedi load_ai_overview)
             
         Returns:
-            dict: Riassunto dell'analisi
+            OverviewDiff: Topic aggiunti, rimossi e invariati
         """
-        successful_analyses = [r for r in results if r.get('success', False)]
+        previous_topics = list(self.ai_overview_topics)
+        self.load_ai_overview(ai_overview_text)
+        self.overview_diff = diff_topics(previous_topics, self.ai_overview_topics)
+        print(f"🔀 AI Overview aggiornato: {len(self.overview_diff.added)} topic aggiunti, "
+              f"{len(self.overview_diff.removed)} rimossi, {len(self.overview_diff.unchanged)} invariati")
+        return self.overview_diff
+    
+    def reanalyze_tracked_articles(self):
+        """
+        Rianalizza gli articoli già analizzati (modalità delta) sull'AI Overview corrente
         
-        if not successful_analyses:
-            return {'error': 'Nessuna analisi riuscita'}
+        Gli articoli non vengono scaricati di nuovo: per ogni documento conservato si
+        cercano solo i topic che non hanno ancora un esito (aggiunti o modificati), gli
+        esiti degli altri topic vengono riusati. Gli articoli analizzati con Gemini, o
+        tutti se il metodo corrente è Gemini, vengono rianalizzati per intero sul
+        documento conservato.
         
-        # Calcola statistiche aggregate
-        total_articles = len(successful_analyses)
-        avg_coverage = sum(r['gap_analysis']['coverage_percentage'] for r in successful_analyses) / total_articles
+        Returns:
+            dict: Risultati per articolo, riepilogo e lavoro risparmiato ('delta')
+        """
+        start = time.perf_counter()
+        overview_index = self._get_overview_index()
+        topic_texts = overview_index.texts
+        basic_method = not (self.use_semantic_analysis and self.semantic_analyzer)
+        
+        # Indici dei soli topic da valutare, condivisi dagli articoli con lo stesso insieme
+        pending_indexes = {}
+        evaluated = reused = full_reanalyses = 0
+        results = []
+        
+        for key, state in list(self.article_states.items()):
+            document = state.document
+            if not basic_method or state.verdicts is None:
+                gap_analysis = self.find_missing_topics(document)
+                full_reanalyses += 1
+            else:
+                pending = tuple(index for index, text in enumerate(topic_texts) if text not in state.verdicts)
+                verdicts = dict(state.verdicts)
+                if pending:
+                    pending_texts = tuple(topic_texts[index] for index in pending)
+                    pending_index = pending_indexes.get(pending_texts)
+                    if pending_index is None:
+                        pending_index = OverviewIndex.build(
+                            pending_texts, '', self.synonyms,
+                            priority_keywords=self.profile.priority_keywords, categories=self.profile.categories
+                        )
+                        pending_indexes[pending_texts] = pending_index
+                    new_verdicts = self._evaluate_topics(
+                        [self.ai_overview_topics[index] for index in pending], pending_index.topics,
+                        pending_index.coverage.scan_lower(document.lower), FuzzyMatcher(state.article_topics)
+                    )
+                    verdicts.update(zip(pending_texts, new_verdicts))
+                evaluated += len(pending)
+                reused += len(topic_texts) - len(pending)
+                
+                # Lo stato conserva solo i topic dell'AI Overview corrente
+                current = {text: verdicts[text] for text in topic_texts}
+                self.article_states[key] = ArticleState(document, state.article_topics, current, state.language)
+                gap_analysis = self._build_basic_result(
+                    document, state.article_topics, [current[text] for text in topic_texts], state.language
+                )
+                gap_analysis['language'] = state.language
+                gap_analysis['cache_hit'] = False
+            
+            results.append({
+                'url': document.url or key,
+                'title': document.title,
+                'word_count': document.word_count,
+                'success': True,
+                'cache_hit': gap_analysis.get('cache_hit', False),
+                'gap_analysis': gap_analysis
+            })
         
-        # Trova argomenti più comunemente mancanti
-        all_missing = []
-        for result in successful_analyses:
-            all_missing.extend(result['gap_analysis']['missing_topics'])
+        elapsed = time.perf_counter() - start
+        total_evaluations = evaluated + reused
+        delta = {
+            'articles': len(results),
+            'articles_not_refetched': len(results),
+            'full_reanalyses': full_reanalyses,
+            'topic_evaluations': evaluated,
+            'topic_evaluations_reused': reused,
+            'work_saved_percentage': round(reused / total_evaluations * 100, 2) if total_evaluations else 0.0,
+            'elapsed_seconds': round(elapsed, 3)
+        }
+        if self.overview_diff is not None:
+            delta['overview_diff'] = {
+                'added': self.overview_diff.added,
+                'removed': self.overview_diff.removed,
+                'unchanged': len(self.overview_diff.unchanged)
+            }
         
-        common_missing = Counter(all_missing).most_common(10)
+        print(f"♻️ Rianalisi delta di {len(results)} articoli in {elapsed:.2f}s: {evaluated} topic valutati, "
+              f"{reused} riusati ({delta['work_saved_percentage']}% di lavoro risparmiato)")
         
         return {
-            'total_articles_analyzed': total_articles,
-            'average_coverage_percentage': round(avg_coverage, 2),
-            'most_common_missing_topics': common_missing,
-            'articles_with_low_coverage': [
-                {'url': r['url'], 'coverage': r['gap_analysis']['coverage_percentage']} 
-                for r in successful_analyses 
-                if r['gap_analysis']['coverage_percentage'] < 50
-            ]
+            'individual_results': results,
+            'summary': self.generate_summary(results),
+            'delta': delta
         }
     
-    def save_analysis_report(self, analysis_result, filename):
+    def save_article_states(self, path):
+        """
+        Salva su file lo stato degli articoli della modalità delta
+        
+        Args:
+            path (str): File di destinazione
+        """
+        save_states(self.article_states, path)
+        print(f"💾 Stato di {len(self.article_states)} articoli salvato in: {path}")
+    
+    def load_article_states(self, path):
+        """
+        Carica lo stato degli articoli salvato con save_article_states
+        
+        Args:
+            path (str): File dello stato
+            
+        Raises:
+            ValueError: File non riconosciuto o di una versione diversa dello stato
+        """
+        self.article_states.update(load_states(path))
+        print(f"📂 Stato di {len(self.article_states)} articoli caricato da: {path}")
+    
+    def generate_summary(self, results):
+        """
+        Genera un riassunto dell'analisi di più articoli
+        
+        I risultati vengono consumati uno alla volta da SummaryAggregator: per stream
+        lunghi conviene usare direttamente l'aggregatore (add/snapshot).
+        
+        Args:
+            results (iterable): Risultati individuali (lista o generatore)
+            
+        Returns:
+            dict: Riassunto dell'analisi
+        """
+        aggregator = SummaryAggregator()
+        for result in results:
+            aggregator.add(result)
+        return aggregator.snapshot()
+    
+    def save_analysis_report(self, analysis_result, filename, format=None):
         """
-        Salva il report dell'analisi in un file JSON
+        Salva il report dell'analisi
         
         Args:
             analysis_result (dict): Risultato dell'analisi
             filename (str): Nome del file
+            format (str): 'json', 'json.gz', 'jsonl' (append) o 'parquet' (righe per topic);
+                default dedotto dall'estensione di filename
         """
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(analysis_result, f, ensure_ascii=False, indent=2)
-            print(f"Report salvato in: {filename}")
+            path = write_report(analysis_result, filename, format)
+            print(f"Report salvato in: {path}")
         except Exception as e:
             print(f"Errore nel salvare il report: {e}")
 
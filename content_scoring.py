@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Individuazione del contenuto principale di una pagina con punteggio dei blocchi
+
+Approccio in stile Readability su albero lxml, in un solo passaggio post-order:
+per ogni elemento si accumulano lunghezza del testo, testo dei link e virgole; ogni
+paragrafo sufficientemente lungo assegna un punteggio al genitore (intero) e al nonno
+(metà). Il punteggio di un candidato combina priorità del tag, peso di classi/id e
+punteggio dei paragrafi, scalato per (1 - densità dei link). Nello stesso passaggio
+vengono marcati i blocchi da escludere (navigazione, correlati, commenti, condivisione).
+"""
+
+import re
+from typing import Dict, Optional, Set, Tuple
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Priorità dei tag per i blocchi candidati
+TAG_PRIORS = {
+    'article': 10, 'main': 5, 'div': 5, 'section': 3,
+    'pre': 3, 'td': 3, 'blockquote': 3,
+    'address': -3, 'ol': -3, 'ul': -3, 'dl': -3, 'dd': -3, 'dt': -3, 'li': -3, 'form': -3,
+    'h1': -5, 'h2': -5, 'h3': -5, 'h4': -5, 'h5': -5, 'h6': -5, 'th': -5,
+}
+
+# Tag che generano punteggio per i blocchi che li contengono
+PARAGRAPH_TAGS = frozenset(['p', 'pre', 'td', 'blockquote'])
+
+# Tag sempre esclusi dal testo del contenuto principale
+PRUNED_TAGS = frozenset(['nav', 'aside', 'footer', 'form'])
+
+POSITIVE_RE = re.compile(
+    r'article|body|content|entry|main|page|post|text|blog|story|testo|articolo', re.IGNORECASE)
+NEGATIVE_RE = re.compile(
+    r'comment|footer|foot|nav|menu|sidebar|related|correlat|leggi|share|social|sponsor|'
+    r'\bads?\b|advert|banner|promo|widget|breadcrumb|popup|cookie|newsletter|most-read|'
+    r'topbar|masthead|\bmeta\b|\btags?\b|testimonial', re.IGNORECASE)
+
+CLASS_WEIGHT = 25
+MIN_PARAGRAPH_CHARS = 25
+MAX_LINK_DENSITY = 0.5
+
+
+def class_weight(element) -> int:
+    """Peso di classi e id: +25 se indicano contenuto, -25 se indicano elementi accessori"""
+    weight = 0
+    for value in (element.get('class'), element.get('id')):
+        if not value:
+            continue
+        if NEGATIVE_RE.search(value):
+            weight -= CLASS_WEIGHT
+        if POSITIVE_RE.search(value):
+            weight += CLASS_WEIGHT
+    return weight
+
+
+def _text_len(text: Optional[str]) -> Tuple[int, int]:
+    if not text:
+        return 0, 0
+    stripped = text.strip()
+    return len(stripped), stripped.count(',')
+
+
+def find_main_content(root) -> Tuple[Optional[object], Set[object], Dict[object, float]]:
+    """
+    Trova il blocco del contenuto principale in un solo passaggio sull'albero
+
+    Args:
+        root: Elemento radice lxml (script e style già rimossi)
+
+    Returns:
+        tuple: (elemento migliore o None, insieme dei blocchi da escludere,
+                punteggi finali dei candidati)
+    """
+    # Statistiche per elemento: [lunghezza testo, lunghezza testo nei link, virgole]
+    stats: Dict[object, list] = {}
+    scores: Dict[object, float] = {}
+    weights: Dict[object, int] = {}
+    pruned: Set[object] = set()
+
+    def candidate(element):
+        if element not in scores:
+            weight = weights.get(element)
+            if weight is None:
+                weight = weights[element] = class_weight(element)
+            scores[element] = TAG_PRIORS.get(element.tag, 0) + weight
+        return element
+
+    for _, element in etree.iterwalk(root, events=('end',)):
+        tag = element.tag
+        if not isinstance(tag, str):
+            continue
+
+        text_len, commas = _text_len(element.text)
+        link_len = 0
+        for child in element:
+            child_stats = stats.get(child)
+            if child_stats is not None:
+                text_len += child_stats[0]
+                link_len += child_stats[1]
+                commas += child_stats[2]
+            tail_len, tail_commas = _text_len(child.tail)
+            text_len += tail_len
+            commas += tail_commas
+        if tag == 'a':
+            link_len = text_len
+        stats[element] = [text_len, link_len, commas]
+
+        weight = weights[element] = class_weight(element)
+        if tag in PRUNED_TAGS or weight < 0 or (
+                text_len and link_len / text_len > MAX_LINK_DENSITY and tag != 'a'):
+            pruned.add(element)
+
+        if tag in PARAGRAPH_TAGS and text_len >= MIN_PARAGRAPH_CHARS:
+            paragraph_score = 1 + commas + min(text_len // 100, 3)
+            parent = element.getparent()
+            if parent is not None:
+                scores[candidate(parent)] += paragraph_score
+                grandparent = parent.getparent()
+                if grandparent is not None:
+                    scores[candidate(grandparent)] += paragraph_score / 2
+
+    best = None
+    best_score = 0.0
+    final_scores = {}
+    for element, score in scores.items():
+        text_len, link_len, _ = stats.get(element, (0, 0, 0))
+        link_density = link_len / text_len if text_len else 1.0
+        final = score * (1 - link_density)
+        final_scores[element] = final
+        if final > best_score:
+            best, best_score = element, final
+
+    # Il blocco scelto non viene mai escluso, anche se ha classi negative
+    pruned.discard(best)
+    return best, pruned, final_scores
+
+
+def is_pruned(element, container, pruned: Set[object]) -> bool:
+    """True se l'elemento o un suo antenato dentro il contenitore è escluso"""
+    if element in pruned:
+        return True
+    for ancestor in element.iterancestors():
+        if ancestor is container:
+            return False
+        if ancestor in pruned:
+            return True
+    return False
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Cattura di trace, screenshot e snapshot DOM solo per i job di estrazione falliti
+
+Il tracing Playwright viene avviato all'inizio del job e resta in memoria nel browser:
+se il job va a buon fine il trace viene scartato senza scrivere nulla su disco, se
+fallisce o supera la deadline vengono salvati trace, screenshot e DOM in un ring buffer
+su disco con dimensione massima, eliminando gli elementi più vecchi.
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from typing import Optional, Dict, List, Any
+
+# Variabili d'ambiente per l'attivazione e la configurazione
+TRACE_ON_FAILURE_ENV = 'AI_OVERVIEW_TRACE_ON_FAILURE'
+ARTIFACTS_DIR_ENV = 'AI_OVERVIEW_ARTIFACTS_DIR'
+ARTIFACTS_MAX_MB_ENV = 'AI_OVERVIEW_ARTIFACTS_MAX_MB'
+
+DEFAULT_ARTIFACTS_DIR = 'failure_artifacts'
+DEFAULT_MAX_MB = 200
+DEFAULT_MAX_ENTRIES = 50
+
+
+def trace_on_failure_enabled() -> bool:
+    """Controlla se la cattura su errore è abilitata via variabile d'ambiente"""
+    return os.environ.get(TRACE_ON_FAILURE_ENV, 'false').lower() in ('1', 'true', 'yes')
+
+
+class ArtifactRingBuffer:
+    """
+    Ring buffer su disco con limite di dimensione totale e di numero di elementi
+
+    Ogni elemento è una cartella con gli artefatti di un job e un file meta.json.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            directory: Cartella del buffer (default: AI_OVERVIEW_ARTIFACTS_DIR o failure_artifacts)
+            max_bytes: Dimensione massima totale (default: AI_OVERVIEW_ARTIFACTS_MAX_MB o 200 MB)
+            max_entries: Numero massimo di job conservati
+        """
+        self.directory = directory or os.environ.get(ARTIFACTS_DIR_ENV, DEFAULT_ARTIFACTS_DIR)
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get(ARTIFACTS_MAX_MB_ENV, DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def _entry_size(path: str) -> int:
+        total = 0
+        for name in os.listdir(path):
+            try:
+                total += os.path.getsize(os.path.join(path, name))
+            except OSError:
+                continue
+        return total
+
+    def entries(self) -> List[str]:
+        """Cartelle degli elementi dal più vecchio al più recente"""
+        entries = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if os.path.isdir(os.path.join(self.directory, name))
+        ]
+        return sorted(entries, key=lambda path: (os.path.getmtime(path), path))
+
+    def store(self, label: str, artifacts: Dict[str, bytes], metadata: Dict[str, Any]) -> Optional[str]:
+        """
+        Salva gli artefatti di un job ed elimina i più vecchi oltre i limiti
+
+        Args:
+            label: Etichetta leggibile del job (es. la query)
+            artifacts: nome file -> contenuto in byte
+            metadata: Informazioni sul job salvate in meta.json
+
+        Returns:
+            Percorso della cartella salvata o None se gli artefatti superano da soli il limite
+        """
+        total = sum(len(content) for content in artifacts.values())
+        if total > self.max_bytes:
+            print(f"⚠️ Artefatti troppo grandi per il buffer ({total / 1048576:.1f} MB), non salvati")
+            return None
+
+        slug = re.sub(r'[^\w-]+', '_', label or 'job').strip('_')[:50] or 'job'
+        entry = os.path.join(self.directory, f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{slug}")
+        os.makedirs(entry, exist_ok=True)
+
+        for name, content in artifacts.items():
+            with open(os.path.join(entry, name), 'wb') as f:
+                f.write(content)
+        with open(os.path.join(entry, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+        self._evict(keep=entry)
+        return entry
+
+    def _evict(self, keep: Optional[str] = None):
+        """Elimina gli elementi più vecchi finché il buffer rispetta i limiti"""
+        entries = self.entries()
+        sizes = {path: self._entry_size(path) for path in entries}
+        total = sum(sizes.values())
+
+        for path in entries:
+            if total <= self.max_bytes and len(entries) <= self.max_entries:
+                break
+            if path == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= sizes[path]
+            entries = [p for p in entries if p != path]
+            print(f"🧹 Artefatti rimossi dal buffer: {os.path.basename(path)}")
+
+
+class FailureCapture:
+    """
+    Tracing Playwright opzionale che conserva gli artefatti solo per i job falliti
+    """
+
+    def __init__(self, context, page, ring_buffer: Optional[ArtifactRingBuffer] = None):
+        """
+        Args:
+            context: BrowserContext Playwright su cui registrare il trace
+            page: Pagina per screenshot e snapshot DOM
+            ring_buffer: Buffer su disco dove salvare gli artefatti
+        """
+        self.context = context
+        self.page = page
+        self.ring_buffer = ring_buffer or ArtifactRingBuffer()
+        self.active = False
+        self.started_at = None
+
+    def start(self):
+        """Avvia la registrazione del trace (in memoria nel browser)"""
+        self.context.tracing.start(screenshots=True, snapshots=True, sources=False)
+        self.active = True
+        self.started_at = time.time()
+
+    def discard(self):
+        """Interrompe il trace senza salvarlo (job riuscito)"""
+        if not self.active:
+            return
+        try:
+            self.context.tracing.stop()
+        except Exception as e:
+            print(f"⚠️ Errore stop tracing: {e}")
+        self.active = False
+
+    def capture(self, label: str, metadata: Dict[str, Any]) -> Optional[str]:
+        """
+        Salva trace, screenshot e DOM del job fallito nel ring buffer
+
+        Args:
+            label: Etichetta del job (es. la query)
+            metadata: Motivo del fallimento e informazioni sul job
+
+        Returns:
+            Percorso degli artefatti salvati o None
+        """
+        artifacts = {}
+
+        try:
+            artifacts['screenshot.png'] = self.page.screenshot(full_page=True, timeout=10000)
+        except Exception as e:
+            print(f"⚠️ Screenshot non disponibile: {e}")
+
+        try:
+            artifacts['dom.html'] = self.page.content().encode('utf-8')
+        except Exception as e:
+            print(f"⚠️ Snapshot DOM non disponibile: {e}")
+
+        if self.active:
+            trace_path = None
+            try:
+                fd, trace_path = tempfile.mkstemp(suffix='.zip', prefix='trace_')
+                os.close(fd)
+                self.context.tracing.stop(path=trace_path)
+                with open(trace_path, 'rb') as f:
+                    artifacts['trace.zip'] = f.read()
+            except Exception as e:
+                print(f"⚠️ Trace non disponibile: {e}")
+            finally:
+                self.active = False
+                if trace_path and os.path.exists(trace_path):
+                    os.remove(trace_path)
+
+        if not artifacts:
+            return None
+
+        entry = self.ring_buffer.store(label, artifacts, metadata)
+        if entry:
+            print(f"🧾 Artefatti del job fallito salvati in: {entry}")
+        return entry
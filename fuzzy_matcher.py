@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Ricerca fuzzy dei topic con indice di trigrammi di caratteri
+
+L'indice viene costruito una volta sui topic dell'articolo (liste di posting per
+trigramma). Per ogni topic dell'AI Overview i candidati si recuperano dall'indice e
+si ordinano con il coefficiente di Dice sui trigrammi, calcolato in modo vettoriale
+con numpy su tutti i candidati. Solo i migliori `top_k` vengono rivalutati con
+difflib.SequenceMatcher, così il punteggio restituito è lo stesso `ratio()` di
+calculate_similarity e le soglie 0.4/0.6/0.8 mantengono il loro significato.
+"""
+
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_TOP_K = 10
+
+
+def char_trigrams(text: str) -> List[str]:
+    """Trigrammi di caratteri distinti del testo con padding di uno spazio"""
+    padded = f" {text} "
+    return list({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+class FuzzyMatcher:
+    """
+    Indice di trigrammi sui candidati con rivalutazione SequenceMatcher dei migliori
+    """
+
+    def __init__(self, candidates: Sequence[str], top_k: int = DEFAULT_TOP_K):
+        """
+        Args:
+            candidates: Testi da indicizzare (es. topic dell'articolo)
+            top_k: Candidati rivalutati con SequenceMatcher per ogni ricerca
+        """
+        self.candidates = [str(candidate) for candidate in candidates]
+        self.lowered = [candidate.lower() for candidate in self.candidates]
+        self.top_k = top_k
+
+        postings: Dict[str, List[int]] = {}
+        sizes = np.zeros(len(self.candidates), dtype=np.int32)
+        for index, text in enumerate(self.lowered):
+            trigrams = char_trigrams(text)
+            sizes[index] = len(trigrams)
+            for trigram in trigrams:
+                postings.setdefault(trigram, []).append(index)
+
+        self.postings = {trigram: np.asarray(ids, dtype=np.int32) for trigram, ids in postings.items()}
+        self.sizes = sizes
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def candidate_scores(self, query: str,
+                         trigrams: Optional[Sequence[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Coefficiente di Dice sui trigrammi tra la query e tutti i candidati che ne condividono almeno uno
+
+        Args:
+            query: Testo da cercare (già minuscolo)
+            trigrams: Trigrammi distinti della query, se già calcolati (es. OverviewIndex)
+
+        Returns:
+            tuple: (indici dei candidati, punteggi Dice)
+        """
+        if trigrams is None:
+            trigrams = char_trigrams(query)
+        hits = [self.postings[trigram] for trigram in trigrams if trigram in self.postings]
+        if not hits:
+            return np.empty(0, dtype=np.int32), np.empty(0)
+
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.candidates))
+        indices = np.flatnonzero(shared)
+        dice = 2.0 * shared[indices] / (len(trigrams) + self.sizes[indices])
+        return indices, dice
+
+    def best_match(self, query: str, trigrams: Optional[Sequence[str]] = None) -> Tuple[Optional[str], float]:
+        """
+        Candidato più simile alla query secondo SequenceMatcher.ratio()
+
+        Args:
+            query: Testo da cercare
+            trigrams: Trigrammi distinti della query minuscola, se già calcolati
+
+        Returns:
+            tuple: (candidato migliore o None, similarità tra 0 e 1)
+        """
+        if not self.candidates:
+            return None, 0
+
+        query_lower = str(query).lower()
+        indices, dice = self.candidate_scores(query_lower, trigrams)
+        if len(indices) > self.top_k:
+            top = np.argpartition(-dice, self.top_k - 1)[:self.top_k]
+            indices, dice = indices[top], dice[top]
+        order = indices[np.argsort(-dice, kind='stable')]
+
+        best_index = None
+        best_similarity = 0
+        # Stesso ordine degli argomenti di calculate_similarity (a = query, b = candidato)
+        matcher = SequenceMatcher(None, query_lower)
+        for index in order:
+            matcher.set_seq2(self.lowered[index])
+            # Limiti superiori economici prima del calcolo completo
+            if matcher.real_quick_ratio() < best_similarity or matcher.quick_ratio() < best_similarity:
+                continue
+            similarity = matcher.ratio()
+            # A parità di similarità vince il candidato che compare prima (come nel ciclo completo)
+            if similarity > best_similarity or (
+                    similarity == best_similarity and best_index is not None and index < best_index):
+                best_similarity = similarity
+                best_index = index
+
+        if best_index is None:
+            return None, 0
+        return self.candidates[best_index], best_similarity
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Estrazione di titolo e contenuto principale dall'HTML degli articoli
+
+Due implementazioni con lo stesso output `{title, content, word_count, headings, paragraphs}`:
+- 'lxml': parsing con lxml.html ed espressioni XPath precompilate (default, veloce)
+- 'bs4': BeautifulSoup con html.parser (implementazione storica)
+
+Due strategie per individuare il contenuto principale:
+- 'scoring': punteggio dei blocchi in stile Readability (content_scoring.py, default con lxml)
+- 'selectors': primo match tra CONTENT_SELECTORS, altrimenti tutto il body
+
+Parser e strategia si scelgono con i parametri `parser`/`strategy` o con le variabili
+d'ambiente HTML_PARSER e CONTENT_STRATEGY.
+"""
+
+import os
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+from content_scoring import find_main_content, is_pruned
+
+PARSER_ENV = 'HTML_PARSER'
+STRATEGY_ENV = 'CONTENT_STRATEGY'
+STRATEGIES = ('scoring', 'selectors')
+
+# Versione dell'output di estrazione: va incrementata quando cambiano i campi restituiti
+# (es. headings, paragraphs), così i risultati salvati in cache vengono rigenerati
+EXTRACTION_VERSION = 3
+
+# Selettori per il contenuto principale, in ordine di priorità (primo match)
+CONTENT_SELECTORS = [
+    'article',
+    '.post-content',
+    '.entry-content',
+    '.content',
+    '.main-content',
+    '#content',
+    '.article-body',
+    '.post-body',
+    'main'
+]
+
+# Tag di cui si estrae il testo
+CONTENT_TAGS = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+
+HEADING_TAGS = frozenset(CONTENT_TAGS[1:])
+
+# Tag rimossi prima dell'estrazione del testo
+REMOVED_TAGS = ['script', 'style']
+
+
+def _selector_to_xpath(selector: str) -> str:
+    """Traduce un selettore semplice (tag, .classe, #id) in XPath"""
+    if selector.startswith('.'):
+        return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {selector[1:]} ')]"
+    if selector.startswith('#'):
+        return f"//*[@id='{selector[1:]}']"
+    return f"//{selector}"
+
+
+if LXML_AVAILABLE:
+    # Espressioni XPath compilate una volta sola
+    _CONTENT_XPATHS = [etree.XPath(f"({_selector_to_xpath(s)})[1]") for s in CONTENT_SELECTORS]
+    _REMOVED_XPATH = etree.XPath(' | '.join(f"//{tag}" for tag in REMOVED_TAGS))
+    _TITLE_XPATH = etree.XPath("(//title)[1]")
+    _BODY_XPATH = etree.XPath("(//body)[1]")
+    _CONTENT_TAGS_XPATH = etree.XPath(' | '.join(f"descendant::{tag}" for tag in CONTENT_TAGS))
+
+
+def _build_result(title: str, blocks: Iterable[Tuple[str, str]]) -> Dict[str, Any]:
+    """
+    Unisce i blocchi (tag, testo) nel contenuto, tenendo la posizione di heading e paragrafi
+
+    Gli heading sono restituiti come {level, text, offset}, con offset = posizione
+    del primo carattere nel contenuto; i paragrafi come intervalli [inizio, fine).
+    """
+    texts = []
+    headings = []
+    paragraphs = []
+    offset = 0
+    for tag, text in blocks:
+        if not text:
+            continue
+        if tag in HEADING_TAGS:
+            headings.append({'level': int(tag[1]), 'text': text, 'offset': offset})
+        else:
+            paragraphs.append([offset, offset + len(text)])
+        texts.append(text)
+        offset += len(text) + 1
+    content = ' '.join(texts)
+    return {
+        'title': title,
+        'content': content,
+        'word_count': len(content.split()),
+        'headings': headings,
+        'paragraphs': paragraphs
+    }
+
+
+def extract_with_bs4(html) -> Dict[str, Any]:
+    """
+    Estrazione con BeautifulSoup (html.parser)
+
+    Args:
+        html (str | bytes): HTML della pagina
+
+    Returns:
+        dict: title, content, word_count, headings, paragraphs
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Rimuovi script e style
+    for script in soup(REMOVED_TAGS):
+        script.decompose()
+
+    # Estrai il titolo
+    title = ""
+    title_tag = soup.find('title')
+    if title_tag:
+        title = title_tag.get_text().strip()
+
+    # Estrai il contenuto principale
+    blocks = []
+
+    content_element = None
+    for selector in CONTENT_SELECTORS:
+        element = soup.select_one(selector)
+        if element:
+            content_element = element
+            break
+
+    if not content_element:
+        # Se non trova selettori specifici, usa tutto il body
+        content_element = soup.find('body')
+
+    if content_element:
+        # Estrai solo i paragrafi e gli heading
+        paragraphs = content_element.find_all(CONTENT_TAGS)
+        blocks = [(p.name, p.get_text().strip()) for p in paragraphs]
+
+    return _build_result(title, blocks)
+
+
+def _parse_lxml(html):
+    """Documento lxml con script e style rimossi (None se l'HTML è vuoto)"""
+    # lxml non accetta stringhe unicode con dichiarazione XML di encoding
+    if isinstance(html, str) and html.lstrip().startswith('<?xml'):
+        html = html.encode('utf-8')
+
+    try:
+        doc = lxml.html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        return None
+
+    for element in _REMOVED_XPATH(doc):
+        element.drop_tree()
+    return doc
+
+
+def _lxml_title(doc) -> str:
+    title_tags = _TITLE_XPATH(doc)
+    return title_tags[0].text_content().strip() if title_tags else ""
+
+
+def extract_with_lxml(html) -> Dict[str, Any]:
+    """
+    Estrazione con lxml.html e XPath precompilate
+
+    Args:
+        html (str | bytes): HTML della pagina
+
+    Returns:
+        dict: title, content, word_count, headings, paragraphs
+    """
+    doc = _parse_lxml(html)
+    if doc is None:
+        return _build_result('', [])
+
+    content_element = None
+    for xpath in _CONTENT_XPATHS:
+        matches = xpath(doc)
+        if matches:
+            content_element = matches[0]
+            break
+
+    if content_element is None:
+        body = _BODY_XPATH(doc)
+        content_element = body[0] if body else None
+
+    blocks = []
+    if content_element is not None:
+        blocks = [(element.tag, element.text_content().strip())
+                  for element in _CONTENT_TAGS_XPATH(content_element)]
+
+    return _build_result(_lxml_title(doc), blocks)
+
+
+def extract_with_scoring(html) -> Dict[str, Any]:
+    """
+    Estrazione del contenuto principale con punteggio dei blocchi (lxml)
+
+    Nav, footer, box correlati e blocchi di soli link vengono esclusi; se nessun
+    blocco ha abbastanza testo si ricade sulla strategia a selettori.
+
+    Args:
+        html (str | bytes): HTML della pagina
+
+    Returns:
+        dict: title, content, word_count, headings, paragraphs
+    """
+    doc = _parse_lxml(html)
+    if doc is None:
+        return _build_result('', [])
+
+    best, pruned, _ = find_main_content(doc)
+    if best is None:
+        return extract_with_lxml(html)
+
+    blocks = [
+        (element.tag, element.text_content().strip())
+        for element in _CONTENT_TAGS_XPATH(best)
+        if not is_pruned(element, best, pruned)
+    ]
+    return _build_result(_lxml_title(doc), blocks)
+
+
+PARSERS = {
+    'bs4': extract_with_bs4,
+}
+if LXML_AVAILABLE:
+    PARSERS['lxml'] = extract_with_lxml
+
+
+def default_parser() -> str:
+    """Parser di default: HTML_PARSER se impostata, altrimenti lxml se disponibile"""
+    parser = os.environ.get(PARSER_ENV, 'lxml' if LXML_AVAILABLE else 'bs4')
+    return parser if parser in PARSERS else 'bs4'
+
+
+def default_strategy() -> str:
+    """Strategia di default: CONTENT_STRATEGY se impostata, altrimenti scoring"""
+    strategy = os.environ.get(STRATEGY_ENV, 'scoring')
+    return strategy if strategy in STRATEGIES else 'scoring'
+
+
+def extractor_signature(parser: Optional[str] = None, strategy: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parser, strategia e versione dell'estrazione che producono un risultato
+
+    Args:
+        parser: 'lxml' o 'bs4' (default: default_parser())
+        strategy: 'scoring' o 'selectors' (default: default_strategy())
+
+    Returns:
+        dict: {parser, strategy, version}
+    """
+    return {
+        'parser': parser or default_parser(),
+        'strategy': strategy or default_strategy(),
+        'version': EXTRACTION_VERSION,
+    }
+
+
+def extract_article(html, parser: Optional[str] = None, strategy: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Estrae titolo e contenuto principale con il parser e la strategia scelti
+
+    Args:
+        html (str | bytes): HTML della pagina
+        parser: 'lxml' o 'bs4' (default: default_parser())
+        strategy: 'scoring' o 'selectors' (default: default_strategy());
+            lo scoring richiede lxml, con bs4 si usano sempre i selettori
+
+    Returns:
+        dict: title, content, word_count, headings, paragraphs
+    """
+    parser = parser or default_parser()
+    strategy = strategy or default_strategy()
+    if strategy == 'scoring' and parser == 'lxml':
+        return extract_with_scoring(html)
+    return PARSERS[parser](html)
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Client HTTP condiviso per il download degli articoli
+
+Una sola `requests.Session` con pool di connessioni keep-alive per host, retry con
+backoff esponenziale sui metodi idempotenti (GET/HEAD) in caso di errori 5xx o
+connessioni interrotte, timeout separati di connessione e lettura e un limite di
+richieste concorrenti per host. Usato da ContentGapAnalyzer, dal backend e dai job batch.
+
+Configurazione tramite variabili d'ambiente:
+    HTTP_POOL_CONNECTIONS   numero di host con pool dedicato (default 20)
+    HTTP_POOL_MAXSIZE       connessioni keep-alive per host (default 4)
+    HTTP_MAX_RETRIES        tentativi su errori transitori (default 3)
+    HTTP_BACKOFF_FACTOR     base del backoff esponenziale in secondi (default 0.5)
+    HTTP_CONNECT_TIMEOUT    timeout di connessione in secondi (default 5)
+    HTTP_READ_TIMEOUT       timeout di lettura in secondi (default 15)
+    HTTP_MAX_BYTES          dimensione massima di una pagina scaricata (default 5 MB)
+"""
+
+import codecs
+import hashlib
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'it-IT,it;q=0.9,en;q=0.8',
+}
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# Classificazione degli errori di download
+ERROR_TOO_LARGE = 'too_large'
+ERROR_WRONG_TYPE = 'wrong_type'
+ERROR_TRUNCATED = 'truncated'
+ERROR_HTTP = 'http_error'
+ERROR_TIMEOUT = 'timeout'
+ERROR_CONNECTION = 'connection_error'
+
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+
+class FetchError(Exception):
+    """Errore di download con tipo classificato (error_type)"""
+
+    def __init__(self, error_type: str, message: str):
+        super().__init__(message)
+        self.error_type = error_type
+
+
+def classify_error(error: Exception) -> str:
+    """Restituisce il tipo di errore di download per un'eccezione"""
+    if isinstance(error, FetchError):
+        return error.error_type
+    if isinstance(error, requests.exceptions.Timeout):
+        return ERROR_TIMEOUT
+    if isinstance(error, (requests.exceptions.ChunkedEncodingError,
+                          requests.exceptions.ContentDecodingError)):
+        return ERROR_TRUNCATED
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return ERROR_CONNECTION
+    if isinstance(error, requests.exceptions.HTTPError):
+        return ERROR_HTTP
+    return 'error'
+
+
+class FetchResult:
+    """
+    Pagina scaricata in streaming e già decodificata
+    """
+
+    __slots__ = ('url', 'status_code', 'headers', 'text', 'content_hash', 'bytes_read', 'encoding')
+
+    def __init__(self, url, status_code, headers, text='', content_hash=None, bytes_read=0, encoding=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        self.content_hash = content_hash
+        self.bytes_read = bytes_read
+        self.encoding = encoding
+
+
+def _env_number(name: str, default, cast=int):
+    """Legge un numero da variabile d'ambiente con fallback sul default"""
+    try:
+        return cast(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class HttpClient:
+    """
+    Sessione HTTP con pool di connessioni, retry e timeout separati
+    """
+
+    def __init__(self, pool_connections: Optional[int] = None, pool_maxsize: Optional[int] = None,
+                 max_retries: Optional[int] = None, backoff_factor: Optional[float] = None,
+                 connect_timeout: Optional[float] = None, read_timeout: Optional[float] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            pool_connections: Numero di host per cui mantenere un pool
+            pool_maxsize: Connessioni keep-alive (e richieste concorrenti) per host
+            max_retries: Tentativi su errori transitori
+            backoff_factor: Base del backoff esponenziale tra i tentativi
+            connect_timeout: Timeout di connessione in secondi
+            read_timeout: Timeout di lettura in secondi
+            headers: Header di default (User-Agent del browser se None)
+        """
+        self.pool_connections = pool_connections or _env_number('HTTP_POOL_CONNECTIONS', 20)
+        self.pool_maxsize = pool_maxsize or _env_number('HTTP_POOL_MAXSIZE', 4)
+        self.max_retries = max_retries if max_retries is not None else _env_number('HTTP_MAX_RETRIES', 3)
+        self.backoff_factor = backoff_factor if backoff_factor is not None else \
+            _env_number('HTTP_BACKOFF_FACTOR', 0.5, float)
+        self.max_bytes = _env_number('HTTP_MAX_BYTES', DEFAULT_MAX_BYTES)
+        self.timeout: Tuple[float, float] = (
+            connect_timeout or _env_number('HTTP_CONNECT_TIMEOUT', 5.0, float),
+            read_timeout or _env_number('HTTP_READ_TIMEOUT', 15.0, float),
+        )
+
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+            pool_block=True,
+        )
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.pool_maxsize)
+            return slot
+
+    @contextmanager
+    def host_slot(self, url: str):
+        """Limita le richieste concorrenti verso lo stesso host alla dimensione del pool"""
+        slot = self._host_slot(url)
+        with slot:
+            yield
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET con pool, retry e timeout (connect, read) di default
+
+        Args:
+            url: URL da scaricare
+            **kwargs: Argomenti aggiuntivi per requests.Session.get
+
+        Returns:
+            requests.Response
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        with self.host_slot(url):
+            return self.session.get(url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        """
+        HEAD con pool, retry e timeout di default, seguendo i redirect
+
+        Args:
+            url: URL da verificare
+            **kwargs: Argomenti aggiuntivi per requests.Session.head
+
+        Returns:
+            requests.Response
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        kwargs.setdefault('allow_redirects', True)
+        with self.host_slot(url):
+            return self.session.head(url, **kwargs)
+
+    def fetch_html(self, url: str, headers: Optional[Dict[str, str]] = None,
+                   max_bytes: Optional[int] = None) -> FetchResult:
+        """
+        Scarica una pagina HTML in streaming con limite di dimensione
+
+        Il download si interrompe subito se il content-type non è HTML o se la pagina
+        supera max_bytes (dichiarato in Content-Length o letto); il corpo viene decodificato
+        e hashato a blocchi, senza tenere in memoria la risposta grezza completa.
+
+        Args:
+            url: URL da scaricare
+            headers: Header aggiuntivi (es. header condizionali della cache)
+            max_bytes: Dimensione massima in byte (default: HTTP_MAX_BYTES)
+
+        Returns:
+            FetchResult (status 304 senza corpo per le revalidazioni)
+
+        Raises:
+            FetchError: too_large, wrong_type o truncated
+            requests.RequestException: errori HTTP, di connessione o timeout
+        """
+        max_bytes = max_bytes or self.max_bytes
+
+        with self.host_slot(url):
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+            try:
+                if response.status_code == 304:
+                    return FetchResult(url, 304, response.headers)
+                response.raise_for_status()
+
+                content_type = response.headers.get('content-type', '').split(';')[0].strip().lower()
+                if content_type and content_type not in HTML_CONTENT_TYPES:
+                    raise FetchError(ERROR_WRONG_TYPE, f"Content-type non HTML: {content_type}")
+
+                declared_length = response.headers.get('content-length')
+                declared_length = int(declared_length) if declared_length and declared_length.isdigit() else None
+                if declared_length is not None and declared_length > max_bytes:
+                    raise FetchError(ERROR_TOO_LARGE, f"Pagina troppo grande: {declared_length} byte (limite {max_bytes})")
+
+                digest = hashlib.sha256()
+                decoder = None
+                encoding = None
+                parts = []
+                bytes_read = 0
+
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if not chunk:
+                        continue
+                    if decoder is None:
+                        # Controllo sul primo blocco: contenuti binari serviti come HTML
+                        if chunk.lstrip()[:5] in (b'%PDF-', b'PK\x03\x04') or b'\x00' in chunk[:1024]:
+                            raise FetchError(ERROR_WRONG_TYPE, "Contenuto binario non HTML")
+                        encoding = self._detect_encoding(response, chunk)
+                        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+                    bytes_read += len(chunk)
+                    if bytes_read > max_bytes:
+                        raise FetchError(ERROR_TOO_LARGE, f"Pagina oltre il limite di {max_bytes} byte")
+                    digest.update(chunk)
+                    parts.append(decoder.decode(chunk))
+
+                if decoder is not None:
+                    parts.append(decoder.decode(b'', final=True))
+
+                # Content-Length si riferisce al corpo compresso se c'è Content-Encoding
+                if (declared_length is not None and not response.headers.get('content-encoding')
+                        and bytes_read < declared_length):
+                    raise FetchError(ERROR_TRUNCATED, f"Risposta troncata: {bytes_read}/{declared_length} byte")
+
+                return FetchResult(url, response.status_code, response.headers, ''.join(parts),
+                                   digest.hexdigest(), bytes_read, encoding)
+            finally:
+                response.close()
+
+    @staticmethod
+    def _detect_encoding(response: requests.Response, first_chunk: bytes) -> str:
+        """Charset dall'header Content-Type, dal meta tag nel primo blocco o UTF-8"""
+        candidates = []
+        if 'charset=' in response.headers.get('content-type', '').lower():
+            candidates.append(response.encoding)
+        match = _META_CHARSET_RE.search(first_chunk[:4096])
+        if match:
+            candidates.append(match.group(1).decode('ascii', 'ignore'))
+        candidates.append('utf-8')
+        for candidate in candidates:
+            try:
+                return codecs.lookup(candidate).name
+            except (LookupError, TypeError):
+                continue
+        return 'utf-8'
+
+    def close(self):
+        """Chiude tutte le connessioni del pool"""
+        self.session.close()
+
+
+_shared_client: Optional[HttpClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Restituisce il client HTTP condiviso dal processo (creato alla prima chiamata)"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_lock:
+            if _shared_client is None:
+                _shared_client = HttpClient()
+    return _shared_client
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Archivio persistente delle frequenze documentali (DF) per il peso TF-IDF degli argomenti
+
+Tabella SQLite aggiornata in modo incrementale con ogni articolo e AI Overview
+analizzato: per ogni termine (unigramma, bigramma o trigramma) il numero di documenti
+che lo contengono, più il numero totale di documenti. Le letture usano il memory
+mapping di SQLite (PRAGMA mmap_size), quindi il peso IDF si calcola al momento
+dell'analisi senza rielaborare il corpus. Ogni documento viene contato una sola volta
+(hash del testo).
+
+Configurazione tramite variabili d'ambiente:
+    IDF_STORE_PATH   file SQLite dell'archivio (abilita il peso TF-IDF se impostata)
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+STORE_PATH_ENV = 'IDF_STORE_PATH'
+DEFAULT_STORE_PATH = 'idf_store.sqlite'
+MMAP_SIZE = 256 * 1024 * 1024
+# Crescita relativa del numero di documenti che fa cambiare generazione (10%)
+GENERATION_GROWTH = 0.1
+
+# Limite di parametri per query (SQLITE_MAX_VARIABLE_NUMBER nelle build meno recenti)
+_QUERY_CHUNK = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY,
+    df INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS documents (
+    digest TEXT PRIMARY KEY,
+    added_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def document_digest(texts: Iterable[str]) -> str:
+    """Hash del contenuto di un documento (uno o più testi)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for text in texts:
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class IDFStore:
+    """
+    Frequenze documentali dei termini su SQLite, aggiornate in modo incrementale
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: File SQLite (default: IDF_STORE_PATH o idf_store.sqlite)
+        """
+        self.path = path or os.environ.get(STORE_PATH_ENV, DEFAULT_STORE_PATH)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('documents', 0)")
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional['IDFStore']:
+        """Crea l'archivio solo se IDF_STORE_PATH è impostata"""
+        if os.environ.get(STORE_PATH_ENV):
+            return cls()
+        return None
+
+    @property
+    def document_count(self) -> int:
+        """Numero di documenti registrati"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'documents'").fetchone()
+        return row[0] if row else 0
+
+    def generation(self, growth: float = GENERATION_GROWTH) -> int:
+        """
+        Generazione dell'archivio: cambia ogni volta che il numero di documenti cresce di
+        `growth` (in proporzione), cioè quando i pesi IDF possono essersi spostati
+
+        Args:
+            growth: Crescita relativa tra due generazioni
+
+        Returns:
+            int: Fascia logaritmica del numero di documenti
+        """
+        return int(math.log1p(self.document_count) / math.log1p(growth))
+
+    def add_document(self, terms: Iterable[str], digest: str) -> bool:
+        """
+        Registra un documento incrementando la DF dei suoi termini
+
+        Args:
+            terms: Termini distinti del documento
+            digest: Hash del documento (vedi document_digest)
+
+        Returns:
+            bool: False se il documento era già registrato
+        """
+        unique_terms = [(term,) for term in set(terms)]
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT INTO documents (digest, added_at) VALUES (?, ?)", (digest, time.time())
+                    )
+                    self._conn.executemany(
+                        "INSERT INTO terms (term, df) VALUES (?, 1) "
+                        "ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                        unique_terms
+                    )
+                    self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'documents'")
+            except sqlite3.IntegrityError:
+                # Documento già registrato
+                return False
+        return True
+
+    def document_frequencies(self, terms: List[str]) -> Dict[str, int]:
+        """DF dei termini richiesti (0 per i termini mai visti)"""
+        frequencies = dict.fromkeys(terms, 0)
+        with self._lock:
+            for start in range(0, len(terms), _QUERY_CHUNK):
+                chunk = terms[start:start + _QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT term, df FROM terms WHERE term IN ({placeholders})", chunk
+                )
+                for term, df in rows:
+                    frequencies[term] = df
+        return frequencies
+
+    def idf(self, terms: List[str]) -> Dict[str, float]:
+        """
+        IDF smussata dei termini: log((1 + N) / (1 + df)) + 1
+
+        Args:
+            terms: Termini da pesare
+
+        Returns:
+            dict: termine -> peso IDF (≥ 1, uguale a 1 per i termini presenti ovunque)
+        """
+        total = self.document_count
+        return {
+            term: math.log((1 + total) / (1 + df)) + 1
+            for term, df in self.document_frequencies(list(terms)).items()
+        }
+
+    def close(self):
+        """Chiude la connessione SQLite"""
+        with self._lock:
+            self._conn.close()
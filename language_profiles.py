@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Rilevamento della lingua e profili di analisi per lingua
+
+Rilevamento offline con profili di n-grammi di caratteri (Cavnar & Trenkle): del testo
+si calcola la classifica degli n-grammi (1-3 caratteri, parole delimitate da '_') più
+frequenti e la si confronta con quella di ogni lingua (data/languages/ngrams.json,
+ricavata con `ngram_profile` da testi campione); vince la lingua con la distanza
+"out-of-place" minore. Si usano solo i primi DETECTION_CHARS caratteri.
+
+Ogni profilo (data/languages/<codice>.json) contiene stopword, tokenizzatore
+(espressione regolare opzionale), stemmer Snowball, sinonimi e parole chiave per
+priorità e categoria dei topic. I profili vengono caricati al primo utilizzo e
+condivisi da tutto il processo; stopword NLTK e stemmer vengono caricati solo quando
+servono, quindi un batch multilingua carica solo le lingue che incontra.
+
+Configurazione tramite variabili d'ambiente:
+    ANALYSIS_LANGUAGE   codice della lingua da usare sempre, oppure 'auto' (default)
+"""
+
+import functools
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from multi_pattern import load_synonyms
+
+LANGUAGE_ENV = 'ANALYSIS_LANGUAGE'
+AUTO = 'auto'
+DEFAULT_LANGUAGE = 'it'
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'languages')
+NGRAMS_FILE = 'ngrams.json'
+
+# Parametri del rilevamento
+DETECTION_CHARS = 2000
+MIN_DETECTION_LETTERS = 20
+PROFILE_SIZE = 300
+MAX_NGRAM = 3
+
+# Parole alfabetiche (senza cifre e underscore)
+_LETTERS_RE = re.compile(r'[^\W\d_]+')
+
+# Lunghezza del prefisso usato se lo stemmer Snowball non è disponibile
+_FALLBACK_STEM_LENGTH = 6
+# Radici memorizzate per profilo (i profili restano in memoria per tutto il processo)
+STEM_CACHE_SIZE = 50000
+
+_lock = threading.Lock()
+_profiles: Dict[str, 'LanguageProfile'] = {}
+_ngram_ranks: Optional[Dict[str, Dict[str, int]]] = None
+
+
+def ngram_profile(text: str, size: int = PROFILE_SIZE) -> List[str]:
+    """
+    N-grammi di caratteri più frequenti del testo, in ordine di frequenza
+
+    Args:
+        text: Testo da profilare
+        size: Numero di n-grammi conservati
+
+    Returns:
+        list: N-grammi (1-3 caratteri, '_' ai bordi delle parole) dal più frequente
+    """
+    counts: Dict[str, int] = {}
+    for word in _LETTERS_RE.findall(text.lower()):
+        padded = f"_{word}_"
+        for n in range(1, MAX_NGRAM + 1):
+            for start in range(len(padded) - n + 1):
+                gram = padded[start:start + n]
+                if gram != '_':
+                    counts[gram] = counts.get(gram, 0) + 1
+    return [gram for gram, _ in sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:size]]
+
+
+def _load_ngram_ranks() -> Dict[str, Dict[str, int]]:
+    global _ngram_ranks
+    if _ngram_ranks is None:
+        with _lock:
+            if _ngram_ranks is None:
+                with open(os.path.join(PROFILES_DIR, NGRAMS_FILE), 'r', encoding='utf-8') as f:
+                    profiles = json.load(f)
+                _ngram_ranks = {
+                    code: {gram: rank for rank, gram in enumerate(grams)}
+                    for code, grams in profiles.items()
+                }
+    return _ngram_ranks
+
+
+def supported_languages() -> List[str]:
+    """Codici delle lingue con un profilo di rilevamento"""
+    return sorted(_load_ngram_ranks())
+
+
+def detect_language(text: str, default: str = DEFAULT_LANGUAGE) -> Tuple[str, float]:
+    """
+    Lingua del testo
+
+    Args:
+        text: Testo da analizzare (ne vengono usati i primi DETECTION_CHARS caratteri)
+        default: Lingua restituita se il testo è troppo corto
+
+    Returns:
+        tuple: (codice della lingua, confidenza tra 0 e 1)
+    """
+    sample = text[:DETECTION_CHARS]
+    if sum(len(word) for word in _LETTERS_RE.findall(sample)) < MIN_DETECTION_LETTERS:
+        return default, 0.0
+
+    grams = ngram_profile(sample)
+    distances = []
+    for code, ranks in _load_ngram_ranks().items():
+        distance = 0
+        for rank, gram in enumerate(grams):
+            reference = ranks.get(gram)
+            distance += PROFILE_SIZE if reference is None else abs(rank - reference)
+        distances.append((distance, code))
+    distances.sort()
+
+    best_distance, best = distances[0]
+    if len(distances) == 1:
+        return best, 1.0
+    second_distance = distances[1][0]
+    confidence = (second_distance - best_distance) / second_distance if second_distance else 0.0
+    return best, round(confidence, 3)
+
+
+class LanguageProfile:
+    """
+    Risorse di analisi di una lingua, caricate al primo utilizzo
+    """
+
+    def __init__(self, code: str, data: Dict):
+        """
+        Args:
+            code: Codice della lingua (es. 'it')
+            data: Contenuto di data/languages/<codice>.json
+        """
+        self.code = code
+        self.name = data['name']
+        self.token_pattern: Optional[str] = data.get('token_pattern')
+        priority = data.get('priority_keywords', {})
+        self.high_priority_keywords: Tuple[str, ...] = tuple(priority.get('alta', ()))
+        self.medium_priority_keywords: Tuple[str, ...] = tuple(priority.get('media', ()))
+        self.categories: Dict[str, Tuple[str, ...]] = {
+            category: tuple(keywords) for category, keywords in data.get('categories', {}).items()
+        }
+        self._fallback_stop_words: Sequence[str] = data.get('stopwords', ())
+        self._inline_synonyms: Optional[Dict[str, List[str]]] = data.get('synonyms')
+        self._stop_words: Optional[frozenset] = None
+        self._synonyms: Optional[Dict[str, List[str]]] = None
+        self._stemmer = None
+        self._lock = threading.Lock()
+        # Cache LRU limitata delle radici, per istanza
+        self.stem = functools.lru_cache(maxsize=STEM_CACHE_SIZE)(self._stem)
+
+    def __repr__(self):
+        return f"LanguageProfile({self.code!r})"
+
+    @property
+    def priority_keywords(self) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Parole chiave di priorità alta e media"""
+        return self.high_priority_keywords, self.medium_priority_keywords
+
+    @property
+    def stop_words(self) -> frozenset:
+        """Stopword NLTK della lingua più quelle del profilo"""
+        if self._stop_words is None:
+            with self._lock:
+                if self._stop_words is None:
+                    words = set(self._fallback_stop_words)
+                    try:
+                        from nltk.corpus import stopwords
+                        words.update(stopwords.words(self.name))
+                    except (ImportError, LookupError, OSError):
+                        pass
+                    self._stop_words = frozenset(words)
+        return self._stop_words
+
+    @property
+    def synonyms(self) -> Dict[str, List[str]]:
+        """Sinonimi del profilo (per l'italiano: SYNONYMS_PATH o data/synonyms.json)"""
+        if self._synonyms is None:
+            with self._lock:
+                if self._synonyms is None:
+                    if self._inline_synonyms is None:
+                        self._synonyms = load_synonyms()
+                    else:
+                        self._synonyms = {
+                            term.lower(): [synonym.lower() for synonym in synonyms]
+                            for term, synonyms in self._inline_synonyms.items()
+                        }
+        return self._synonyms
+
+    def _stem(self, word: str) -> str:
+        """
+        Radice di una parola minuscola (Snowball, oppure prefisso se NLTK non è disponibile)
+
+        Usare `stem`, che memorizza le ultime STEM_CACHE_SIZE radici.
+        """
+        if self._stemmer is None:
+            with self._lock:
+                if self._stemmer is None:
+                    try:
+                        from nltk.stem.snowball import SnowballStemmer
+                        self._stemmer = SnowballStemmer(self.name).stem
+                    except (ImportError, ValueError):
+                        self._stemmer = lambda token: token[:_FALLBACK_STEM_LENGTH]
+        return self._stemmer(word)
+
+    def tokenize(self, lower_text: str) -> List[str]:
+        """Parole di un testo minuscolo con il tokenizzatore della lingua"""
+        pattern = self.token_pattern or r'\w+'
+        return [token for token in re.findall(pattern, lower_text) if token[0].isalnum()]
+
+
+def get_profile(code: str) -> LanguageProfile:
+    """
+    Profilo di una lingua, caricato al primo utilizzo e condiviso dal processo
+
+    Args:
+        code: Codice della lingua (es. 'it', 'en', 'es', 'de', 'fr')
+
+    Returns:
+        LanguageProfile
+    """
+    profile = _profiles.get(code)
+    if profile is not None:
+        return profile
+    with _lock:
+        profile = _profiles.get(code)
+        if profile is None:
+            path = os.path.join(PROFILES_DIR, f"{code}.json")
+            if not os.path.exists(path):
+                raise ValueError(f"Lingua non supportata: {code}")
+            with open(path, 'r', encoding='utf-8') as f:
+                profile = LanguageProfile(code, json.load(f))
+            _profiles[code] = profile
+    return profile
+
+
+def loaded_profiles() -> List[str]:
+    """Codici dei profili già caricati nel processo"""
+    return sorted(_profiles)
+
+
+def resolve_language(setting: Optional[str], texts: Iterable[str] = ()) -> str:
+    """
+    Lingua da usare per un testo
+
+    Args:
+        setting: Codice forzato, 'auto' o None (default: ANALYSIS_LANGUAGE o 'auto')
+        texts: Testo (o frammenti) da cui rilevare la lingua in modalità 'auto'
+
+    Returns:
+        str: Codice della lingua
+    """
+    setting = setting or os.environ.get(LANGUAGE_ENV, AUTO)
+    if setting != AUTO:
+        return setting
+    sample = ''
+    for text in texts:
+        sample += text + ' '
+        if len(sample) >= DETECTION_CHARS:
+            break
+    return detect_language(sample)[0]
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Ricerca multi-pattern Aho-Corasick per la copertura esatta e per sinonimi dei topic
+
+Un solo automa viene costruito su tutti i topic dell'AI Overview e sui sinonimi
+pertinenti (tabella caricata da data/synonyms.json), e l'articolo viene scandito
+una volta sola in minuscolo: ogni occorrenza di ogni pattern viene restituita con
+la sua posizione, comprese quelle sovrapposte. La semantica è la stessa di
+`topic.lower() in contenuto.lower()` (ricerca di sottostringhe, senza confini di parola).
+
+Configurazione tramite variabili d'ambiente:
+    SYNONYMS_PATH   file JSON {termine: [sinonimi, ...]} (default: data/synonyms.json)
+"""
+
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+SYNONYMS_PATH_ENV = 'SYNONYMS_PATH'
+DEFAULT_SYNONYMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'synonyms.json')
+
+# Confidenza di una corrispondenza per sinonimo (stessa della vecchia ricerca per sinonimi)
+SYNONYM_CONFIDENCE = 0.7
+
+
+class Hit(NamedTuple):
+    """Occorrenza di un pattern nel testo minuscolo"""
+    pattern: str
+    start: int
+    end: int
+
+
+def load_synonyms(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Carica la tabella dei sinonimi da un file JSON
+
+    Args:
+        path: File JSON (default: SYNONYMS_PATH o data/synonyms.json)
+
+    Returns:
+        dict: termine minuscolo -> sinonimi minuscoli (vuoto se il file non esiste)
+    """
+    path = path or os.environ.get(SYNONYMS_PATH_ENV, DEFAULT_SYNONYMS_PATH)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            table = json.load(f)
+    except FileNotFoundError:
+        print(f"⚠️ File dei sinonimi non trovato: {path}")
+        return {}
+    return {str(term).lower(): [str(synonym).lower() for synonym in synonyms]
+            for term, synonyms in table.items()}
+
+
+class AhoCorasick:
+    """
+    Automa di Aho-Corasick su un insieme di pattern
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Args:
+            patterns: Pattern da cercare (i duplicati e le stringhe vuote vengono ignorati)
+        """
+        self.patterns: List[str] = []
+        # goto[stato] : carattere -> stato successivo; output[stato] : id dei pattern che terminano qui
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        seen = set()
+        for pattern in patterns:
+            if not pattern or pattern in seen:
+                continue
+            seen.add(pattern)
+            self._insert(pattern, len(self.patterns))
+            self.patterns.append(pattern)
+        self._link()
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def _insert(self, pattern: str, pattern_id: int):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] += (pattern_id,)
+
+    def _link(self):
+        """Collegamenti di fallimento in ampiezza; le uscite includono quelle dei suffissi"""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Scandisce il testo una volta sola
+
+        Args:
+            text: Testo in cui cercare (stessa forma dei pattern, es. minuscolo)
+
+        Returns:
+            iteratore di (inizio, fine, id del pattern) in ordine di fine
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        lengths = [len(pattern) for pattern in self.patterns]
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                end = position + 1
+                for pattern_id in output[state]:
+                    yield end - lengths[pattern_id], end, pattern_id
+
+    def find_all(self, text: str) -> List[Hit]:
+        """Tutte le occorrenze (anche sovrapposte) dei pattern nel testo"""
+        patterns = self.patterns
+        return [Hit(patterns[pattern_id], start, end) for start, end, pattern_id in self.iter_matches(text)]
+
+
+class CoverageScan(NamedTuple):
+    """Risultato della scansione di un articolo"""
+    exact: Dict[int, Hit]
+    synonyms: Dict[int, Hit]
+    hits: List[Hit]
+
+
+class CoverageMatcher:
+    """
+    Copertura esatta e per sinonimi di un insieme di topic con un solo automa
+    """
+
+    def __init__(self, topics: Sequence[str], synonyms: Optional[Dict[str, List[str]]] = None):
+        """
+        Args:
+            topics: Topic dell'AI Overview
+            synonyms: Tabella termine -> sinonimi (default: load_synonyms())
+        """
+        if synonyms is None:
+            synonyms = load_synonyms()
+        self.topics = [str(topic) for topic in topics]
+        self.lowered = [topic.lower() for topic in self.topics]
+
+        # Sinonimi candidati di ogni topic, nell'ordine della tabella
+        self.topic_synonyms: List[List[str]] = []
+        for topic_lower in self.lowered:
+            candidates = []
+            for term, term_synonyms in synonyms.items():
+                if term in topic_lower:
+                    candidates.extend(synonym for synonym in term_synonyms if synonym not in candidates)
+            self.topic_synonyms.append(candidates)
+
+        self.automaton = AhoCorasick(
+            self.lowered + [synonym for candidates in self.topic_synonyms for synonym in candidates]
+        )
+
+    def scan(self, content: str) -> CoverageScan:
+        """
+        Cerca tutti i topic e i loro sinonimi nell'articolo in un solo passaggio
+
+        Args:
+            content: Testo dell'articolo
+
+        Returns:
+            CoverageScan: prima occorrenza esatta per indice di topic, primo sinonimo
+            trovato (nell'ordine della tabella) per indice di topic e tutte le occorrenze;
+            le posizioni si riferiscono al testo minuscolo
+        """
+        return self.scan_lower(content.lower())
+
+    def scan_lower(self, lower_content: str) -> CoverageScan:
+        """Come scan, per un testo già minuscolo (es. ArticleDocument.lower)"""
+        first_hits: Dict[str, Hit] = {}
+        hits = self.automaton.find_all(lower_content)
+        for hit in hits:
+            if hit.pattern not in first_hits or hit.start < first_hits[hit.pattern].start:
+                first_hits[hit.pattern] = hit
+
+        exact = {}
+        synonyms = {}
+        for index, topic_lower in enumerate(self.lowered):
+            if not topic_lower:
+                # La stringa vuota è contenuta in qualsiasi testo
+                exact[index] = Hit(topic_lower, 0, 0)
+                continue
+            if topic_lower in first_hits:
+                exact[index] = first_hits[topic_lower]
+                continue
+            for synonym in self.topic_synonyms[index]:
+                if synonym in first_hits:
+                    synonyms[index] = first_hits[synonym]
+                    break
+
+        return CoverageScan(exact, synonyms, hits)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Rianalisi incrementale degli articoli quando cambia solo l'AI Overview
+
+Con la modalità delta ContentGapAnalyzer conserva, per ogni articolo analizzato, il
+documento (ArticleDocument), gli argomenti estratti e l'esito per ogni topic
+dell'AI Overview. Quando l'AI Overview viene estratto di nuovo si confrontano i due
+insiemi di topic: solo i topic aggiunti (un topic modificato conta come rimosso più
+aggiunto) vengono cercati negli articoli, gli esiti degli altri vengono riusati e i
+topic rimossi scartati. Gli articoli non vengono scaricati di nuovo.
+
+Lo stato degli articoli si può salvare su file tra un'esecuzione e l'altra: JSON con
+un'intestazione di formato e versione (STATE_VERSION), senza pickle, quindi un file
+estraneo non può eseguire codice e un file di una versione diversa viene rifiutato.
+Del documento si salvano testo, titolo, URL, heading e paragrafi; il resto viene
+ricostruito con ArticleDocument.from_text al caricamento.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from article_document import ArticleDocument
+
+STATE_FORMAT = 'content_gap_article_states'
+# Da incrementare quando cambiano i campi salvati di ArticleState o del documento
+STATE_VERSION = 1
+
+
+class OverviewDiff(NamedTuple):
+    """Differenza tra i topic di due AI Overview"""
+    added: List[str]
+    removed: List[str]
+    unchanged: List[str]
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+class TopicVerdict(NamedTuple):
+    """Esito di un topic dell'AI Overview per un articolo (analisi base)"""
+    bucket: str          # 'covered', 'partial' o 'missing'
+    entry: Dict[str, Any]
+    # Corrispondenza a bassa similarità, riportata anche se il topic non è coperto
+    semantic_match: Optional[Dict[str, Any]] = None
+
+
+class ArticleState(NamedTuple):
+    """Stato di un articolo conservato per la rianalisi incrementale"""
+    document: ArticleDocument
+    article_topics: List[str]
+    # topic -> esito; None se l'articolo è stato analizzato con Gemini
+    verdicts: Optional[Dict[str, TopicVerdict]]
+    # Lingua rilevata dell'articolo (profilo usato per la collocazione nelle sezioni)
+    language: str
+
+
+def diff_topics(old_topics: Sequence[Any], new_topics: Sequence[Any]) -> OverviewDiff:
+    """
+    Confronta i topic di due AI Overview
+
+    Args:
+        old_topics: Topic dell'AI Overview precedente
+        new_topics: Topic dell'AI Overview nuovo
+
+    Returns:
+        OverviewDiff: Topic aggiunti, rimossi e invariati (nell'ordine originale)
+    """
+    old_texts = [str(topic) for topic in old_topics]
+    new_texts = [str(topic) for topic in new_topics]
+    old_set = set(old_texts)
+    new_set = set(new_texts)
+    return OverviewDiff(
+        added=[topic for topic in new_texts if topic not in old_set],
+        removed=[topic for topic in old_texts if topic not in new_set],
+        unchanged=[topic for topic in new_texts if topic in old_set]
+    )
+
+
+def _document_record(document: ArticleDocument) -> Dict[str, Any]:
+    return {
+        'url': document.url,
+        'title': document.title,
+        'text': document.text,
+        'headings': [list(heading) for heading in document.headings],
+        'paragraphs': [list(span) for section in document.sections for span in section.paragraphs],
+    }
+
+
+def _document_from_record(record: Dict[str, Any]) -> ArticleDocument:
+    return ArticleDocument.from_text(
+        record['text'],
+        title=record.get('title', ''),
+        url=record.get('url'),
+        headings=[{'level': level, 'text': text, 'offset': offset} for level, text, offset in record['headings']],
+        paragraphs=record['paragraphs']
+    )
+
+
+def save_states(states: Dict[str, ArticleState], path: str):
+    """
+    Salva lo stato degli articoli su file (JSON con formato e versione)
+
+    Args:
+        states: URL (o hash del contenuto) -> ArticleState
+        path: File di destinazione
+    """
+    payload = {
+        'format': STATE_FORMAT,
+        'version': STATE_VERSION,
+        'states': {
+            key: {
+                'document': _document_record(state.document),
+                'article_topics': [str(topic) for topic in state.article_topics],
+                'verdicts': None if state.verdicts is None else {
+                    topic: [verdict.bucket, verdict.entry, verdict.semantic_match]
+                    for topic, verdict in state.verdicts.items()
+                },
+                'language': state.language,
+            }
+            for key, state in states.items()
+        }
+    }
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(',', ':'), default=str)
+    os.replace(temporary, path)
+
+
+def load_states(path: str) -> Dict[str, ArticleState]:
+    """
+    Carica lo stato degli articoli salvato con save_states
+
+    Args:
+        path: File dello stato
+
+    Returns:
+        dict: URL (o hash del contenuto) -> ArticleState ({} se il file non esiste)
+
+    Raises:
+        ValueError: File non riconosciuto o di una versione diversa
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"File di stato non valido {path}: {e}") from e
+    if not isinstance(payload, dict) or payload.get('format') != STATE_FORMAT:
+        raise ValueError(f"File di stato non riconosciuto: {path}")
+    if payload.get('version') != STATE_VERSION:
+        raise ValueError(f"Versione del file di stato {payload.get('version')} non supportata "
+                         f"(attesa {STATE_VERSION}): {path}")
+
+    states = {}
+    for key, record in payload['states'].items():
+        verdicts = record['verdicts']
+        states[key] = ArticleState(
+            document=_document_from_record(record['document']),
+            article_topics=record['article_topics'],
+            verdicts=None if verdicts is None else {
+                topic: TopicVerdict(bucket, entry, semantic_match)
+                for topic, (bucket, entry, semantic_match) in verdicts.items()
+            },
+            language=record['language']
+        )
+    return states
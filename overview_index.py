@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Indice precompilato dei topic dell'AI Overview, riusato su molti articoli
+
+Il caso tipico è un AI Overview confrontato con centinaia di URL: forma minuscola,
+priorità, categoria, parole (chiavi n-gramma), trigrammi di caratteri, sinonimi
+pertinenti ed eventuali embedding di ogni topic vengono calcolati una volta sola in
+`ContentGapAnalyzer.load_ai_overview`, insieme all'automa Aho-Corasick per la
+copertura esatta e per sinonimi (multi_pattern.py).
+
+L'indice è immutabile: si può condividere tra thread senza lock e, essendo
+serializzabile con pickle, passare ai processi worker di un'analisi batch
+(`ContentGapAnalyzer.load_overview_index`).
+"""
+
+import hashlib
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fuzzy_matcher import char_trigrams
+from multi_pattern import CoverageMatcher
+
+# Parole chiave per la priorità di un topic mancante
+HIGH_PRIORITY_KEYWORDS = ('definizione', 'concetto', 'principio', 'base', 'fondamentale')
+MEDIUM_PRIORITY_KEYWORDS = ('applicazione', 'esempio', 'caso', 'utilizzo')
+
+# Categorie di contenuto, in ordine di controllo (prima corrispondenza)
+TOPIC_CATEGORIES = {
+    'teorico': ('definizione', 'concetto', 'teoria', 'principio'),
+    'pratico': ('applicazione', 'esempio', 'caso', 'utilizzo', 'implementazione'),
+    'tecnico': ('algoritmo', 'metodo', 'tecnica', 'processo'),
+    'etico': ('etica', 'responsabilità', 'trasparenza', 'bias'),
+    'economico': ('costo', 'investimento', 'mercato', 'business')
+}
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def topic_priority(topic_lower: str,
+                   priority_keywords: Optional[Tuple[Sequence[str], Sequence[str]]] = None) -> str:
+    """
+    Priorità ('alta', 'media', 'bassa') di un topic minuscolo
+
+    priority_keywords: parole chiave di priorità alta e media (default: italiano)
+    """
+    high, medium = priority_keywords or (HIGH_PRIORITY_KEYWORDS, MEDIUM_PRIORITY_KEYWORDS)
+    if any(keyword in topic_lower for keyword in high):
+        return 'alta'
+    if any(keyword in topic_lower for keyword in medium):
+        return 'media'
+    return 'bassa'
+
+
+def topic_category(topic_lower: str, categories: Optional[Dict[str, Sequence[str]]] = None) -> str:
+    """
+    Categoria di contenuto di un topic minuscolo ('generale' se nessuna corrisponde)
+
+    categories: categoria -> parole chiave, in ordine di controllo (default: italiano)
+    """
+    for category, keywords in (categories or TOPIC_CATEGORIES).items():
+        if any(keyword in topic_lower for keyword in keywords):
+            return category
+    return 'generale'
+
+
+class IndexedTopic(NamedTuple):
+    """Topic dell'AI Overview con le chiavi precalcolate"""
+    text: str
+    lower: str
+    priority: str
+    category: str
+    words: Tuple[str, ...]
+    trigrams: Tuple[str, ...]
+    synonyms: Tuple[str, ...]
+
+
+class OverviewIndex:
+    """
+    Indice immutabile dei topic di un AI Overview
+    """
+
+    __slots__ = ('content', 'content_hash', 'topics', 'coverage', 'embeddings')
+
+    def __init__(self, content: str, content_hash: str, topics: Tuple[IndexedTopic, ...],
+                 coverage: CoverageMatcher, embeddings: Optional[Any] = None):
+        for name, value in zip(self.__slots__, (content, content_hash, topics, coverage, embeddings)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"OverviewIndex è immutabile: impossibile impostare {name!r}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"OverviewIndex è immutabile: impossibile eliminare {name!r}")
+
+    def __reduce__(self):
+        # Necessario per pickle/copy, che altrimenti imposterebbero gli slot uno per uno
+        return self.__class__, tuple(getattr(self, name) for name in self.__slots__)
+
+    def __len__(self):
+        return len(self.topics)
+
+    def __repr__(self):
+        return f"OverviewIndex(topics={len(self.topics)}, digest={self.content_hash[:12]})"
+
+    @property
+    def texts(self) -> List[str]:
+        """Testi dei topic, nell'ordine originale"""
+        return [topic.text for topic in self.topics]
+
+    def matches(self, topics: Sequence[Any]) -> bool:
+        """True se l'indice è stato costruito sugli stessi topic"""
+        return len(topics) == len(self.topics) and all(
+            str(topic) == indexed.text for topic, indexed in zip(topics, self.topics)
+        )
+
+    @classmethod
+    def build(cls, topics: Sequence[Any], content: str = '',
+              synonyms: Optional[Dict[str, List[str]]] = None,
+              embed: Optional[Callable[[List[str]], Sequence[Sequence[float]]]] = None,
+              priority_keywords: Optional[Tuple[Sequence[str], Sequence[str]]] = None,
+              categories: Optional[Dict[str, Sequence[str]]] = None) -> 'OverviewIndex':
+        """
+        Costruisce l'indice dei topic
+
+        Args:
+            topics: Topic dell'AI Overview
+            content: Testo dell'AI Overview
+            synonyms: Tabella termine -> sinonimi (default: load_synonyms())
+            embed: Funzione testi -> embedding (es. SemanticAnalyzer.get_embeddings_gemini);
+                se assente l'indice non contiene embedding
+            priority_keywords: Parole chiave di priorità alta e media della lingua (default: italiano)
+            categories: Parole chiave delle categorie della lingua (default: italiano)
+
+        Returns:
+            OverviewIndex
+        """
+        coverage = CoverageMatcher(topics, synonyms)
+        indexed = tuple(
+            IndexedTopic(
+                text=text,
+                lower=lower,
+                priority=topic_priority(lower, priority_keywords),
+                category=topic_category(lower, categories),
+                words=tuple(_WORD_RE.findall(lower)),
+                trigrams=tuple(char_trigrams(lower)),
+                synonyms=tuple(topic_synonyms)
+            )
+            for text, lower, topic_synonyms in zip(coverage.topics, coverage.lowered, coverage.topic_synonyms)
+        )
+
+        embeddings = None
+        if embed is not None and indexed:
+            vectors = embed([topic.text for topic in indexed])
+            if vectors is not None and len(vectors) == len(indexed):
+                embeddings = np.asarray(vectors, dtype=np.float32)
+                embeddings.setflags(write=False)
+
+        content_hash = hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+        return cls(content, content_hash, indexed, coverage, embeddings)
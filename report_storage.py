@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Formati di salvataggio compatti per i report di analisi e lettura selettiva
+
+Formati disponibili (scelti con il parametro `format` o dall'estensione del file):
+- 'json': JSON indentato, un file per report (formato storico)
+- 'json.gz': JSON compatto compresso con gzip
+- 'jsonl': log JSON Lines in append, un report per riga (migliaia di analisi in un file)
+- 'parquet': export colonnare con una riga per topic (url, stato, tipo di match,
+  confidenza, priorità, categoria...); ogni salvataggio aggiunge un file part-*.parquet
+  alla cartella del dataset. Richiede pyarrow (opzionale).
+
+Lettura:
+- read_records: report da json/json.gz/jsonl in streaming, con selezione dei campi
+  (anche annidati, es. 'gap_analysis.coverage_percentage') e filtro sui record;
+- read_topic_rows: righe per topic dal dataset Parquet leggendo solo le colonne richieste.
+"""
+
+import gzip
+import json
+import os
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+FORMATS = ('json', 'json.gz', 'jsonl', 'parquet')
+
+# Colonne del dataset Parquet (una riga per topic dell'AI Overview)
+TOPIC_COLUMNS = (
+    'url', 'title', 'saved_at', 'analysis_method', 'coverage_percentage',
+    'topic', 'status', 'match_type', 'confidence', 'matched_with', 'priority', 'category'
+)
+
+
+def format_from_filename(filename: str) -> str:
+    """Formato dedotto dall'estensione (json se non riconosciuta)"""
+    lower = filename.lower().rstrip('/')
+    if lower.endswith('.json.gz'):
+        return 'json.gz'
+    if lower.endswith('.jsonl'):
+        return 'jsonl'
+    if lower.endswith('.parquet'):
+        return 'parquet'
+    return 'json'
+
+
+def _resolve_format(filename: str, format: Optional[str]) -> str:
+    format = format or format_from_filename(filename)
+    if format not in FORMATS:
+        raise ValueError(f"Formato non supportato: {format} (disponibili: {', '.join(FORMATS)})")
+    return format
+
+
+def _ensure_parent(filename: str):
+    parent = os.path.dirname(filename)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+
+def _analysis_results(report: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Risultati per articolo di un report singolo o di analyze_multiple_articles"""
+    if isinstance(report.get('individual_results'), list):
+        return report['individual_results']
+    return [report]
+
+
+def topic_rows(report: Dict[str, Any], saved_at: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Righe per topic di un report di analisi
+
+    Args:
+        report: Risultato di analyze_article_gap o di analyze_multiple_articles
+        saved_at: Timestamp del salvataggio (default: ora)
+
+    Returns:
+        list: Una riga per topic con le colonne TOPIC_COLUMNS
+    """
+    saved_at = saved_at or time.time()
+    rows = []
+    for result in _analysis_results(report):
+        gap = result.get('gap_analysis')
+        if not result.get('success', False) or not isinstance(gap, dict):
+            continue
+        base = {
+            'url': result.get('url'),
+            'title': result.get('title'),
+            'saved_at': saved_at,
+            'analysis_method': gap.get('analysis_method'),
+            'coverage_percentage': gap.get('coverage_percentage'),
+        }
+        for topic in gap.get('covered_topics', []):
+            rows.append(dict(base, topic=str(topic.get('topic')), status='covered',
+                             match_type=topic.get('match_type'), confidence=topic.get('confidence'),
+                             matched_with=topic.get('matched_with'), priority=None, category=None))
+        for topic in gap.get('partially_covered', []):
+            rows.append(dict(base, topic=str(topic.get('ai_topic')), status='partial',
+                             match_type=topic.get('match_type'), confidence=topic.get('similarity'),
+                             matched_with=topic.get('article_topic'), priority=None, category=None))
+        for topic in gap.get('missing_topics', []):
+            if not isinstance(topic, dict):
+                topic = {'topic': topic}
+            rows.append(dict(base, topic=str(topic.get('topic')), status='missing',
+                             match_type=None, confidence=None, matched_with=None,
+                             priority=topic.get('priority'), category=topic.get('category')))
+    for row in rows:
+        if row['matched_with'] is not None:
+            row['matched_with'] = str(row['matched_with'])
+        if row['confidence'] is not None:
+            row['confidence'] = float(row['confidence'])
+    return rows
+
+
+def _topic_schema():
+    return pa.schema([
+        ('url', pa.string()), ('title', pa.string()), ('saved_at', pa.float64()),
+        ('analysis_method', pa.string()), ('coverage_percentage', pa.float64()),
+        ('topic', pa.string()), ('status', pa.string()), ('match_type', pa.string()),
+        ('confidence', pa.float64()), ('matched_with', pa.string()),
+        ('priority', pa.string()), ('category', pa.string()),
+    ])
+
+
+def write_report(report: Dict[str, Any], filename: str, format: Optional[str] = None) -> str:
+    """
+    Salva un report nel formato richiesto
+
+    Args:
+        report: Report da salvare
+        filename: File di destinazione (cartella del dataset per 'parquet')
+        format: 'json', 'json.gz', 'jsonl' o 'parquet'
+            (default: dedotto dall'estensione del file)
+
+    Returns:
+        str: Percorso effettivamente scritto
+    """
+    format = _resolve_format(filename, format)
+
+    if format == 'json':
+        _ensure_parent(filename)
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return filename
+
+    if format == 'json.gz':
+        _ensure_parent(filename)
+        with gzip.open(filename, 'wt', encoding='utf-8', compresslevel=6) as f:
+            json.dump(report, f, ensure_ascii=False, separators=(',', ':'))
+        return filename
+
+    if format == 'jsonl':
+        _ensure_parent(filename)
+        with open(filename, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report, ensure_ascii=False, separators=(',', ':')) + '\n')
+        return filename
+
+    if not PYARROW_AVAILABLE:
+        raise ImportError("Il formato parquet richiede pyarrow (pip install pyarrow)")
+    os.makedirs(filename, exist_ok=True)
+    part = os.path.join(filename, f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.parquet")
+    table = pa.Table.from_pylist(topic_rows(report), schema=_topic_schema())
+    pq.write_table(table, part, compression='zstd')
+    return part
+
+
+def _select(record: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """Campi selezionati di un record; i percorsi annidati usano il punto"""
+    selected = {}
+    for field in fields:
+        value: Any = record
+        for key in field.split('.'):
+            value = value.get(key) if isinstance(value, dict) else None
+        selected[field] = value
+    return selected
+
+
+def read_records(filename: str, fields: Optional[Sequence[str]] = None,
+                 where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                 limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Legge i report da un file json, json.gz o jsonl
+
+    I file jsonl sono letti riga per riga, senza caricare l'intero file; le righe
+    non valide (es. ultima riga troncata) vengono saltate.
+
+    Args:
+        filename: File da leggere
+        fields: Campi da restituire (es. ['url', 'gap_analysis.coverage_percentage']);
+            None = record completi
+        where: Filtro sui record completi
+        limit: Numero massimo di record restituiti
+
+    Returns:
+        iteratore di record (o dei soli campi richiesti)
+    """
+    format = format_from_filename(filename)
+    if format == 'parquet':
+        raise ValueError("Per i dataset Parquet usare read_topic_rows")
+
+    def records():
+        if format == 'jsonl':
+            with open(filename, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+            return
+        opener = gzip.open if format == 'json.gz' else open
+        with opener(filename, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        yield from (data if isinstance(data, list) else [data])
+
+    count = 0
+    for record in records():
+        if where is not None and not where(record):
+            continue
+        yield _select(record, fields) if fields else record
+        count += 1
+        if limit is not None and count >= limit:
+            return
+
+
+def read_topic_rows(path: str, columns: Optional[Sequence[str]] = None, filter=None) -> List[Dict[str, Any]]:
+    """
+    Righe per topic da un dataset Parquet, leggendo solo le colonne richieste
+
+    Args:
+        path: Cartella del dataset (o singolo file .parquet)
+        columns: Colonne da leggere (default: tutte)
+        filter: Espressione pyarrow.dataset (es. ds.field('status') == 'missing')
+
+    Returns:
+        list: Righe come dizionari
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("La lettura parquet richiede pyarrow (pip install pyarrow)")
+    dataset = ds.dataset(path, format='parquet', schema=_topic_schema())
+    return dataset.to_table(columns=list(columns) if columns else None, filter=filter).to_pylist()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Memo persistente dei risultati dell'analisi content gap
+
+Un risultato viene riusato quando non sono cambiati né l'AI Overview né il testo
+dell'articolo: la chiave è (hash dell'AI Overview, hash del contenuto dell'articolo,
+metodo di analisi, versione della configurazione). In caso di hit l'analisi (parsing
+del documento, estrazione degli argomenti, chiamata a Gemini) viene saltata del tutto.
+
+I risultati sono salvati come JSON in una tabella SQLite; le voci più vecchie di
+RESULT_MEMO_MAX_AGE secondi (se impostata) non vengono restituite.
+
+Configurazione tramite variabili d'ambiente:
+    RESULT_MEMO_PATH      file SQLite del memo (abilita il memo se impostata)
+    RESULT_MEMO_MAX_AGE   età massima di una voce in secondi (default: nessun limite)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+MEMO_PATH_ENV = 'RESULT_MEMO_PATH'
+MAX_AGE_ENV = 'RESULT_MEMO_MAX_AGE'
+DEFAULT_MEMO_PATH = 'result_memo.sqlite'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    overview_hash TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    method TEXT NOT NULL,
+    config_version TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    result TEXT NOT NULL,
+    PRIMARY KEY (overview_hash, content_hash, method, config_version)
+) WITHOUT ROWID;
+"""
+
+
+class ResultMemo:
+    """
+    Risultati dell'analisi su SQLite indicizzati per contenuto e configurazione
+    """
+
+    def __init__(self, path: Optional[str] = None, max_age_seconds: Optional[float] = None):
+        """
+        Args:
+            path: File SQLite (default: RESULT_MEMO_PATH o result_memo.sqlite)
+            max_age_seconds: Età massima delle voci restituite (default: RESULT_MEMO_MAX_AGE
+                o nessun limite)
+        """
+        self.path = path or os.environ.get(MEMO_PATH_ENV, DEFAULT_MEMO_PATH)
+        if max_age_seconds is None and os.environ.get(MAX_AGE_ENV):
+            max_age_seconds = float(os.environ[MAX_AGE_ENV])
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional['ResultMemo']:
+        """Crea il memo solo se RESULT_MEMO_PATH è impostata"""
+        if os.environ.get(MEMO_PATH_ENV):
+            return cls()
+        return None
+
+    def get(self, overview_hash: str, content_hash: str, method: str,
+            config_version: str) -> Optional[Dict[str, Any]]:
+        """
+        Risultato memorizzato per la chiave
+
+        Args:
+            overview_hash: Hash dell'AI Overview (OverviewIndex.content_hash)
+            content_hash: Hash del testo dell'articolo (ArticleDocument.content_hash)
+            method: Metodo di analisi ('basic', 'direct_gemini', ...)
+            config_version: Versione della configurazione dell'analizzatore
+
+        Returns:
+            dict: Risultato dell'analisi, None se assente o scaduto
+        """
+        key = (overview_hash, content_hash, method, config_version)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, result FROM results WHERE overview_hash = ? AND content_hash = ? "
+                "AND method = ? AND config_version = ?", key
+            ).fetchone()
+            if row is None:
+                return None
+            created_at, result = row
+            if self.max_age_seconds is not None and time.time() - created_at > self.max_age_seconds:
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE results SET hits = hits + 1 WHERE overview_hash = ? AND content_hash = ? "
+                    "AND method = ? AND config_version = ?", key
+                )
+        return json.loads(result)
+
+    def put(self, overview_hash: str, content_hash: str, method: str, config_version: str,
+            result: Dict[str, Any]):
+        """
+        Memorizza (o sostituisce) il risultato per la chiave
+
+        Args:
+            overview_hash: Hash dell'AI Overview
+            content_hash: Hash del testo dell'articolo
+            method: Metodo di analisi
+            config_version: Versione della configurazione dell'analizzatore
+            result: Risultato serializzabile in JSON
+        """
+        payload = json.dumps(result, ensure_ascii=False, separators=(',', ':'), default=str)
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results "
+                    "(overview_hash, content_hash, method, config_version, created_at, hits, result) "
+                    "VALUES (?, ?, ?, ?, ?, 0, ?)",
+                    (overview_hash, content_hash, method, config_version, time.time(), payload)
+                )
+
+    def prune(self, older_than_seconds: float) -> int:
+        """
+        Elimina le voci più vecchie della soglia
+
+        Returns:
+            int: Voci eliminate
+        """
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(
+                    "DELETE FROM results WHERE created_at < ?", (time.time() - older_than_seconds,)
+                )
+        return cursor.rowcount
+
+    def close(self):
+        """Chiude la connessione SQLite"""
+        with self._lock:
+            self._conn.close()
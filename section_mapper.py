@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Collocazione locale dei topic mancanti nelle sezioni dell'articolo
+
+Per ogni topic mancante o parzialmente coperto si sceglie la sezione dell'articolo
+(albero degli heading di ArticleDocument) più affine, senza chiamate a un LLM:
+- 'term_overlap' (default): sovrapposizione dei termini del topic con il testo proprio
+  di ogni sezione, pesata per IDF tra le sezioni, con un bonus per i termini presenti
+  nell'heading; i termini sono confrontati sulla radice (stemmer della lingua
+  dell'articolo, oppure un prefisso comune) per tollerare le flessioni (rete/reti);
+- 'embedding': similarità coseno tra embedding del topic e della sezione, se viene
+  fornita una funzione di embedding (es. SemanticAnalyzer.get_embeddings_gemini).
+
+Nella sezione scelta viene indicato il paragrafo dopo cui inserire il contenuto. Se
+nessuna sezione condivide termini con il topic viene suggerita una nuova sezione.
+"""
+
+import bisect
+import math
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from article_document import ArticleDocument
+
+_WORD_RE = re.compile(r'\w+')
+
+# Lunghezza del prefisso usato per confrontare i termini (stemming leggero)
+STEM_LENGTH = 6
+MIN_TERM_LENGTH = 3
+# Peso dei termini del topic presenti nell'heading della sezione
+HEADING_BONUS = 2.0
+# Caratteri del testo di una sezione usati per l'embedding
+EMBEDDING_TEXT_CHARS = 1000
+
+
+def _stem(term: str) -> str:
+    return term[:STEM_LENGTH]
+
+
+class SectionMapper:
+    """
+    Assegna i topic alle sezioni di un articolo
+    """
+
+    def __init__(self, document: ArticleDocument, stop_words: Iterable[str] = (),
+                 embed: Optional[Callable[[List[str]], Sequence[Sequence[float]]]] = None,
+                 stem: Optional[Callable[[str], str]] = None):
+        """
+        Args:
+            document: Articolo elaborato (con l'albero delle sezioni)
+            stop_words: Parole ignorate nel confronto dei termini
+            embed: Funzione testi -> embedding; se assente si usa la sovrapposizione dei termini
+            stem: Stemmer della lingua (es. LanguageProfile.stem); default: prefisso della parola
+        """
+        self.document = document
+        self.sections = document.sections
+        self.stop_words = frozenset(stop_words)
+        self.embed = embed
+        self.stem = stem or _stem
+        self._section_vectors = None
+
+        # Termini del testo proprio di ogni sezione, assegnati con le posizioni dei token
+        starts = [section.start for section in self.sections]
+        self.section_terms: List[Dict[str, int]] = [{} for _ in self.sections]
+        for token, offset in zip(document.tokens, document.token_offsets):
+            if len(token) < MIN_TERM_LENGTH or token in self.stop_words:
+                continue
+            index = max(bisect.bisect_right(starts, offset) - 1, 0)
+            terms = self.section_terms[index]
+            stem = self.stem(token)
+            terms[stem] = terms.get(stem, 0) + 1
+        self.heading_terms = [set(self._terms(section.title)) for section in self.sections]
+
+        document_frequency: Dict[str, int] = {}
+        for terms in self.section_terms:
+            for stem in terms:
+                document_frequency[stem] = document_frequency.get(stem, 0) + 1
+        total = len(self.sections)
+        self.idf = {stem: math.log(1 + total / df) for stem, df in document_frequency.items()}
+        self._max_idf = math.log(1 + total)
+
+    def _terms(self, text: str) -> List[str]:
+        return [
+            self.stem(word) for word in _WORD_RE.findall(text.lower())
+            if len(word) >= MIN_TERM_LENGTH and word not in self.stop_words
+        ]
+
+    def _term_scores(self, topic: str) -> List[float]:
+        terms = set(self._terms(topic))
+        if not terms:
+            return [0.0] * len(self.sections)
+        weights = {term: self.idf.get(term, self._max_idf) for term in terms}
+        norm = sum(weights.values()) * (1 + HEADING_BONUS)
+        scores = []
+        for section_terms, heading_terms in zip(self.section_terms, self.heading_terms):
+            score = 0.0
+            for term, weight in weights.items():
+                count = section_terms.get(term, 0)
+                if count:
+                    score += weight * min(1.0, 0.5 + 0.25 * math.log1p(count))
+                if term in heading_terms:
+                    score += weight * HEADING_BONUS
+            scores.append(score / norm)
+        return scores
+
+    def _embedding_scores(self, topics: List[str]) -> Optional[np.ndarray]:
+        """Similarità coseno topic x sezioni (None se l'embedding non è disponibile)"""
+        if self._section_vectors is None:
+            texts = [
+                f"{section.title}\n{self.document.text[section.start:section.body_end][:EMBEDDING_TEXT_CHARS]}"
+                for section in self.sections
+            ]
+            vectors = self.embed(texts)
+            if vectors is None or len(vectors) != len(texts):
+                return None
+            self._section_vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        vectors = self.embed(topics)
+        if vectors is None or len(vectors) != len(topics):
+            return None
+        return _normalize(np.asarray(vectors, dtype=np.float32)) @ self._section_vectors.T
+
+    def _best_paragraph(self, section_index: int, topic: str) -> Optional[List[int]]:
+        """Paragrafo della sezione più affine al topic (l'ultimo a parità)"""
+        paragraphs = self.sections[section_index].paragraphs
+        if not paragraphs:
+            return None
+        terms = set(self._terms(topic))
+        best, best_score = paragraphs[-1], 0
+        for start, end in paragraphs:
+            score = len(terms.intersection(self._terms(self.document.text[start:end])))
+            if score > best_score:
+                best, best_score = (start, end), score
+        return list(best)
+
+    def path(self, section_index: int) -> str:
+        """Percorso degli heading dalla radice alla sezione"""
+        titles = []
+        while section_index > 0:
+            section = self.sections[section_index]
+            titles.append(section.title)
+            section_index = section.parent
+        return ' > '.join(reversed(titles)) or 'Introduzione'
+
+    def place(self, topics: Sequence[Any]) -> List[Dict[str, Any]]:
+        """
+        Sezione suggerita per ogni topic
+
+        Args:
+            topics: Topic mancanti o parzialmente coperti
+
+        Returns:
+            list: Per ogni topic {topic, section_index, section, level, path, score, method,
+                paragraph, insert_offset, where_to_add}; section_index è None se viene
+                suggerita una nuova sezione
+        """
+        texts = [str(topic) for topic in topics]
+        if not texts or not self.sections:
+            return []
+
+        method = 'term_overlap'
+        similarity = None
+        if self.embed is not None:
+            try:
+                similarity = self._embedding_scores(texts)
+            except Exception as e:
+                print(f"⚠️ Embedding delle sezioni non disponibile: {e}")
+            if similarity is not None:
+                method = 'embedding'
+
+        placements = []
+        for row, (topic, text) in enumerate(zip(topics, texts)):
+            scores = similarity[row].tolist() if similarity is not None else self._term_scores(text)
+            best = max(range(len(scores)), key=lambda index: (scores[index], -index))
+            score = scores[best]
+            if score <= 0:
+                placements.append({
+                    'topic': topic,
+                    'section_index': None,
+                    'section': None,
+                    'level': None,
+                    'path': None,
+                    'score': 0.0,
+                    'method': method,
+                    'paragraph': None,
+                    'insert_offset': len(self.document.text),
+                    'where_to_add': f"Nuova sezione dedicata a «{text}» (nessuna sezione affine)"
+                })
+                continue
+
+            section = self.sections[best]
+            paragraph = self._best_paragraph(best, text)
+            path = self.path(best)
+            placements.append({
+                'topic': topic,
+                'section_index': best,
+                'section': section.title if best else None,
+                'level': section.level,
+                'path': path,
+                'score': round(float(score), 3),
+                'method': method,
+                'paragraph': paragraph,
+                'insert_offset': paragraph[1] if paragraph else section.body_end,
+                'where_to_add': f"Sezione «{path}»" if best else "Introduzione dell'articolo"
+            })
+        return placements
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def map_topics_to_sections(document: ArticleDocument, topics: Sequence[Any], stop_words: Iterable[str] = (),
+                           embed: Optional[Callable[[List[str]], Sequence[Sequence[float]]]] = None,
+                           stem: Optional[Callable[[str], str]] = None) -> List[Dict[str, Any]]:
+    """
+    Sezione suggerita per ogni topic (vedi SectionMapper.place)
+
+    Args:
+        document: Articolo elaborato
+        topics: Topic mancanti o parzialmente coperti
+        stop_words: Parole ignorate nel confronto dei termini
+        embed: Funzione testi -> embedding (opzionale)
+        stem: Stemmer della lingua (opzionale)
+
+    Returns:
+        list: Collocazione suggerita per ogni topic
+    """
+    return SectionMapper(document, stop_words, embed, stem).place(topics)
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Crawler di sitemap e link interni che alimenta l'analisi content gap
+
+Raccoglie gli URL di un sito in due modi:
+- sitemap.xml e sitemap index (anche .xml.gz), letti in streaming con iterparse
+  e liberando gli elementi già elaborati, quindi a memoria costante anche con
+  sitemap da 50.000 URL;
+- visita in ampiezza dei link interni fino a una profondità massima, con più
+  pagine scaricate in parallelo (il limite per host resta quello dell'HttpClient).
+
+Gli URL vengono canonicalizzati (schema e host minuscoli, porta di default, frammento
+e parametri di tracking rimossi, query ordinata) e deduplicati con un insieme di hash
+da 8 byte; robots.txt viene rispettato. Gli URL sono prodotti da un generatore,
+quindi si possono passare direttamente a batch_runner.run_batch senza
+materializzare la lista completa. I messaggi diagnostici vanno su stderr, così
+l'output della riga di comando è un elenco di URL pulito.
+
+Le pagine visitate per estrarne i link vengono scaricate una sola volta: se è indicata
+una ArticleCache il corpo viene salvato in cache e l'analisi successiva lo riusa
+senza riscaricarlo. Le pagine foglia (oltre la profondità massima) sono verificate
+con una richiesta HEAD, oppure scaricate direttamente in cache se questa è attiva.
+
+Uso:
+    python site_crawler.py https://www.esempio.it --max-depth 2 > urls.txt
+    python site_crawler.py --sitemap https://www.esempio.it/sitemap.xml > urls.txt
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import os
+import sys
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urldefrag, urlencode, urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+import lxml.html
+from lxml import etree
+
+from article_cache import ArticleCache
+from http_client import HTML_CONTENT_TYPES, HttpClient, get_http_client
+
+DEFAULT_MAX_DEPTH = 2
+DEFAULT_WORKERS = 8
+
+# Parametri di query che non cambiano il contenuto della pagina
+TRACKING_PARAMS = ('gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga', 'ref')
+TRACKING_PREFIXES = ('utm_',)
+
+# Estensioni di risorse non HTML, scartate senza scaricarle
+SKIPPED_EXTENSIONS = (
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico', '.css', '.js',
+    '.zip', '.gz', '.rar', '.mp3', '.mp4', '.avi', '.mov', '.doc', '.docx', '.xls',
+    '.xlsx', '.ppt', '.pptx', '.xml', '.json', '.txt'
+)
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+_LINKS_XPATH = etree.XPath("//a[@href and not(contains(concat(' ', normalize-space(@rel), ' '), ' nofollow '))]/@href")
+_BASE_XPATH = etree.XPath("(//base/@href)[1]")
+
+
+def canonicalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """
+    Forma canonica di un URL per la deduplicazione
+
+    Args:
+        url: URL assoluto o relativo
+        base: URL della pagina che contiene il link (per gli URL relativi)
+
+    Returns:
+        str: URL canonico, o None se non è un URL http(s)
+    """
+    url = (url or '').strip()
+    if not url:
+        return None
+    if base:
+        url = urljoin(base, url)
+    url, _ = urldefrag(url)
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower()
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+    netloc = host if port in (None, _DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+    return urlunsplit((scheme, netloc, parts.path or '/', urlencode(query), ''))
+
+
+class SeenUrls:
+    """
+    Insieme degli URL visti, memorizzati come hash da 8 byte (thread-safe)
+    """
+
+    def __init__(self):
+        self._digests: Set[bytes] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._digests)
+
+    def __contains__(self, url: str) -> bool:
+        return self._digest(url) in self._digests
+
+    @staticmethod
+    def _digest(url: str) -> bytes:
+        return hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest()
+
+    def add(self, url: str) -> bool:
+        """Aggiunge l'URL; False se era già presente"""
+        digest = self._digest(url)
+        with self._lock:
+            if digest in self._digests:
+                return False
+            self._digests.add(digest)
+            return True
+
+    def merge(self, other: 'SeenUrls') -> int:
+        """Aggiunge gli URL di un altro insieme; restituisce quanti erano nuovi"""
+        with self._lock:
+            before = len(self._digests)
+            self._digests.update(other._digests)
+            return len(self._digests) - before
+
+
+def parse_sitemap(stream) -> Iterator[Tuple[str, str]]:
+    """
+    Legge una sitemap in streaming
+
+    Args:
+        stream: File-like con l'XML della sitemap
+
+    Returns:
+        iteratore di (tipo, URL), con tipo 'sitemap' per le voci di un sitemap index
+        e 'url' per le pagine
+    """
+    for _, element in etree.iterparse(stream, events=('end',), recover=True, resolve_entities=False):
+        if not isinstance(element.tag, str):
+            continue
+        kind = etree.QName(element).localname
+        if kind not in ('url', 'sitemap'):
+            continue
+        for child in element:
+            if isinstance(child.tag, str) and etree.QName(child).localname == 'loc' and child.text:
+                yield kind, child.text.strip()
+                break
+        # Libera gli elementi già elaborati: memoria costante su sitemap grandi
+        element.clear()
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+
+
+class SiteCrawler:
+    """
+    Scoperta degli URL di un sito da sitemap o link interni
+    """
+
+    def __init__(self, http_client: Optional[HttpClient] = None, max_depth: int = DEFAULT_MAX_DEPTH,
+                 max_pages: Optional[int] = None, workers: Optional[int] = None,
+                 respect_robots: bool = True, allowed_hosts: Optional[Iterable[str]] = None,
+                 article_cache: Optional[ArticleCache] = None):
+        """
+        Args:
+            http_client: Client HTTP (default: client condiviso)
+            max_depth: Profondità massima della visita dei link (0 = solo la pagina iniziale)
+            max_pages: Numero massimo di URL prodotti (None = nessun limite)
+            workers: Pagine scaricate in parallelo durante la visita dei link
+                (default: variabile d'ambiente CRAWLER_WORKERS o 8)
+            respect_robots: Se rispettare le regole di robots.txt
+            allowed_hosts: Host ammessi (default: l'host dell'URL iniziale)
+            article_cache: Cache in cui salvare le pagine scaricate durante la visita,
+                così l'analisi non le scarica di nuovo
+        """
+        self.http_client = http_client or get_http_client()
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.workers = workers or int(os.environ.get('CRAWLER_WORKERS', DEFAULT_WORKERS))
+        self.respect_robots = respect_robots
+        self.allowed_hosts = {host.lower() for host in allowed_hosts} if allowed_hosts else None
+        self.article_cache = article_cache
+        self.user_agent = self.http_client.session.headers.get('User-Agent', '*')
+        self.seen = SeenUrls()
+        self._robots: Dict[str, RobotFileParser] = {}
+        self._robots_lock = threading.Lock()
+        self._produced = 0
+
+    @property
+    def produced(self) -> int:
+        """Numero di URL prodotti finora"""
+        return self._produced
+
+    def _robots_for(self, url: str) -> RobotFileParser:
+        """
+        Regole di robots.txt dell'origine dell'URL (RFC 9309)
+
+        2xx: regole del file; 4xx, compresi 401 e 403: file non disponibile, tutto
+        consentito; 5xx o server non raggiungibile: tutto vietato.
+        """
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._robots_lock:
+            if origin in self._robots:
+                return self._robots[origin]
+
+        parser = RobotFileParser(f"{origin}/robots.txt")
+        try:
+            response = self.http_client.get(f"{origin}/robots.txt")
+            if 200 <= response.status_code < 300:
+                parser.parse(response.text.splitlines())
+            elif response.status_code in (401, 403):
+                # RFC 9309: anche l'accesso negato al file vale come "non disponibile"
+                parser.allow_all = True
+            elif response.status_code < 500:
+                parser.allow_all = True
+            else:
+                print(f"⚠️ robots.txt in errore per {origin} (HTTP {response.status_code}): "
+                      f"visita non consentita", file=sys.stderr)
+                parser.disallow_all = True
+        except Exception as e:
+            print(f"⚠️ robots.txt non raggiungibile per {origin}: {e}: visita non consentita", file=sys.stderr)
+            parser.disallow_all = True
+
+        with self._robots_lock:
+            self._robots[origin] = parser
+        return parser
+
+    def allowed(self, url: str) -> bool:
+        """True se robots.txt consente la visita dell'URL"""
+        if not self.respect_robots:
+            return True
+        return self._robots_for(url).can_fetch(self.user_agent, url)
+
+    def discover_sitemaps(self, site_url: str) -> List[str]:
+        """Sitemap dichiarate in robots.txt, altrimenti /sitemap.xml"""
+        sitemaps = self._robots_for(site_url).site_maps()
+        if sitemaps:
+            return list(sitemaps)
+        parts = urlsplit(site_url)
+        return [f"{parts.scheme}://{parts.netloc}/sitemap.xml"]
+
+    def _in_scope(self, url: str) -> bool:
+        parts = urlsplit(url)
+        if self.allowed_hosts is not None and parts.netloc not in self.allowed_hosts:
+            return False
+        return not parts.path.lower().endswith(SKIPPED_EXTENSIONS)
+
+    def _limit_reached(self) -> bool:
+        return self.max_pages is not None and self._produced >= self.max_pages
+
+    def _accept(self, url: Optional[str]) -> bool:
+        """URL nuovo, nel perimetro del sito e consentito da robots.txt"""
+        return bool(url) and self._in_scope(url) and self.seen.add(url) and self.allowed(url)
+
+    def _open_sitemap(self, sitemap_url: str):
+        response = self.http_client.get(sitemap_url, stream=True)
+        response.raise_for_status()
+        # Content-Encoding gzip viene decompresso da urllib3; un file .xml.gz resta compresso
+        # e si riconosce dai magic byte (estensione e content-type non bastano: un .xml.gz
+        # servito con Content-Encoding gzip arriva già decompresso)
+        response.raw.decode_content = True
+        # Lo stream resta aperto a fine corpo per il BufferedReader (chiuso da response.close)
+        response.raw.auto_close = False
+        stream = io.BufferedReader(response.raw)
+        if stream.peek(2)[:2] == _GZIP_MAGIC:
+            return response, gzip.GzipFile(fileobj=stream)
+        return response, stream
+
+    def iter_sitemap_urls(self, sitemap_urls: Iterable[str]) -> Iterator[str]:
+        """
+        URL delle pagine da una o più sitemap, espandendo i sitemap index
+
+        Args:
+            sitemap_urls: URL delle sitemap
+
+        Returns:
+            iteratore di URL canonici, senza duplicati
+        """
+        pending = deque(sitemap_urls)
+        visited_sitemaps = set()
+        while pending and not self._limit_reached():
+            sitemap_url = pending.popleft()
+            if sitemap_url in visited_sitemaps:
+                continue
+            visited_sitemaps.add(sitemap_url)
+
+            try:
+                response, stream = self._open_sitemap(sitemap_url)
+            except Exception as e:
+                print(f"⚠️ Sitemap non disponibile {sitemap_url}: {e}", file=sys.stderr)
+                continue
+
+            try:
+                for kind, loc in parse_sitemap(stream):
+                    if kind == 'sitemap':
+                        pending.append(loc)
+                        continue
+                    url = canonicalize_url(loc)
+                    if self.allowed_hosts is None and url:
+                        self.allowed_hosts = {urlsplit(url).netloc}
+                    if self._accept(url):
+                        self._produced += 1
+                        yield url
+                        if self._limit_reached():
+                            return
+            except (etree.XMLSyntaxError, OSError) as e:
+                print(f"⚠️ Sitemap non valida {sitemap_url}: {e}", file=sys.stderr)
+            finally:
+                response.close()
+
+    def _is_html(self, url: str) -> bool:
+        """Verifica con una richiesta HEAD che la pagina esista e sia HTML"""
+        try:
+            response = self.http_client.head(url)
+        except Exception:
+            return False
+        if response.status_code in (405, 501):
+            # HEAD non supportato: la verifica è rimandata all'analisi
+            return True
+        if response.status_code >= 400:
+            return False
+        content_type = response.headers.get('content-type', '').split(';')[0].strip().lower()
+        return not content_type or content_type in HTML_CONTENT_TYPES
+
+    def _fetch_links(self, url: str, follow: bool) -> Optional[Tuple[str, List[str]]]:
+        """
+        Scarica una pagina e ne estrae i link
+
+        Il corpo scaricato viene salvato nella cache degli articoli, se presente; le
+        pagine foglia senza cache sono solo verificate con HEAD.
+
+        Returns:
+            (URL base per i link relativi, href trovati), o None se la pagina non è
+            HTML valido o il download è fallito
+        """
+        if not follow and self.article_cache is None:
+            return (url, []) if self._is_html(url) else None
+        try:
+            fetched = self.http_client.fetch_html(url)
+        except Exception:
+            return None
+        if self.article_cache is not None and fetched.text:
+            try:
+                self.article_cache.prime(url, fetched.headers, fetched.text.encode('utf-8'),
+                                         fetched.content_hash)
+            except OSError as e:
+                print(f"⚠️ Pagina non salvata in cache {url}: {e}", file=sys.stderr)
+        if not follow or not fetched.text:
+            return url, []
+        try:
+            doc = lxml.html.document_fromstring(fetched.text.encode('utf-8'))
+        except (etree.ParserError, ValueError):
+            return url, []
+        base = _BASE_XPATH(doc)
+        base_url = urljoin(url, str(base[0])) if base else url
+        return base_url, [str(href) for href in _LINKS_XPATH(doc)]
+
+    def iter_crawl_urls(self, start_url: str) -> Iterator[str]:
+        """
+        Visita in ampiezza dei link interni a partire da una pagina
+
+        Args:
+            start_url: Pagina iniziale
+
+        Returns:
+            iteratore di URL canonici di pagine HTML raggiungibili, senza duplicati
+        """
+        start = canonicalize_url(start_url)
+        if start is None:
+            return
+        if self.allowed_hosts is None:
+            self.allowed_hosts = {urlsplit(start).netloc}
+        if not self._accept(start):
+            return
+
+        frontier = deque([(start, 0)])
+        max_pending = self.workers * 2
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='crawl') as executor:
+            pending = {}
+            while (frontier or pending) and not self._limit_reached():
+                while frontier and len(pending) < max_pending:
+                    url, depth = frontier.popleft()
+                    future = executor.submit(self._fetch_links, url, depth < self.max_depth)
+                    pending[future] = (url, depth)
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, depth = pending.pop(future)
+                    page = future.result()
+                    if page is None:
+                        continue
+                    if not self._limit_reached():
+                        self._produced += 1
+                        yield url
+                    base_url, hrefs = page
+                    for href in hrefs:
+                        link = canonicalize_url(href, base_url)
+                        if self._accept(link):
+                            frontier.append((link, depth + 1))
+
+            for future in pending:
+                future.cancel()
+
+    def iter_site_urls(self, site_url: str) -> Iterator[str]:
+        """
+        URL di un sito: dalle sitemap se disponibili, altrimenti visitando i link interni
+
+        Args:
+            site_url: URL della home page o di una pagina del sito
+
+        Returns:
+            iteratore di URL canonici, senza duplicati
+        """
+        start = canonicalize_url(site_url)
+        if start is None:
+            return
+        if self.allowed_hosts is None:
+            self.allowed_hosts = {urlsplit(start).netloc}
+
+        found = False
+        for url in self.iter_sitemap_urls(self.discover_sitemaps(start)):
+            found = True
+            yield url
+        if not found:
+            print("ℹ️ Nessuna sitemap utilizzabile: visita dei link interni", file=sys.stderr)
+            yield from self.iter_crawl_urls(start)
+
+
+def main():
+    """Entry point CLI: stampa gli URL trovati, uno per riga"""
+    parser = argparse.ArgumentParser(description="Raccolta degli URL di un sito da sitemap o link interni")
+    parser.add_argument('site', nargs='?', help="URL del sito (sitemap da robots.txt, altrimenti link interni)")
+    parser.add_argument('--sitemap', action='append', help="URL di una sitemap (ripetibile)")
+    parser.add_argument('--links-only', action='store_true', help="Visita solo i link interni")
+    parser.add_argument('--max-depth', type=int, default=DEFAULT_MAX_DEPTH)
+    parser.add_argument('--max-pages', type=int)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--ignore-robots', action='store_true')
+    args = parser.parse_args()
+
+    if not args.site and not args.sitemap:
+        parser.error("indicare un sito o almeno una --sitemap")
+
+    crawler = SiteCrawler(max_depth=args.max_depth, max_pages=args.max_pages,
+                          workers=args.workers, respect_robots=not args.ignore_robots)
+    if args.sitemap:
+        urls = crawler.iter_sitemap_urls(args.sitemap)
+    elif args.links_only:
+        urls = crawler.iter_crawl_urls(args.site)
+    else:
+        urls = crawler.iter_site_urls(args.site)
+
+    for url in urls:
+        print(url, flush=True)
+    print(f"✅ {crawler.produced} URL", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
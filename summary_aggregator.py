@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Riepilogo incrementale delle analisi content gap
+
+I risultati vengono consumati uno alla volta (`add`) e il riepilogo si può chiedere
+in qualsiasi momento (`snapshot`) senza tenere in memoria i risultati:
+- media, deviazione standard (Welford), minimo, massimo e istogramma a fasce del 10%
+  della copertura;
+- argomenti mancanti più frequenti con l'algoritmo Space-Saving (heavy hitters):
+  al massimo `capacity` contatori, conteggi sovrastimati al più dell'errore riportato;
+- argomenti mancanti per categoria e priorità;
+- gli articoli con copertura più bassa sotto la soglia (al massimo `low_coverage_limit`)
+  più il numero totale.
+
+La memoria è O(capacity + low_coverage_limit), indipendente dal numero di articoli.
+"""
+
+import heapq
+import math
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_TOP_K = 10
+DEFAULT_CAPACITY = 200
+DEFAULT_LOW_COVERAGE_THRESHOLD = 50
+DEFAULT_LOW_COVERAGE_LIMIT = 100
+HISTOGRAM_BINS = 10
+
+
+class SpaceSaving:
+    """
+    Elementi più frequenti di uno stream con un numero limitato di contatori
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """
+        Args:
+            capacity: Numero massimo di contatori
+        """
+        self.capacity = capacity
+        # elemento -> [conteggio, errore massimo]
+        self.counters: Dict[str, List[int]] = {}
+
+    def add(self, item: str, count: int = 1):
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += count
+            return
+        if len(self.counters) < self.capacity:
+            self.counters[item] = [count, 0]
+            return
+        # Sostituisce l'elemento meno frequente, ereditandone il conteggio come errore
+        victim = min(self.counters, key=lambda key: self.counters[key][0])
+        minimum = self.counters.pop(victim)[0]
+        self.counters[item] = [minimum + count, minimum]
+
+    def top(self, k: int) -> List[Tuple[str, int, int]]:
+        """I k elementi più frequenti come (elemento, conteggio, errore massimo)"""
+        ranked = heapq.nsmallest(k, self.counters.items(), key=lambda entry: (-entry[1][0], entry[0]))
+        return [(item, count, error) for item, (count, error) in ranked]
+
+
+class SummaryAggregator:
+    """
+    Aggregatore incrementale dei risultati di analyze_article_gap
+    """
+
+    def __init__(self, top_k: int = DEFAULT_TOP_K, capacity: int = DEFAULT_CAPACITY,
+                 low_coverage_threshold: float = DEFAULT_LOW_COVERAGE_THRESHOLD,
+                 low_coverage_limit: int = DEFAULT_LOW_COVERAGE_LIMIT):
+        """
+        Args:
+            top_k: Argomenti mancanti riportati nel riepilogo
+            capacity: Contatori dello sketch degli argomenti mancanti (≥ top_k)
+            low_coverage_threshold: Copertura (%) sotto la quale un articolo è segnalato
+            low_coverage_limit: Numero massimo di articoli a bassa copertura elencati
+        """
+        self.top_k = top_k
+        self.low_coverage_threshold = low_coverage_threshold
+        self.low_coverage_limit = low_coverage_limit
+        self.missing = SpaceSaving(max(capacity, top_k))
+        self.histogram = [0] * HISTOGRAM_BINS
+        self.categories: Dict[str, int] = {}
+        self.priorities: Dict[str, int] = {}
+        self.succeeded = 0
+        self.failed = 0
+        self.low_coverage_count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min: Optional[float] = None
+        self._max: Optional[float] = None
+        # Max-heap (coperture negate) degli articoli con copertura più bassa
+        self._lowest: List[Tuple[float, int, str]] = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def add(self, result: Dict[str, Any]):
+        """
+        Aggiunge il risultato di un articolo
+
+        Args:
+            result: Risultato di analyze_article_gap
+        """
+        with self._lock:
+            gap_analysis = result.get('gap_analysis') if result.get('success', False) else None
+            if not isinstance(gap_analysis, dict) or 'coverage_percentage' not in gap_analysis:
+                self.failed += 1
+                return
+
+            coverage = float(gap_analysis['coverage_percentage'])
+            self.succeeded += 1
+            delta = coverage - self._mean
+            self._mean += delta / self.succeeded
+            self._m2 += delta * (coverage - self._mean)
+            self._min = coverage if self._min is None else min(self._min, coverage)
+            self._max = coverage if self._max is None else max(self._max, coverage)
+            self.histogram[min(int(coverage // (100 / HISTOGRAM_BINS)), HISTOGRAM_BINS - 1)] += 1
+
+            for topic in gap_analysis.get('missing_topics', []):
+                if isinstance(topic, dict):
+                    self.missing.add(str(topic.get('topic', '')))
+                    category = topic.get('category', 'generale')
+                    priority = topic.get('priority', 'media')
+                    self.categories[category] = self.categories.get(category, 0) + 1
+                    self.priorities[priority] = self.priorities.get(priority, 0) + 1
+                else:
+                    self.missing.add(str(topic))
+
+            if coverage < self.low_coverage_threshold:
+                self.low_coverage_count += 1
+                self._sequence += 1
+                entry = (-coverage, -self._sequence, result.get('url', ''))
+                if len(self._lowest) < self.low_coverage_limit:
+                    heapq.heappush(self._lowest, entry)
+                elif entry > self._lowest[0]:
+                    heapq.heapreplace(self._lowest, entry)
+
+    def add_failures(self, count: int = 1):
+        """Conta analisi fallite di cui non serve il risultato (es. righe di un checkpoint)"""
+        with self._lock:
+            self.failed += count
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Riepilogo corrente (stesse chiavi del vecchio generate_summary più le statistiche aggiuntive)
+
+        Returns:
+            dict: Riepilogo, o {'error': ...} se nessuna analisi è riuscita
+        """
+        with self._lock:
+            if not self.succeeded:
+                return {'error': 'Nessuna analisi riuscita', 'failed_analyses': self.failed}
+
+            std = math.sqrt(self._m2 / (self.succeeded - 1)) if self.succeeded > 1 else 0.0
+            bin_width = 100 // HISTOGRAM_BINS
+            lowest = sorted(self._lowest, reverse=True)
+            return {
+                'total_articles_analyzed': self.succeeded,
+                'failed_analyses': self.failed,
+                'average_coverage_percentage': round(self._mean, 2),
+                'coverage_std': round(std, 2),
+                'coverage_min': round(self._min, 2),
+                'coverage_max': round(self._max, 2),
+                'coverage_distribution': {
+                    f"{start}-{start + bin_width}": count
+                    for start, count in zip(range(0, 100, bin_width), self.histogram)
+                },
+                'most_common_missing_topics': [(topic, count) for topic, count, _ in self.missing.top(self.top_k)],
+                'missing_topics_error_bound': max((error for _, _, error in self.missing.top(self.top_k)), default=0),
+                'missing_by_category': dict(sorted(self.categories.items(), key=lambda item: -item[1])),
+                'missing_by_priority': dict(self.priorities),
+                'low_coverage_count': self.low_coverage_count,
+                'articles_with_low_coverage': [
+                    {'url': url, 'coverage': round(-negative_coverage, 2)}
+                    for negative_coverage, _, url in lowest
+                ]
+            }
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Normalizzazione in un solo passaggio dei frammenti di testo estratti dall'AI Overview
+
+Ogni frammento viene normalizzato una volta sola: testo canonico, forma minuscola,
+lista di token e hash. Il record risultante (`TextFragment`) viene riusato dalla
+deduplicazione, dal filtro delle parole di navigazione, dai controlli di lunghezza
+e da `ContentGapAnalyzer.load_ai_overview`, senza ripetere lower/strip/split.
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Iterable, List, Optional
+
+# Spazi multipli (inclusi a capo e tab) collassati in uno spazio singolo
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Token alfanumerici (equivalente a pulizia punteggiatura + word_tokenize)
+_TOKEN_RE = re.compile(r'\w+')
+
+# Parole che identificano elementi di navigazione della SERP
+NAV_WORDS = (
+    'search', 'images', 'videos', 'news', 'shopping',
+    'maps', 'more', 'tools', 'settings', 'sign in'
+)
+
+
+class TextFragment:
+    """
+    Frammento di testo normalizzato (record compatto con __slots__)
+    """
+
+    __slots__ = ('text', 'lower', 'tokens', 'token_set', 'digest')
+
+    def __init__(self, text: str, lower: str, tokens: tuple, digest: str):
+        self.text = text
+        self.lower = lower
+        self.tokens = tokens
+        self.token_set = frozenset(tokens)
+        self.digest = digest
+
+    def __len__(self):
+        return len(self.text)
+
+    def __repr__(self):
+        preview = self.text[:40] + ('...' if len(self.text) > 40 else '')
+        return f"TextFragment({preview!r}, tokens={len(self.tokens)}, digest={self.digest})"
+
+
+def normalize_fragment(raw_text: str) -> Optional[TextFragment]:
+    """
+    Normalizza un frammento in un solo passaggio
+
+    Args:
+        raw_text: Testo grezzo (es. inner_text di un elemento)
+
+    Returns:
+        TextFragment o None se il testo è vuoto
+    """
+    if not raw_text:
+        return None
+
+    text = _WHITESPACE_RE.sub(' ', unicodedata.normalize('NFC', raw_text)).strip()
+    if not text:
+        return None
+
+    lower = text.lower()
+    tokens = tuple(_TOKEN_RE.findall(lower))
+    digest = hashlib.blake2b(lower.encode('utf-8'), digest_size=8).hexdigest()
+    return TextFragment(text, lower, tokens, digest)
+
+
+def normalize_fragments(raw_texts: Iterable[str]) -> List[TextFragment]:
+    """Normalizza una sequenza di testi scartando quelli vuoti"""
+    fragments = []
+    for raw_text in raw_texts:
+        fragment = normalize_fragment(raw_text)
+        if fragment is not None:
+            fragments.append(fragment)
+    return fragments
+
+
+def contains_nav_words(fragment: TextFragment, nav_words: Iterable[str] = NAV_WORDS) -> bool:
+    """Controlla se il frammento contiene parole di navigazione"""
+    return any(nav_word in fragment.lower for nav_word in nav_words)
+
+
+class FragmentDeduplicator:
+    """
+    Deduplicazione dei frammenti basata sui record normalizzati
+
+    Un frammento è duplicato se ha lo stesso hash di uno già accettato, se è contenuto
+    in un frammento lungo esistente (o lo contiene), oppure se condivide oltre il 90%
+    delle parole con un frammento lungo esistente.
+    """
+
+    def __init__(self, min_overlap_chars: int = 100, min_overlap_words: int = 20,
+                 similarity_threshold: float = 0.9):
+        self.min_overlap_chars = min_overlap_chars
+        self.min_overlap_words = min_overlap_words
+        self.similarity_threshold = similarity_threshold
+        self.fragments: List[TextFragment] = []
+        self._digests = set()
+
+    def is_duplicate(self, fragment: TextFragment) -> bool:
+        """Controlla se il frammento è duplicato o contenuto in frammenti già accettati"""
+        if fragment.digest in self._digests:
+            return True
+
+        if len(fragment.lower) <= self.min_overlap_chars:
+            return False
+
+        for existing in self.fragments:
+            if len(existing.lower) <= self.min_overlap_chars:
+                continue
+
+            if fragment.lower in existing.lower or existing.lower in fragment.lower:
+                return True
+
+            # Similarità solo per frasi molto lunghe con soglia alta
+            if (len(fragment.token_set) > self.min_overlap_words and
+                    len(existing.token_set) > self.min_overlap_words):
+                overlap = len(fragment.token_set & existing.token_set)
+                similarity = overlap / min(len(fragment.token_set), len(existing.token_set))
+                if similarity > self.similarity_threshold:
+                    return True
+
+        return False
+
+    def add(self, fragment: TextFragment) -> bool:
+        """
+        Aggiunge il frammento se non è duplicato
+
+        Returns:
+            bool: True se il frammento è stato accettato
+        """
+        if self.is_duplicate(fragment):
+            return False
+        self.fragments.append(fragment)
+        self._digests.add(fragment.digest)
+        return True
+
+    def __len__(self):
+        return len(self.fragments)
+
+
+def combine_fragments(fragments: Iterable[TextFragment], separator: str = '\n\n') -> str:
+    """Unisce i testi canonici dei frammenti"""
+    return separator.join(fragment.text for fragment in fragments)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Motore di estrazione degli argomenti in un solo passaggio
+
+Il testo viene scandito una volta con un'espressione regolare precompilata: le parole
+di contenuto (alfabetiche, non stopword, di lunghezza minima) formano sequenze
+interrotte da stopword, numeri e punteggiatura; su ogni sequenza si contano in linea
+unigrammi, bigrammi e trigrammi. I candidati vengono poi ordinati con una statistica
+configurabile:
+
+- 'frequency': numero di occorrenze
+- 'weighted': occorrenze × lunghezza dell'n-gramma (default, favorisce le frasi ripetute)
+- 'npmi': come 'weighted', ma gli n-grammi sono pesati per la PMI normalizzata
+  delle parole che li compongono (collocazioni vere contro accostamenti casuali)
+- 'log_likelihood': come 'weighted', tenendo solo gli n-grammi con associazione
+  significativa secondo il test G² di Dunning (G² ≥ 3.84, p < 0.05)
+
+Gli n-grammi più corti contenuti in uno più lungo con lo stesso numero di occorrenze
+vengono scartati (es. "machine" se compare solo in "machine learning").
+
+Con un archivio delle frequenze documentali (idf_store.py) il punteggio viene
+moltiplicato per l'IDF del termine (TF-IDF), così le parole generiche del dominio
+perdono peso rispetto agli argomenti specifici del documento.
+"""
+
+import math
+import os
+import re
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+STATISTIC_ENV = 'TOPIC_STATISTIC'
+STATISTICS = ('frequency', 'weighted', 'npmi', 'log_likelihood')
+
+# Parole (lettere/cifre) oppure singoli segni di punteggiatura, che fanno da confine
+_TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+
+# Valore critico del chi quadro a 1 grado di libertà per p < 0.05
+G2_THRESHOLD = 3.84
+
+
+class Topic(NamedTuple):
+    """Argomento candidato con punteggio e occorrenze"""
+    text: str
+    score: float
+    count: int
+    size: int
+
+
+class NgramCounts:
+    """
+    Conteggi di unigrammi, bigrammi e trigrammi di uno o più testi
+    """
+
+    __slots__ = ('counts', 'totals')
+
+    def __init__(self, max_ngram: int = 3):
+        # counts[n] : n-gramma (tupla di parole) -> occorrenze; totals[n] : totale n-grammi
+        self.counts: List[Dict[Tuple[str, ...], int]] = [dict() for _ in range(max_ngram + 1)]
+        self.totals = [0] * (max_ngram + 1)
+
+    def count(self, ngram: Tuple[str, ...]) -> int:
+        return self.counts[len(ngram)].get(ngram, 0)
+
+    def terms(self) -> List[str]:
+        """Tutti gli n-grammi distinti come stringhe (termini per la frequenza documentale)"""
+        return [' '.join(ngram) for table in self.counts[1:] for ngram in table]
+
+
+class TopicEngine:
+    """
+    Estrazione degli argomenti con conteggio n-grammi in un solo passaggio
+    """
+
+    def __init__(self, stop_words: Iterable[str], statistic: Optional[str] = None,
+                 max_ngram: int = 3, min_count: int = 2, min_word_length: int = 3,
+                 top_k: int = 25, token_pattern: Optional[str] = None):
+        """
+        Args:
+            stop_words: Stopword che interrompono gli n-grammi
+            statistic: 'frequency', 'weighted', 'npmi' o 'log_likelihood'
+                (default: variabile d'ambiente TOPIC_STATISTIC o 'weighted')
+            max_ngram: Lunghezza massima degli n-grammi
+            min_count: Occorrenze minime di un candidato
+            min_word_length: Lunghezza minima di una parola di contenuto
+            top_k: Numero massimo di argomenti restituiti
+            token_pattern: Espressione regolare dei token (default: parole e singoli segni
+                di punteggiatura), es. per tenere unite le contrazioni inglesi
+        """
+        statistic = statistic or os.environ.get(STATISTIC_ENV, 'weighted')
+        if statistic not in STATISTICS:
+            raise ValueError(f"Statistica non supportata: {statistic} (disponibili: {', '.join(STATISTICS)})")
+        self.stop_words = frozenset(stop_words)
+        self.statistic = statistic
+        self.max_ngram = max_ngram
+        self.min_count = min_count
+        self.min_word_length = min_word_length
+        self.top_k = top_k
+        self.token_re = re.compile(token_pattern) if token_pattern else _TOKEN_RE
+
+    def count_text(self, lower_text: str, counts: Optional[NgramCounts] = None) -> NgramCounts:
+        """
+        Conta gli n-grammi di un testo già minuscolo in un solo passaggio
+
+        Args:
+            lower_text: Testo in minuscolo
+            counts: Conteggi da aggiornare (per sommare più frammenti)
+
+        Returns:
+            NgramCounts aggiornato
+        """
+        if counts is None:
+            counts = NgramCounts(self.max_ngram)
+        tables = counts.counts
+        totals = counts.totals
+        stop_words = self.stop_words
+        min_length = self.min_word_length
+        max_ngram = self.max_ngram
+        window: List[str] = []
+
+        for match in self.token_re.finditer(lower_text):
+            token = match.group()
+            if len(token) < min_length or not token.replace("'", '').isalpha() or token in stop_words:
+                # Stopword, numero o punteggiatura: confine di frase
+                if window:
+                    window = []
+                continue
+
+            window.append(token)
+            if len(window) > max_ngram:
+                del window[0]
+
+            # N-grammi che terminano con la parola corrente
+            size = len(window)
+            for n in range(1, size + 1):
+                ngram = tuple(window[size - n:])
+                table = tables[n]
+                table[ngram] = table.get(ngram, 0) + 1
+                totals[n] += 1
+
+        return counts
+
+    def count_texts(self, lower_texts: Iterable[str]) -> NgramCounts:
+        """Conta gli n-grammi di più testi minuscoli, senza n-grammi a cavallo tra testi"""
+        counts = NgramCounts(self.max_ngram)
+        for lower_text in lower_texts:
+            self.count_text(lower_text, counts)
+        return counts
+
+    def _association(self, ngram: Tuple[str, ...], count: int, counts: NgramCounts) -> float:
+        """Peso di associazione in [0, 1] per un n-gramma di almeno due parole"""
+        # Divisione binaria: prima parte (n-1 parole) + ultima parola
+        left, right = ngram[:-1], ngram[-1:]
+        n = len(ngram)
+        total = counts.totals[n] or 1
+        left_count = counts.count(left)
+        right_count = counts.count(right)
+        if not left_count or not right_count:
+            return 0.0
+
+        if self.statistic == 'npmi':
+            p_joint = count / total
+            p_left = left_count / (counts.totals[len(left)] or 1)
+            p_right = right_count / (counts.totals[1] or 1)
+            if p_joint >= 1.0:
+                return 1.0
+            pmi = math.log(p_joint / (p_left * p_right))
+            return max(0.0, min(1.0, pmi / -math.log(p_joint)))
+
+        # Log-likelihood (G²) sulla tabella di contingenza 2x2
+        k11 = count
+        k12 = max(left_count - count, 0)
+        k21 = max(right_count - count, 0)
+        k22 = max(total - k11 - k12 - k21, 0)
+        g2 = 2 * (_entropy_term(k11, k12, k21, k22))
+        return 1.0 if g2 >= G2_THRESHOLD else 0.0
+
+    def rank(self, counts: NgramCounts, top_k: Optional[int] = None,
+             idf: Optional[Callable[[List[str]], Dict[str, float]]] = None,
+             min_topics: int = 0) -> List[Topic]:
+        """
+        Ordina i candidati secondo la statistica configurata
+
+        Args:
+            counts: Conteggi degli n-grammi
+            top_k: Numero massimo di argomenti (default: self.top_k)
+            idf: Funzione termini -> peso IDF (es. IDFStore.idf) per il peso TF-IDF
+            min_topics: Se meno candidati superano min_count (testo breve, es. un AI
+                Overview di poche frasi), considera anche gli n-grammi visti una volta
+
+        Returns:
+            list[Topic]: Argomenti ordinati per punteggio decrescente
+        """
+        top_k = top_k or self.top_k
+        min_count = self.min_count
+
+        candidates = {}
+        for n in range(1, self.max_ngram + 1):
+            for ngram, count in counts.counts[n].items():
+                if count >= min_count:
+                    candidates[ngram] = count
+        if len(candidates) < min_topics and min_count > 1:
+            candidates = {ngram: count for n in range(1, self.max_ngram + 1)
+                          for ngram, count in counts.counts[n].items()}
+
+        # Scarta gli n-grammi contenuti in uno più lungo con le stesse occorrenze
+        suppressed = set()
+        for ngram, count in candidates.items():
+            if len(ngram) < 2:
+                continue
+            for sub in (ngram[:-1], ngram[1:]):
+                if candidates.get(sub) == count:
+                    suppressed.add(sub)
+
+        topics = []
+        for ngram, count in candidates.items():
+            if ngram in suppressed:
+                continue
+            size = len(ngram)
+            if self.statistic == 'frequency':
+                score = float(count)
+            else:
+                score = float(count * size)
+                if size > 1 and self.statistic in ('npmi', 'log_likelihood'):
+                    score *= self._association(ngram, count, counts)
+            if score > 0:
+                topics.append(Topic(' '.join(ngram), score, count, size))
+
+        if idf is not None and topics:
+            weights = idf([topic.text for topic in topics])
+            topics = [topic._replace(score=topic.score * weights.get(topic.text, 1.0)) for topic in topics]
+
+        # A parità di punteggio: n-grammi più lunghi, poi ordine alfabetico (stabile)
+        topics.sort(key=lambda topic: (-topic.score, -topic.size, topic.text))
+        return topics[:top_k]
+
+    def extract(self, text: str, top_k: Optional[int] = None) -> List[str]:
+        """
+        Estrae gli argomenti principali da un testo
+
+        Args:
+            text: Testo da analizzare
+            top_k: Numero massimo di argomenti
+
+        Returns:
+            list: Argomenti ordinati per rilevanza
+        """
+        return [topic.text for topic in self.rank(self.count_text(text.lower()), top_k)]
+
+    def extract_from_lower_texts(self, lower_texts: Iterable[str], top_k: Optional[int] = None,
+                                 min_topics: int = 0) -> List[str]:
+        """Come extract, per più testi già minuscoli (es. frammenti normalizzati)"""
+        return [topic.text for topic in self.rank(self.count_texts(lower_texts), top_k, min_topics=min_topics)]
+
+
+def _xlogx(values: Iterable[int]) -> float:
+    return sum(v * math.log(v) for v in values if v > 0)
+
+
+def _entropy_term(k11: int, k12: int, k21: int, k22: int) -> float:
+    """Termine del G² di Dunning per una tabella 2x2"""
+    total = k11 + k12 + k21 + k22
+    if total == 0:
+        return 0.0
+    return (_xlogx((k11, k12, k21, k22)) + _xlogx((total,))
+            - _xlogx((k11 + k12, k21 + k22)) - _xlogx((k11 + k21, k12 + k22)))